@@ -0,0 +1,304 @@
+# app/adapters/vector/mmap_store.py
+"""
+Compact on-disk vector store, opened with numpy.memmap.
+
+Every uvicorn worker maps the same file, so the vectors live once in the OS
+page cache instead of once per worker, and opening is O(1) (no rebuild on boot).
+
+File layout (`gen-<N>.fvs`, little-endian, sections 64-byte aligned):
+
+    header   64 bytes   magic "FVS1", version, dtype (0=f32, 1=f16), n, dim,
+                        offsets of the three sections below, file length
+    matrix   n × dim    float32 / float16, unit-length rows
+    ids      (n+1) u64 offsets, then the UTF-8 id blob
+    meta     (n+1) u64 offsets, then one compact JSON object per row
+
+A store is a directory holding generations plus a `CURRENT` pointer file.
+Writers build a new generation next to the old one and swap `CURRENT` with an
+atomic rename; readers notice the new pointer on their next access and
+re-map. Old generations stay valid for readers that still map them (POSIX
+keeps unlinked inodes alive).
+"""
+from __future__ import annotations
+
+import json
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", ".vectors")
+# how often readers stat CURRENT for a new generation
+VECTOR_STORE_CHECK_SECONDS = float(os.getenv("VECTOR_STORE_CHECK_SECONDS", "2"))
+VECTOR_STORE_KEEP_GENERATIONS = int(os.getenv("VECTOR_STORE_KEEP_GENERATIONS", "2"))
+
+MAGIC = b"FVS1"
+VERSION = 1
+_HEADER = struct.Struct("<4sHBxQI4xQQQQ")  # 56 bytes, padded to 64
+HEADER_SIZE = 64
+_ALIGN = 64
+_DTYPES = {0: np.float32, 1: np.float16}
+_DTYPE_CODES = {np.dtype(np.float32): 0, np.dtype(np.float16): 1}
+
+
+class VectorStoreError(Exception):
+    pass
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _blob_section(items: Sequence[bytes]) -> bytes:
+    offsets = np.zeros(len(items) + 1, dtype="<u8")
+    if items:
+        offsets[1:] = np.cumsum([len(b) for b in items])
+    return offsets.tobytes() + b"".join(items)
+
+
+# ----------------------------
+# Writing
+# ----------------------------
+
+def write_store_file(
+    path: str | Path,
+    ids: Sequence[str],
+    matrix: np.ndarray,
+    metas: Optional[Sequence[Dict[str, Any]]] = None,
+    dtype: Any = np.float32,
+) -> Path:
+    """
+    Write one generation file. Rows are L2-normalized on the way in.
+    """
+    dt = np.dtype(dtype)
+    if dt not in _DTYPE_CODES:
+        raise VectorStoreError(f"unsupported dtype {dt}; use float32 or float16")
+    mat = np.asarray(matrix, dtype=np.float32)
+    if mat.ndim != 2 or len(mat) != len(ids):
+        raise VectorStoreError("matrix must be (len(ids), dim)")
+    if len(mat):
+        mat = mat / np.clip(np.linalg.norm(mat, axis=1, keepdims=True), 1e-12, None)
+    n, dim = mat.shape
+
+    ids_blob = _blob_section([str(i).encode("utf-8") for i in ids])
+    metas = metas if metas is not None else [{}] * n
+    meta_blob = _blob_section(
+        [json.dumps(m, separators=(",", ":"), default=str).encode("utf-8") for m in metas]
+    )
+
+    matrix_off = HEADER_SIZE
+    ids_off = _align(matrix_off + n * dim * dt.itemsize)
+    meta_off = _align(ids_off + len(ids_blob))
+    file_len = meta_off + len(meta_blob)
+
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, _DTYPE_CODES[dt], n, dim,
+                             matrix_off, ids_off, meta_off, file_len).ljust(HEADER_SIZE, b"\0"))
+        f.write(mat.astype(dt.newbyteorder("<"), copy=False).tobytes())
+        f.write(b"\0" * (ids_off - f.tell()))
+        f.write(ids_blob)
+        f.write(b"\0" * (meta_off - f.tell()))
+        f.write(meta_blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def _store_dir(name: str, root: str | Path | None = None) -> Path:
+    return Path(root or VECTOR_STORE_DIR) / name
+
+
+def _current_file(d: Path) -> Optional[Path]:
+    try:
+        rel = (d / "CURRENT").read_text().strip()
+    except FileNotFoundError:
+        return None
+    return d / rel if rel else None
+
+
+def publish_generation(
+    name: str,
+    ids: Sequence[str],
+    matrix: np.ndarray,
+    metas: Optional[Sequence[Dict[str, Any]]] = None,
+    dtype: Any = np.float32,
+    root: str | Path | None = None,
+) -> Path:
+    """
+    Write a new generation of store `name` and atomically make it CURRENT.
+    """
+    d = _store_dir(name, root)
+    d.mkdir(parents=True, exist_ok=True)
+    gens = sorted(int(p.stem.split("-")[1]) for p in d.glob("gen-*.fvs"))
+    gen_path = d / f"gen-{(gens[-1] + 1) if gens else 1:06d}.fvs"
+    write_store_file(gen_path, ids, matrix, metas, dtype)
+
+    ptr_tmp = d / "CURRENT.tmp"
+    ptr_tmp.write_text(gen_path.name)
+    os.replace(ptr_tmp, d / "CURRENT")  # the atomic swap
+
+    # prune old generations (readers that still map them keep working)
+    keep = max(1, VECTOR_STORE_KEEP_GENERATIONS)
+    for old in sorted(d.glob("gen-*.fvs"))[:-keep]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+    return gen_path
+
+
+# ----------------------------
+# Reading
+# ----------------------------
+
+class VectorStore:
+    """
+    Read-only view of one generation file. `matrix` is a memmap-backed array:
+    no copy, shared page cache across processes.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._mm = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if len(self._mm) < HEADER_SIZE:
+            raise VectorStoreError(f"{self.path}: truncated header")
+        (magic, version, dcode, n, dim, matrix_off, ids_off, meta_off, file_len) = _HEADER.unpack(
+            bytes(self._mm[: _HEADER.size])
+        )
+        if magic != MAGIC or version != VERSION:
+            raise VectorStoreError(f"{self.path}: not a FVS{VERSION} file")
+        if file_len != len(self._mm):
+            raise VectorStoreError(f"{self.path}: length mismatch (partial write?)")
+        self.n, self.dim = int(n), int(dim)
+        dt = np.dtype(_DTYPES[dcode]).newbyteorder("<")
+        self.matrix = np.ndarray(
+            (self.n, self.dim), dtype=dt, buffer=self._mm, offset=matrix_off
+        )
+        self._id_offsets = np.ndarray((self.n + 1,), dtype="<u8", buffer=self._mm, offset=ids_off)
+        self._id_base = ids_off + (self.n + 1) * 8
+        self._meta_offsets = np.ndarray((self.n + 1,), dtype="<u8", buffer=self._mm, offset=meta_off)
+        self._meta_base = meta_off + (self.n + 1) * 8
+        self._ids: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _slice(self, base: int, offsets: np.ndarray, i: int) -> bytes:
+        a, b = int(offsets[i]), int(offsets[i + 1])
+        return bytes(self._mm[base + a : base + b])
+
+    def id_at(self, i: int) -> str:
+        return self._slice(self._id_base, self._id_offsets, i).decode("utf-8")
+
+    @property
+    def ids(self) -> List[str]:
+        if self._ids is None:
+            self._ids = [self.id_at(i) for i in range(self.n)]
+        return self._ids
+
+    def meta(self, i: int) -> Dict[str, Any]:
+        raw = self._slice(self._meta_base, self._meta_offsets, i)
+        return json.loads(raw) if raw else {}
+
+    def similarity(self, queries: np.ndarray, block_rows: int = 65536) -> np.ndarray:
+        """
+        (Q, n) cosine similarities. float16 stores are upcast block by block so the
+        temporary stays bounded and the shared mapping is never copied whole.
+        """
+        q = np.asarray(queries, dtype=np.float32)
+        if q.ndim == 1:
+            q = q[None, :]
+        if self.matrix.dtype == np.float32:
+            return q @ self.matrix.T
+        out = np.empty((len(q), self.n), dtype=np.float32)
+        for s in range(0, self.n, block_rows):
+            e = min(self.n, s + block_rows)
+            out[:, s:e] = q @ self.matrix[s:e].astype(np.float32).T
+        return out
+
+
+class LazyMeta:
+    """Sequence view that decodes row metadata on access (only for the rows we return)."""
+
+    def __init__(self, store: VectorStore):
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return self._store.meta(int(i))
+
+
+_lock = threading.Lock()
+_open: Dict[str, tuple[float, Optional[Path], Optional[VectorStore]]] = {}
+
+
+def open_store(name: str, root: str | Path | None = None) -> Optional[VectorStore]:
+    """
+    The CURRENT generation of store `name` (None if it was never built).
+    Re-checks the pointer at most every VECTOR_STORE_CHECK_SECONDS and re-maps on change.
+    """
+    key = str(_store_dir(name, root))
+    now = time.monotonic()
+    checked_at, path, store = _open.get(key, (0.0, None, None))
+    if store is not None and now - checked_at < VECTOR_STORE_CHECK_SECONDS:
+        return store
+    with _lock:
+        cur = _current_file(_store_dir(name, root))
+        if cur is None:
+            _open[key] = (now, None, None)
+            return None
+        if store is None or cur != path:
+            store = VectorStore(cur)
+        _open[key] = (now, cur, store)
+        return store
+
+
+def generation_of(store: Optional[VectorStore]) -> Optional[str]:
+    return store.path.name if store is not None else None
+
+
+# ----------------------------
+# Builders
+# ----------------------------
+
+INVESTOR_STORE = "investors"
+PRODUCT_STORE = "products"  # built by app.ml.product_index (embeds the catalog)
+
+
+def build_investor_store(
+    records: Optional[Iterable[Dict[str, Any]]] = None,
+    dtype: Any = np.float32,
+    root: str | Path | None = None,
+) -> Path:
+    """
+    Snapshot the Investor collection (vectors + the ensure_schema properties as
+    metadata) into a new store generation.
+    """
+    from .weaviate_client import INVESTOR_PROPERTIES
+
+    if records is None:
+        from .weaviate_investors import fetch_investor_vectors
+
+        records = fetch_investor_vectors()
+    ids: List[str] = []
+    vecs: List[list] = []
+    metas: List[Dict[str, Any]] = []
+    for r in records:
+        name = (r.get("name") or "").strip()
+        if not name or not r.get("vector"):
+            continue
+        ids.append(name)
+        vecs.append(r["vector"])
+        metas.append({k: r.get(k) for k, _t in INVESTOR_PROPERTIES})
+    dim = len(vecs[0]) if vecs else 0
+    mat = np.asarray(vecs, dtype=np.float32).reshape(len(vecs), dim)
+    return publish_generation(INVESTOR_STORE, ids, mat, metas, dtype=dtype, root=root)
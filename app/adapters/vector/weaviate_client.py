@@ -1,45 +1,287 @@
 # app/adapters/vector/weaviate_client.py
 from __future__ import annotations
 
+import asyncio
 import os
-import weaviate
-from weaviate.classes.init import AdditionalConfig
-from weaviate.classes.config import Property, DataType, Configure
+import threading
+from typing import Any, Dict
+
+from app.core.circuit_breaker import CircuitBreaker
+
+# NOTE: `weaviate` is imported inside the functions below so that importing
+# the API (routers) doesn't load the client and its gRPC stack at boot.
 
 INVESTOR = "Investor"
-_client = None
+PITCH = "Pitch"
 
+# Canonical Investor properties (name, type). ensure_schema builds the Weaviate
+# collection from this; local vector stores use the same fields as row metadata.
+INVESTOR_PROPERTIES = [
+    ("name",           "text"),
+    ("firm",           "text"),
+    ("sectors",        "text"),
+    ("stages",         "text"),
+    ("geo",            "text"),
+    ("thesis",         "text"),
+    ("constraints",    "text"),
+    ("profile",        "text"),
 
-def get_client():
-    """
-    Returns a singleton Weaviate client.
+    ("check_min",      "number"),
+    ("check_max",      "number"),
+    ("check_currency", "text"),
+]
+
+# ---- HNSW index settings (Investor + Pitch collections)
+# distance: cosine | dot | l2-squared | hamming | manhattan
+WEAVIATE_DISTANCE = os.getenv("WEAVIATE_DISTANCE", "cosine")
+# query-time candidate list; -1 = dynamic (dynamicEfMin..Max, factor × limit)
+WEAVIATE_HNSW_EF = int(os.getenv("WEAVIATE_HNSW_EF", "-1"))
+WEAVIATE_HNSW_EF_CONSTRUCTION = int(os.getenv("WEAVIATE_HNSW_EF_CONSTRUCTION", "128"))
+WEAVIATE_HNSW_MAX_CONNECTIONS = int(os.getenv("WEAVIATE_HNSW_MAX_CONNECTIONS", "32"))
+# compression: none | pq | bq | sq
+WEAVIATE_QUANTIZER = os.getenv("WEAVIATE_QUANTIZER", "none").strip().lower()
+WEAVIATE_PQ_SEGMENTS = int(os.getenv("WEAVIATE_PQ_SEGMENTS", "0"))  # 0 = Weaviate default (dim-based)
+WEAVIATE_PQ_CENTROIDS = int(os.getenv("WEAVIATE_PQ_CENTROIDS", "256"))
+WEAVIATE_QUANTIZER_TRAINING_LIMIT = int(os.getenv("WEAVIATE_QUANTIZER_TRAINING_LIMIT", "100000"))
+# BQ/SQ: re-rank this many candidates with the uncompressed vectors
+WEAVIATE_RESCORE_LIMIT = int(os.getenv("WEAVIATE_RESCORE_LIMIT", "200"))
+
+# ---- Connection lifecycle
+# per-operation timeouts (seconds): one slow query must not hold a worker for minutes
+WEAVIATE_TIMEOUT_INIT = float(os.getenv("WEAVIATE_TIMEOUT_INIT", "10"))
+WEAVIATE_TIMEOUT_QUERY = float(os.getenv("WEAVIATE_TIMEOUT_QUERY", "5"))
+WEAVIATE_TIMEOUT_INSERT = float(os.getenv("WEAVIATE_TIMEOUT_INSERT", "60"))
+# circuit breaker: after N consecutive failures, fail fast for RESET seconds,
+# then let one probe through (health check + reconnect)
+WEAVIATE_BREAKER_FAILURES = int(os.getenv("WEAVIATE_BREAKER_FAILURES", "3"))
+WEAVIATE_BREAKER_RESET_SECONDS = float(os.getenv("WEAVIATE_BREAKER_RESET_SECONDS", "15"))
+
+_client = None
+_client_lock = threading.Lock()
 
-    Strategy:
-    1) If WEAVIATE_EMBEDDED=1 -> embedded Weaviate (no docker needed)
-    2) Else -> connect to a local Weaviate you run yourself (docker / remote)
-    """
-    global _client
-    if _client:
-        return _client
 
-    timeout_cfg = AdditionalConfig(timeout=(30, 120))
+def _connect():
+    import weaviate
+    from weaviate.classes.init import AdditionalConfig, Timeout
+
+    timeout_cfg = AdditionalConfig(
+        timeout=Timeout(
+            init=WEAVIATE_TIMEOUT_INIT,
+            query=WEAVIATE_TIMEOUT_QUERY,
+            insert=WEAVIATE_TIMEOUT_INSERT,
+        )
+    )
     use_embedded = os.getenv("WEAVIATE_EMBEDDED", "1") == "1"
 
     if use_embedded:
         # Embedded Weaviate (stores data locally)
         # NOTE: Embedded will download binaries on first run.
-        _client = weaviate.connect_to_embedded(additional_config=timeout_cfg)
+        client = weaviate.connect_to_embedded(additional_config=timeout_cfg)
     else:
         # Local Weaviate (YOU must run it)
         # These ports should match your Weaviate container/service
-        _client = weaviate.connect_to_local(
+        client = weaviate.connect_to_local(
             port=int(os.getenv("WEAVIATE_HTTP_PORT", "8080")),
             grpc_port=int(os.getenv("WEAVIATE_GRPC_PORT", "50051")),
             additional_config=timeout_cfg,
         )
 
-    ensure_schema(_client)
-    return _client
+    try:
+        ensure_schema(client)
+    except Exception:
+        client.close()
+        raise
+    return client
+
+
+def get_client():
+    """
+    Returns a singleton Weaviate client (one gRPC channel shared by all threads).
+
+    Strategy:
+    1) If WEAVIATE_EMBEDDED=1 -> embedded Weaviate (no docker needed)
+    2) Else -> connect to a local Weaviate you run yourself (docker / remote)
+
+    Creation is lock-protected, so concurrent first requests can't start two
+    embedded servers. A failed connect leaves no client behind (next call retries).
+    """
+    global _client
+    client = _client
+    if client is not None:
+        return client
+    with _client_lock:
+        if _client is None:
+            _client = _connect()
+        return _client
+
+
+def close_client() -> None:
+    """Close the shared client (FastAPI shutdown; also before a reconnect)."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+
+def reconnect_if_unhealthy() -> bool:
+    """
+    Health probe: True if the current client answers /ready; otherwise drop it
+    so the next get_client() reconnects.
+    """
+    client = _client
+    if client is None:
+        return False
+    try:
+        if client.is_ready():
+            return True
+    except Exception:
+        pass
+    close_client()
+    return False
+
+
+def _half_open_probe() -> None:
+    if not reconnect_if_unhealthy():
+        get_client()  # raises while Weaviate is still down → circuit re-opens
+
+
+breaker = CircuitBreaker(
+    "weaviate",
+    failure_threshold=WEAVIATE_BREAKER_FAILURES,
+    reset_seconds=WEAVIATE_BREAKER_RESET_SECONDS,
+    on_half_open=_half_open_probe,
+)
+
+# Decorator for adapter operations: fails fast with CircuitOpen while Weaviate
+# is known to be down, so callers degrade (DB-only scoring) immediately.
+weaviate_op = breaker.guard
+weaviate_op_async = breaker.guard_async
+
+
+def weaviate_health() -> Dict[str, Any]:
+    client = _client
+    try:
+        ready = bool(client.is_ready()) if client is not None else False
+    except Exception:
+        ready = False
+    return {
+        "connected": client is not None,
+        "async_connected": _async_client is not None,
+        "ready": ready,
+        "circuit": breaker.snapshot(),
+    }
+
+
+# ---- Async client (weaviate_investors_async): same server, own connection
+# bound to the serving event loop. Embedded mode: the sync client starts the
+# embedded server; the async client then attaches to its local ports.
+WEAVIATE_EMBEDDED_HTTP_PORT = int(os.getenv("WEAVIATE_EMBEDDED_HTTP_PORT", "8079"))
+WEAVIATE_EMBEDDED_GRPC_PORT = int(os.getenv("WEAVIATE_EMBEDDED_GRPC_PORT", "50050"))
+
+_async_client = None
+_async_loop = None
+_async_lock: "asyncio.Lock | None" = None
+
+
+async def get_async_client():
+    """
+    Singleton WeaviateAsyncClient for the running event loop. The first call
+    also makes sure the sync client exists (schema, embedded server) — in a
+    worker thread, so the loop never blocks on it.
+    """
+    global _async_client, _async_loop, _async_lock
+    loop = asyncio.get_running_loop()
+    client = _async_client
+    if client is not None and _async_loop is loop:
+        return client
+    if _async_lock is None or _async_loop is not loop:
+        _async_lock, _async_loop, _async_client = asyncio.Lock(), loop, None
+    async with _async_lock:
+        if _async_client is None:
+            import weaviate
+            from weaviate.classes.init import AdditionalConfig, Timeout
+
+            await asyncio.to_thread(get_client)
+            embedded = os.getenv("WEAVIATE_EMBEDDED", "1") == "1"
+            client = weaviate.use_async_with_local(
+                port=WEAVIATE_EMBEDDED_HTTP_PORT if embedded else int(os.getenv("WEAVIATE_HTTP_PORT", "8080")),
+                grpc_port=WEAVIATE_EMBEDDED_GRPC_PORT if embedded else int(os.getenv("WEAVIATE_GRPC_PORT", "50051")),
+                additional_config=AdditionalConfig(
+                    timeout=Timeout(
+                        init=WEAVIATE_TIMEOUT_INIT,
+                        query=WEAVIATE_TIMEOUT_QUERY,
+                        insert=WEAVIATE_TIMEOUT_INSERT,
+                    )
+                ),
+            )
+            await client.connect()
+            _async_client = client
+        return _async_client
+
+
+async def close_async_client() -> None:
+    """Close the async client (FastAPI shutdown; also after a failed query)."""
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is not None:
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+
+def hnsw_config(
+    distance: str = WEAVIATE_DISTANCE,
+    ef: int = WEAVIATE_HNSW_EF,
+    ef_construction: int = WEAVIATE_HNSW_EF_CONSTRUCTION,
+    max_connections: int = WEAVIATE_HNSW_MAX_CONNECTIONS,
+    quantizer: str = WEAVIATE_QUANTIZER,
+    pq_segments: int = WEAVIATE_PQ_SEGMENTS,
+):
+    """
+    HNSW vector index config from the WEAVIATE_* settings (arguments override them;
+    scripts/bench_hnsw.py sweeps them). efConstruction, maxConnections, distance and
+    the quantizer are fixed at creation; ef can be changed later (set_query_ef).
+    """
+    from weaviate.classes.config import Configure, VectorDistances
+
+    q = (quantizer or "none").lower()
+    if q == "pq":
+        pq_kw = {"segments": pq_segments} if pq_segments else {}
+        qcfg = Configure.VectorIndex.Quantizer.pq(
+            centroids=WEAVIATE_PQ_CENTROIDS, training_limit=WEAVIATE_QUANTIZER_TRAINING_LIMIT, **pq_kw
+        )
+    elif q == "bq":
+        qcfg = Configure.VectorIndex.Quantizer.bq(rescore_limit=WEAVIATE_RESCORE_LIMIT)
+    elif q == "sq":
+        qcfg = Configure.VectorIndex.Quantizer.sq(
+            rescore_limit=WEAVIATE_RESCORE_LIMIT, training_limit=WEAVIATE_QUANTIZER_TRAINING_LIMIT
+        )
+    elif q == "none":
+        qcfg = None
+    else:
+        raise ValueError(f"Unknown WEAVIATE_QUANTIZER {quantizer!r}; use none, pq, bq or sq")
+
+    return Configure.VectorIndex.hnsw(
+        distance_metric=VectorDistances(distance),
+        ef=ef,
+        ef_construction=ef_construction,
+        max_connections=max_connections,
+        quantizer=qcfg,
+    )
+
+
+def set_query_ef(client, ef: int, name: str = INVESTOR) -> None:
+    """Change the query-time ef of an existing collection (no reindex needed)."""
+    from weaviate.classes.config import Reconfigure
+
+    client.collections.get(name).config.update(
+        vector_index_config=Reconfigure.VectorIndex.hnsw(ef=ef)
+    )
 
 
 def ensure_schema(client):
@@ -51,33 +293,53 @@ def ensure_schema(client):
     - If the collection already exists with different property types (schema drift),
       drop & recreate it (see reset function below).
     """
+    from weaviate.classes.config import Property, DataType, Configure
+
+    if not client.collections.exists(PITCH):
+        # Pitch vectors (pooled deck embeddings) for re-matching and investor → pitch search
+        client.collections.create(
+            name=PITCH,
+            properties=[
+                Property(name="pitch_id", data_type=DataType.INT),
+                Property(name="user_id",  data_type=DataType.INT),
+                Property(name="summary",  data_type=DataType.TEXT),
+            ],
+            vectorizer_config=Configure.Vectorizer.none(),
+            vector_index_config=hnsw_config(),
+        )
+
     if client.collections.exists(INVESTOR):
         return
+    # after a blue/green reindex `Investor` is an alias to Investor_vN (weaviate_reindex)
+    from .weaviate_reindex import alias_target
+
+    if alias_target(client, INVESTOR):
+        return
+
+    create_investor_collection(client, INVESTOR)
+
+
+def create_investor_collection(client, name: str, vector_index_config=None):
+    """
+    Create an Investor-schema collection under `name` (the live collection,
+    benchmark copies, reindex targets).
+    """
+    from weaviate.classes.config import Property, DataType, Configure
 
-    client.collections.create(
-        name=INVESTOR,
-        properties=[
-            Property(name="name",           data_type=DataType.TEXT),
-            Property(name="firm",           data_type=DataType.TEXT),
-            Property(name="sectors",        data_type=DataType.TEXT),
-            Property(name="stages",         data_type=DataType.TEXT),
-            Property(name="geo",            data_type=DataType.TEXT),
-            Property(name="thesis",         data_type=DataType.TEXT),
-            Property(name="constraints",    data_type=DataType.TEXT),
-            Property(name="profile",        data_type=DataType.TEXT),
-
-            Property(name="check_min",      data_type=DataType.NUMBER),
-            Property(name="check_max",      data_type=DataType.NUMBER),
-            Property(name="check_currency", data_type=DataType.TEXT),
-        ],
+    types = {"text": DataType.TEXT, "number": DataType.NUMBER}
+    return client.collections.create(
+        name=name,
+        properties=[Property(name=n, data_type=types[t]) for n, t in INVESTOR_PROPERTIES],
         vectorizer_config=Configure.Vectorizer.none(),
-        vector_index_config=Configure.VectorIndex.hnsw(),
+        vector_index_config=vector_index_config or hnsw_config(),
     )
 
 
 def reset_collection(client):
     """
     Use ONLY if you have schema drift (old types like checkSize TEXT).
+    Drops the live data — prefer `python -m app.utils.reindex_investors`
+    (blue/green, no downtime).
     """
     if client.collections.exists(INVESTOR):
         client.collections.delete(INVESTOR)
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from typing import List, Dict, Any, Optional
-from .weaviate_client import get_client, INVESTOR
+from .weaviate_client import get_client, weaviate_op, INVESTOR
 
 def _dist_to_pct(dist: Optional[float]) -> int:
     """
@@ -21,6 +21,7 @@ def _dist_to_pct(dist: Optional[float]) -> int:
         d = 2.0
     return int(round((1.0 - (d / 2.0)) * 100))
 
+@weaviate_op
 def insert_investor(i: Dict[str, Any], vector: Optional[list]) -> None:
     """
     Insert a single investor object with an optional precomputed vector.
@@ -53,6 +54,7 @@ def _coerce_number(v: Any) -> Optional[float]:
     except Exception:
         return None
 
+@weaviate_op
 def get_investor_by_name(name: str) -> Optional[Dict[str, Any]]:
     """
     Fetch a single investor by exact name. Returns a dict of fields or None if not found.
@@ -89,6 +91,7 @@ def get_investor_by_name(name: str) -> Optional[Dict[str, Any]]:
         "check_currency": p.get("check_currency"),
     }
 
+@weaviate_op
 def search_similar_investors(query_vector: list, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Vector search for nearest investors. Returns a list of dicts with properties plus:
@@ -103,19 +106,64 @@ def search_similar_investors(query_vector: list, limit: int = 10) -> List[Dict[s
         return_metadata=["distance", "certainty"],
     )
 
-    out: List[Dict[str, Any]] = []
-    for o in res.objects or []:
-        p = o.properties or {}
-        dist = getattr(o.metadata, "distance", None)
-        certainty = getattr(o.metadata, "certainty", None)  # 0..1 if available
+    return [_search_hit(o) for o in res.objects or []]
+
+def _search_hit(o) -> Dict[str, Any]:
+    """near_vector result object → card fields + distance + score_pct (sync and async adapters)."""
+    from app.ml.scoring import distance_to_pct  # numpy-backed; not on the boot import path
+
+    p = o.properties or {}
+    dist = getattr(o.metadata, "distance", None)
+    certainty = getattr(o.metadata, "certainty", None)  # 0..1 if available
+
+    # configurable similarity → % window (app.ml.scoring.BlendConfig); certainty = (1 + cos) / 2
+    if dist is not None:
+        score_pct = distance_to_pct(dist)
+    elif certainty is not None:
+        score_pct = distance_to_pct(2.0 - 2.0 * float(certainty))
+    else:
+        score_pct = 0
+
+    return {
+        "name":           p.get("name"),
+        "firm":           p.get("firm"),
+        "sectors":        p.get("sectors"),
+        "stages":         p.get("stages"),
+        "geo":            p.get("geo"),
+        "thesis":         p.get("thesis"),
+        "constraints":    p.get("constraints"),
+        "check_min":      p.get("check_min"),
+        "check_max":      p.get("check_max"),
+        "check_currency": p.get("check_currency"),
+        "distance":       dist,
+        "score_pct":      score_pct,
+    }
+
+def _object_vector(o: Any) -> Optional[list]:
+    """
+    v4 returns vectors as {"default": [...]} (named vectors) — older paths give a list.
+    """
+    v = getattr(o, "vector", None)
+    if isinstance(v, dict):
+        v = v.get("default") or next(iter(v.values()), None)
+    return list(v) if v is not None else None
 
-        score_pct = (
-            int(round(float(certainty) * 100))
-            if certainty is not None
-            else _dist_to_pct(dist)
-        )
 
+@weaviate_op
+def fetch_investor_vectors() -> List[Dict[str, Any]]:
+    """
+    Stream every investor with its stored vector (cursor-based iterator, no offset limits).
+    Returns dicts with the card properties plus `vector`. Used to build local indexes.
+    """
+    coll = get_client().collections.get(INVESTOR)
+    out: List[Dict[str, Any]] = []
+    for o in coll.iterator(include_vector=True):
+        vec = _object_vector(o)
+        if not vec:
+            continue
+        p = o.properties or {}
         out.append({
+            "id":             str(o.uuid),
             "name":           p.get("name"),
             "firm":           p.get("firm"),
             "sectors":        p.get("sectors"),
@@ -126,8 +174,65 @@ def search_similar_investors(query_vector: list, limit: int = 10) -> List[Dict[s
             "check_min":      p.get("check_min"),
             "check_max":      p.get("check_max"),
             "check_currency": p.get("check_currency"),
-            "distance":       dist,
-            "score_pct":      score_pct,
+            "vector":         vec,
         })
+    return out
+
+
+@weaviate_op
+def search_similar_investors_many(
+    query_vectors: List[list], limit: int = 10, max_workers: int = 4
+) -> List[Dict[str, Any]]:
+    """
+    Fan-out near_vector for several query vectors (e.g. all chunks of a deck) and
+    return the union of candidates, each with its stored `vector` so the caller
+    can score every candidate against every query exactly.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    coll = get_client().collections.get(INVESTOR)
 
-    return out
\ No newline at end of file
+    def one(qv: list):
+        return coll.query.near_vector(qv, limit=limit, include_vector=True).objects or []
+
+    seen: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(query_vectors)))) as ex:
+        for objs in ex.map(one, query_vectors):
+            for o in objs:
+                p = o.properties or {}
+                name = (p.get("name") or "").strip()
+                vec = _object_vector(o)
+                if not name or name in seen or not vec:
+                    continue
+                seen[name] = {
+                    "name":           p.get("name"),
+                    "firm":           p.get("firm"),
+                    "sectors":        p.get("sectors"),
+                    "stages":         p.get("stages"),
+                    "geo":            p.get("geo"),
+                    "thesis":         p.get("thesis"),
+                    "constraints":    p.get("constraints"),
+                    "check_min":      p.get("check_min"),
+                    "check_max":      p.get("check_max"),
+                    "check_currency": p.get("check_currency"),
+                    "vector":         vec,
+                }
+    return list(seen.values())
+
+
+@weaviate_op
+def get_investor_vector(name: str) -> Optional[list]:
+    """
+    Stored vector of one investor (exact name match), or None.
+    """
+    from weaviate.classes.query import Filter
+
+    coll = get_client().collections.get(INVESTOR)
+    res = coll.query.fetch_objects(
+        filters=Filter.by_property("name").equal(name),
+        limit=1,
+        include_vector=True,
+    )
+    if not res.objects:
+        return None
+    return _object_vector(res.objects[0])
@@ -0,0 +1,62 @@
+# app/adapters/vector/weaviate_investors_async.py
+"""
+Async counterparts of the read paths in weaviate_investors, for async routes
+that overlap the vector query with other work (asyncio.gather) instead of
+blocking the event loop on it. Same return shapes; same circuit breaker.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from .weaviate_client import INVESTOR, close_async_client, get_async_client, weaviate_op_async
+from .weaviate_investors import _search_hit
+
+
+async def _collection():
+    return (await get_async_client()).collections.get(INVESTOR)
+
+
+@weaviate_op_async
+async def search_similar_investors(query_vector: list, limit: int = 10) -> List[Dict[str, Any]]:
+    """Async weaviate_investors.search_similar_investors (distance + score_pct per hit)."""
+    coll = await _collection()
+    try:
+        res = await coll.query.near_vector(
+            query_vector,
+            limit=limit,
+            return_metadata=["distance", "certainty"],
+        )
+    except Exception:
+        # drop a possibly broken connection; the next call reconnects
+        await close_async_client()
+        raise
+    return [_search_hit(o) for o in res.objects or []]
+
+
+@weaviate_op_async
+async def get_investor_by_name(name: str) -> Optional[Dict[str, Any]]:
+    """Async weaviate_investors.get_investor_by_name (exact name match or None)."""
+    from weaviate.classes.query import Filter
+
+    coll = await _collection()
+    try:
+        res = await coll.query.fetch_objects(limit=1, filters=Filter.by_property("name").equal(name))
+    except Exception:
+        await close_async_client()
+        raise
+    if not res.objects:
+        return None
+    p = res.objects[0].properties or {}
+    return {
+        "name":           p.get("name"),
+        "firm":           p.get("firm"),
+        "sectors":        p.get("sectors"),
+        "stages":         p.get("stages"),
+        "geo":            p.get("geo"),
+        "thesis":         p.get("thesis"),
+        "constraints":    p.get("constraints"),
+        "profile":        p.get("profile"),
+        "check_min":      p.get("check_min"),
+        "check_max":      p.get("check_max"),
+        "check_currency": p.get("check_currency"),
+    }
@@ -0,0 +1,104 @@
+# app/adapters/vector/weaviate_pitches.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence
+
+from .weaviate_client import get_client, weaviate_op, PITCH
+from .weaviate_investors import _dist_to_pct, _object_vector
+
+# stored alongside the vector for display only; the full text lives in Pitch.summary
+SUMMARY_MAX_CHARS = 2000
+
+
+def pitch_uuid(pitch_id: int) -> str:
+    """
+    Deterministic object id → upserts are idempotent and Pitch.vector_id is stable.
+    """
+    from weaviate.util import generate_uuid5
+
+    return str(generate_uuid5(f"pitch:{pitch_id}"))
+
+
+@weaviate_op
+def upsert_pitch(pitch_id: int, user_id: int, summary: str, vector: list) -> str:
+    """
+    Insert or replace the pooled embedding of a pitch. Returns the Weaviate object id.
+    """
+    coll = get_client().collections.get(PITCH)
+    oid = pitch_uuid(pitch_id)
+    props = {
+        "pitch_id": int(pitch_id),
+        "user_id":  int(user_id),
+        "summary":  (summary or "")[:SUMMARY_MAX_CHARS],
+    }
+    if coll.data.exists(oid):
+        coll.data.replace(uuid=oid, properties=props, vector=vector)
+    else:
+        coll.data.insert(props, uuid=oid, vector=vector)
+    return oid
+
+
+@weaviate_op
+def get_pitch_vectors(pitch_ids: Sequence[int]) -> Dict[int, list]:
+    """
+    Stored vectors for the given pitch ids (missing ids are simply absent).
+    One filtered fetch per call — no PDF parsing, no embedding.
+    """
+    from weaviate.classes.query import Filter
+
+    ids = [int(i) for i in pitch_ids]
+    if not ids:
+        return {}
+    coll = get_client().collections.get(PITCH)
+    # object ids are uuid5(pitch_id) → filter on the primary key, not the int property
+    res = coll.query.fetch_objects(
+        filters=Filter.by_id().contains_any([pitch_uuid(i) for i in ids]),
+        limit=len(ids),
+        include_vector=True,
+    )
+    out: Dict[int, list] = {}
+    for o in res.objects or []:
+        pid = (o.properties or {}).get("pitch_id")
+        vec = _object_vector(o)
+        if pid is not None and vec:
+            out[int(pid)] = vec
+    return out
+
+
+@weaviate_op
+def search_pitches(query_vector: list, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Nearest pitches to a vector (e.g. an investor's profile vector).
+    Returns pitch_id, user_id, summary, distance and a 0..100 score_pct.
+    """
+    coll = get_client().collections.get(PITCH)
+    res = coll.query.near_vector(
+        query_vector,
+        limit=limit,
+        return_metadata=["distance", "certainty"],
+    )
+    out: List[Dict[str, Any]] = []
+    for o in res.objects or []:
+        p = o.properties or {}
+        dist = getattr(o.metadata, "distance", None)
+        certainty = getattr(o.metadata, "certainty", None)
+        out.append({
+            "pitch_id":  p.get("pitch_id"),
+            "user_id":   p.get("user_id"),
+            "summary":   p.get("summary"),
+            "distance":  dist,
+            "score_pct": (
+                int(round(float(certainty) * 100))
+                if certainty is not None
+                else _dist_to_pct(dist)
+            ),
+        })
+    return out
+
+
+@weaviate_op
+def delete_pitch(pitch_id: int) -> None:
+    coll = get_client().collections.get(PITCH)
+    oid = pitch_uuid(pitch_id)
+    if coll.data.exists(oid):
+        coll.data.delete_by_id(oid)
@@ -0,0 +1,266 @@
+# app/adapters/vector/weaviate_reindex.py
+"""
+Blue/green reindexing of the Investor collection.
+
+Readers always address the collection as `Investor`. After the first reindex
+that name is a Weaviate alias pointing at a versioned collection `Investor_vN`:
+
+  1. build `Investor_v{N+1}` with the current schema / HNSW settings, copying
+     objects (same uuids) from the live version — or re-embedding them when the
+     embedding model changed — in throttled batches
+  2. verify: object counts match, and a sample of queries against the new
+     version agrees with the live one (or, after re-embedding, finds itself)
+  3. point the alias at the new version (one atomic server-side update)
+
+Reads keep hitting the old version until step 3; the previous version is kept
+for `rollback`. Aliases need Weaviate >= 1.32.
+
+The very first run migrates a plain `Investor` collection: the name can't be a
+collection and an alias at the same time, so the old collection is dropped and
+the alias created right after — a gap of one request round-trip, during which
+routes fall back to DB-only scoring.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .weaviate_client import INVESTOR, INVESTOR_PROPERTIES, create_investor_collection, get_client
+
+log = logging.getLogger(__name__)
+
+REINDEX_BATCH_SIZE = int(os.getenv("REINDEX_BATCH_SIZE", "200"))
+# throttle so the rebuild doesn't starve live queries (objects per second, 0 = unthrottled)
+REINDEX_MAX_OBJECTS_PER_SECOND = float(os.getenv("REINDEX_MAX_OBJECTS_PER_SECOND", "500"))
+REINDEX_VERIFY_SAMPLE = int(os.getenv("REINDEX_VERIFY_SAMPLE", "20"))
+# mean top-k overlap required between old and new version (copy mode)
+REINDEX_MIN_OVERLAP = float(os.getenv("REINDEX_MIN_OVERLAP", "0.8"))
+REINDEX_KEEP_VERSIONS = int(os.getenv("REINDEX_KEEP_VERSIONS", "2"))
+
+_VERSION_RE = re.compile(rf"^{INVESTOR}_v(\d+)$")
+
+Progress = Callable[[int], None]
+
+
+class ReindexError(Exception):
+    pass
+
+
+# ----------------------------
+# Alias / version bookkeeping
+# ----------------------------
+
+def alias_target(client, alias: str = INVESTOR) -> Optional[str]:
+    """Collection the alias points at, or None (no alias / server without aliases)."""
+    try:
+        a = client.alias.get(alias_name=alias)
+    except Exception:
+        return None
+    return getattr(a, "collection", None) if a else None
+
+
+def live_collection(client) -> Optional[str]:
+    target = alias_target(client)
+    if target:
+        return target
+    return INVESTOR if client.collections.exists(INVESTOR) else None
+
+
+def list_versions(client) -> List[int]:
+    names = client.collections.list_all(simple=True)
+    return sorted(int(m.group(1)) for n in names if (m := _VERSION_RE.match(str(n))))
+
+
+def version_name(n: int) -> str:
+    return f"{INVESTOR}_v{n}"
+
+
+def switch_alias(client, target: str) -> None:
+    """Atomically point `Investor` at `target` (migrating a plain collection on first use)."""
+    if alias_target(client):
+        client.alias.update(alias_name=INVESTOR, new_target_collection=target)
+        return
+    if client.collections.exists(INVESTOR):
+        log.warning("Migrating plain collection %s to an alias (brief gap)", INVESTOR)
+        client.collections.delete(INVESTOR)
+    client.alias.create(alias_name=INVESTOR, target_collection=target)
+
+
+# ----------------------------
+# Build / verify
+# ----------------------------
+
+def investor_embedding_text(props: Dict[str, Any]) -> str:
+    """Text an investor vector is computed from: `profile`, else the card fields."""
+    profile = (props.get("profile") or "").strip()
+    if profile:
+        return profile
+    parts = [props.get(k) for k in ("sectors", "stages", "geo", "thesis", "constraints")]
+    return " | ".join(p for p in parts if p) or (props.get("name") or "")
+
+
+def _count(coll) -> int:
+    return int(coll.aggregate.over_all(total_count=True).total_count or 0)
+
+
+def build_version(
+    client,
+    source: str,
+    target: str,
+    reembed: bool = False,
+    batch_size: int = REINDEX_BATCH_SIZE,
+    max_per_second: float = REINDEX_MAX_OBJECTS_PER_SECOND,
+    progress: Optional[Progress] = None,
+) -> int:
+    """
+    Copy every object of `source` into a new collection `target` (same uuids).
+    With `reembed`, vectors are recomputed with the current embedding backend.
+    """
+    src = client.collections.get(source)
+    dst = create_investor_collection(client, target)
+    keys = [k for k, _t in INVESTOR_PROPERTIES]
+
+    copied = 0
+    started = time.perf_counter()
+    buf: List[Any] = []
+
+    def flush() -> None:
+        nonlocal copied
+        if not buf:
+            return
+        vectors: List[Optional[list]]
+        if reembed:
+            from app.ml.embeddings import embed_texts
+
+            vectors = embed_texts([investor_embedding_text(o.properties or {}) for o in buf])
+        else:
+            from .weaviate_investors import _object_vector
+
+            vectors = [_object_vector(o) for o in buf]
+        with dst.batch.fixed_size(batch_size=len(buf), concurrent_requests=1) as batch:
+            for o, vec in zip(buf, vectors):
+                p = o.properties or {}
+                batch.add_object(properties={k: p.get(k) for k in keys}, uuid=o.uuid, vector=vec)
+        failed = dst.batch.failed_objects or []
+        if failed:
+            raise ReindexError(f"{len(failed)} objects failed to insert into {target}: {failed[0]}")
+        copied += len(buf)
+        buf.clear()
+        if progress:
+            progress(copied)
+        if max_per_second > 0:
+            # throttle: never run ahead of the allowed average rate
+            ahead = copied / max_per_second - (time.perf_counter() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    for o in src.iterator(include_vector=not reembed):
+        buf.append(o)
+        if len(buf) >= batch_size:
+            flush()
+    flush()
+    return copied
+
+
+def verify_version(
+    client,
+    source: str,
+    target: str,
+    reembed: bool = False,
+    sample: int = REINDEX_VERIFY_SAMPLE,
+    k: int = 10,
+    min_overlap: float = REINDEX_MIN_OVERLAP,
+) -> Dict[str, Any]:
+    """
+    Counts must match. Copy mode: top-k neighbours of sampled stored vectors must
+    overlap between versions. Re-embed mode (old vectors aren't comparable):
+    every sampled object must find itself in its own top-k in the new version.
+    """
+    from .weaviate_investors import _object_vector
+
+    src, dst = client.collections.get(source), client.collections.get(target)
+    n_src, n_dst = _count(src), _count(dst)
+    report: Dict[str, Any] = {"source": source, "target": target, "source_count": n_src, "target_count": n_dst}
+    if n_src != n_dst:
+        raise ReindexError(f"count mismatch: {source}={n_src} {target}={n_dst}")
+
+    probe = dst if reembed else src
+    objs = probe.query.fetch_objects(limit=max(1, sample), include_vector=True).objects or []
+    scores: List[float] = []
+    for o in objs:
+        vec = _object_vector(o)
+        if not vec:
+            continue
+        new_ids = [x.uuid for x in dst.query.near_vector(vec, limit=k).objects or []]
+        if reembed:
+            scores.append(1.0 if o.uuid in new_ids else 0.0)
+        else:
+            old_ids = [x.uuid for x in src.query.near_vector(vec, limit=k).objects or []]
+            scores.append(len(set(old_ids) & set(new_ids)) / max(1, len(old_ids)))
+    agreement = sum(scores) / len(scores) if scores else 1.0
+    report.update(sampled=len(scores), agreement=round(agreement, 4))
+    if agreement < min_overlap:
+        raise ReindexError(f"query agreement {agreement:.2f} < {min_overlap} ({report})")
+    return report
+
+
+def prune_versions(client, keep: int = REINDEX_KEEP_VERSIONS) -> List[str]:
+    """Delete old versions, never the live one; keeps the newest `keep`."""
+    live = alias_target(client)
+    dropped = []
+    for n in list_versions(client)[: -max(1, keep)]:
+        name = version_name(n)
+        if name != live:
+            client.collections.delete(name)
+            dropped.append(name)
+    return dropped
+
+
+def reindex_investors(
+    reembed: bool = False,
+    verify: bool = True,
+    switch: bool = True,
+    progress: Optional[Progress] = None,
+) -> Dict[str, Any]:
+    """
+    Build the next Investor version from the live one, verify it, switch the alias.
+    On any failure the half-built version is dropped and the live one is untouched.
+    """
+    client = get_client()
+    source = live_collection(client)
+    if source is None:
+        raise ReindexError(f"No live {INVESTOR} collection to reindex from")
+    versions = list_versions(client)
+    target = version_name((versions[-1] + 1) if versions else 1)
+
+    t0 = time.perf_counter()
+    try:
+        copied = build_version(client, source, target, reembed=reembed, progress=progress)
+        report = verify_version(client, source, target, reembed=reembed) if verify else {}
+    except Exception:
+        if client.collections.exists(target):
+            client.collections.delete(target)
+        raise
+    report.update(source=source, target=target, copied=copied,
+                  build_seconds=round(time.perf_counter() - t0, 1), switched=False)
+
+    if switch:
+        switch_alias(client, target)
+        report["switched"] = True
+        report["pruned"] = prune_versions(client)
+    return report
+
+
+def rollback(client=None) -> str:
+    """Point the alias back at the previous version (kept by prune_versions)."""
+    client = client or get_client()
+    m = _VERSION_RE.match(alias_target(client) or "")
+    older = [n for n in list_versions(client) if m and n < int(m.group(1))]
+    if not older:
+        raise ReindexError("No previous version to roll back to")
+    target = version_name(older[-1])
+    switch_alias(client, target)
+    return target
@@ -1,10 +1,19 @@
 from fastapi import APIRouter, HTTPException, Header, Depends, Form
 from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.v1.schemas import RegisterReq, LoginReq, User
-from app.core.security import hash_password, verify_password, create_access_token, decode_token
-from app.db.core import get_session
+from app.config import settings
+from app.core import auth_cache
+from app.core.auth_cache import (
+    CachedUser, cache_user, claims_revoked, claims_revoked_async, get_cached_user, invalidate_user, revoke_user,
+)
+from app.core.password_pool import PasswordPoolBusy, hash_password_async, verify_and_maybe_rehash
+from app.core.security import create_access_token, decode_token
+from app.db.core import get_async_session, get_session
 from app.db.models import User as UserModel
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -12,43 +21,172 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 def _get_user_by_email(db: Session, email: str) -> Optional[UserModel]:
     return db.exec(select(UserModel).where(UserModel.email == email)).first()
 
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Authentication is busy, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+async def _get_user_by_email_async(db: AsyncSession, email: str) -> Optional[UserModel]:
+    return (await db.exec(select(UserModel).where(UserModel.email == email))).first()
+
+async def _check_credentials(db: AsyncSession, email: str, password: str) -> UserModel:
+    u = await _get_user_by_email_async(db, email)
+    if not u:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        ok, new_hash = await verify_and_maybe_rehash(password, u.hashed_password)
+    except PasswordPoolBusy:
+        raise _busy()
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made → upgrade transparently
+        u.hashed_password = new_hash
+        db.add(u)
+        await db.commit()
+        await db.refresh(u)
+    return u
+
 @router.post("/register")
-def register(req: RegisterReq, db: Session = Depends(get_session)):
-    if _get_user_by_email(db, req.email):
+async def register(req: RegisterReq, db: AsyncSession = Depends(get_async_session)):
+    if await _get_user_by_email_async(db, req.email):
         raise HTTPException(status_code=400, detail="User exists")
-    u = UserModel(email=req.email, hashed_password=hash_password(req.password))
+    try:
+        hashed = await hash_password_async(req.password)
+    except PasswordPoolBusy:
+        raise _busy()
+    u = UserModel(email=req.email, hashed_password=hashed)
     db.add(u)
-    db.commit()
-    db.refresh(u)
+    await db.commit()
     return {"ok": True}
 
 @router.post("/login")
-def login(req: LoginReq, db: Session = Depends(get_session)):
-    u = _get_user_by_email(db, req.email)
-    if not u or not verify_password(req.password, u.hashed_password):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = create_access_token(sub=u.email)
+async def login(req: LoginReq, db: AsyncSession = Depends(get_async_session)):
+    u = await _check_credentials(db, req.email, req.password)
+    token = create_access_token(sub=u.email, uid=u.id, role=u.role)
     return {"access_token": token, "token_type": "bearer"}
 
 @router.post("/login-form")
-def login_form(username: str = Form(...), password: str = Form(...), db: Session = Depends(get_session)):
-    u = _get_user_by_email(db, username)
-    if not u or not verify_password(password, u.hashed_password):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = create_access_token(sub=u.email)
+async def login_form(
+    username: str = Form(...), password: str = Form(...), db: AsyncSession = Depends(get_async_session)
+):
+    u = await _check_credentials(db, username, password)
+    token = create_access_token(sub=u.email, uid=u.id, role=u.role)
     return {"access_token": token, "token_type": "bearer"}
 
+def _trustable(payload: dict) -> bool:
+    """AUTH_TRUST_TOKEN_CLAIMS and a token that carries everything needed to skip the lookup."""
+    return settings.auth_trust_token_claims and all(
+        payload.get(k) is not None for k in ("uid", "sub", "role", "iat")
+    )
+
+def _resolve_user(db: Session, payload: dict) -> Optional[CachedUser]:
+    """
+    Map verified token claims to a user. Prefers the `uid` claim (primary-key lookup),
+    falls back to `sub` (email) for tokens issued before `uid` existed.
+    """
+    email = payload.get("sub")
+    uid = payload.get("uid")
+    if _trustable(payload) and claims_revoked(uid, float(payload["iat"])) is False:
+        return CachedUser(user_id=str(uid), email=email, role=payload["role"])
+
+    u = None
+    if uid is not None:
+        try:
+            u = db.get(UserModel, int(uid))
+        except (TypeError, ValueError):
+            u = None
+    if u is None and email:
+        u = _get_user_by_email(db, email)
+    if not u:
+        return None
+    return CachedUser(user_id=str(u.id), email=u.email, role=u.role)
+
 def get_current_user(authorization: Optional[str] = Header(default=None), db: Session = Depends(get_session)) -> User:
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="Missing bearer token")
     token = authorization.split(" ", 1)[1]
-    payload = decode_token(token)
+
+    # Hot path: token verified recently → no decode, no DB
+    cached = get_cached_user(token)
+    if cached:
+        return User(id=cached.user_id, email=cached.email, role=cached.role)
+
+    try:
+        payload = decode_token(token)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    cu = _resolve_user(db, payload)
+    if not cu:
+        raise HTTPException(status_code=401, detail="User not found")
+    cache_user(token, cu, token_exp=payload.get("exp"))
+    return User(id=cu.user_id, email=cu.email, role=cu.role)
+
+async def _resolve_user_async(db, payload: dict) -> Optional[CachedUser]:
+    """_resolve_user on an AsyncSession."""
     email = payload.get("sub")
-    u = _get_user_by_email(db, email)
+    uid = payload.get("uid")
+    if _trustable(payload) and await claims_revoked_async(uid, float(payload["iat"])) is False:
+        return CachedUser(user_id=str(uid), email=email, role=payload["role"])
+
+    u = None
+    if uid is not None:
+        try:
+            u = await db.get(UserModel, int(uid))
+        except (TypeError, ValueError):
+            u = None
+    if u is None and email:
+        u = await _get_user_by_email_async(db, email)
     if not u:
+        return None
+    return CachedUser(user_id=str(u.id), email=u.email, role=u.role)
+
+async def get_current_user_async(
+    authorization: Optional[str] = Header(default=None), db=Depends(get_async_session)
+) -> User:
+    """
+    get_current_user for `async def` routes: same token cache; a miss awaits
+    the user lookup instead of blocking a threadpool thread. (The session only
+    checks out a connection if the lookup actually runs.)
+    """
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    token = authorization.split(" ", 1)[1]
+
+    cached = get_cached_user(token)
+    if cached:
+        return User(id=cached.user_id, email=cached.email, role=cached.role)
+
+    try:
+        payload = decode_token(token)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    cu = await _resolve_user_async(db, payload)
+    if not cu:
         raise HTTPException(status_code=401, detail="User not found")
-    return User(id=str(u.id), email=u.email)
+    cache_user(token, cu, token_exp=payload.get("exp"))
+    return User(id=cu.user_id, email=cu.email, role=cu.role)
+
+# Invalidation hook: any update/delete of a user row (role change, deletion,
+# password reset) drops that user's cached tokens in this process.
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    invalidate_user(user_id=target.id, email=target.email)
+    revoke_user(target.id)  # trusted-claims path: every worker stops trusting older tokens
+
+# Bulk update()/delete() statements skip the mapper events above: revoke everyone.
+@event.listens_for(OrmSession, "do_orm_execute")
+def _invalidate_on_bulk_user_write(state):
+    if not (state.is_update or state.is_delete):
+        return
+    mapper = getattr(state, "bind_mapper", None)
+    if mapper is not None and mapper.class_ is UserModel:
+        auth_cache.clear()
+        revoke_user(None)
 
 @router.get("/me", response_model=User)
-def me(user: User = Depends(get_current_user)):
+async def me(user: User = Depends(get_current_user_async)):
     return user
\ No newline at end of file
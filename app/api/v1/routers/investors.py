@@ -4,21 +4,55 @@ from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from prometheus_client import Histogram
+import asyncio
+import json
+import os
 import re
+import time
 
 # Caching helpers
-from app.cache import cache_get, cache_set, cache_delete_prefix
+from app.cache import cache_delete_prefix, cache_get_async, cache_set_async
 
 # Use your single current-user helper (from auth router)
-from .auth import get_current_user
+from .auth import get_current_user, get_current_user_async
 
 from app.adapters.vector.weaviate_client import get_client, INVESTOR
+from app.adapters.vector.weaviate_investors import get_investor_vector
+from app.adapters.vector.weaviate_pitches import search_pitches
+from app.core import corpus_version
+from app.core.http_cache import ValidatorMemo, answer_not_modified, strong_etag, validator_headers
+from app.core.streaming import ndjson_response, sse_response
 from app.db.models import Investor, QAResponse
-from app.db.core import get_session
+from app.db.core import engine, get_async_read_session, get_session, read_engine
+from app.ml.chunking import chunk_text
 from app.ml.embeddings import embed_texts, embed_text
 
 router = APIRouter(prefix="/investors", tags=["investors"])
 
+# chat model for streamed QA answers (e.g. gpt-4o-mini; needs OPENAI_API_KEY);
+# empty → the templated answer is streamed word by word
+QA_LLM_MODEL = os.getenv("QA_LLM_MODEL", "")
+QA_LLM_TIMEOUT_SECONDS = float(os.getenv("QA_LLM_TIMEOUT_SECONDS", "30"))
+
+STREAM_TTFT = Histogram(
+    "stream_time_to_first_token_seconds",
+    "Request start → first answer token / agent event on streaming routes",
+    ["route", "source"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20),
+)
+STREAM_DURATION = Histogram(
+    "stream_duration_seconds", "Request start → last event on streaming routes", ["route", "source"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60),
+)
+
+# ORM writes to Investor → new corpus version (cached profiles / ETags roll over)
+corpus_version.track(Investor, "investors")
+_validators = ValidatorMemo()
+
 # =========================
 # Utility helpers
 # =========================
@@ -41,23 +75,6 @@ def _cos_sim(a, b):
     return sum(x * y for x, y in zip(a, b))
 
 
-def split_paragraphs(text: str, max_len: int = 600) -> List[str]:
-    if not text:
-        return []
-    raw = [p.strip() for p in text.replace("\r", "").split("\n") if p.strip()]
-    out, buf = [], ""
-    for p in raw:
-        if len(buf) + 1 + len(p) < max_len:
-            buf = (buf + " " + p).strip()
-        else:
-            if buf:
-                out.append(buf)
-            buf = p
-    if buf:
-        out.append(buf)
-    return out
-
-
 def _tokenize(s: str) -> List[str]:
     return re.findall(r"[a-zA-Z0-9]+", (s or "").lower())
 
@@ -215,47 +232,116 @@ class IngestReq(BaseModel):
 # =========================
 
 
+def _json_bytes(data: Any) -> bytes:
+    return json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+
+
+async def _conditional(request: Request, route: str, memo_key: Any, cache_key: str, build) -> Response:
+    """
+    Corpus-versioned read: 304 from the in-process validator memo (no Redis,
+    no DB; entries expire after HTTP_VALIDATOR_MEMO_MAX_AGE_SECONDS), else
+    cached bytes, else `build()` → body bytes (cached).
+    """
+    version = await corpus_version.current_async("investors")
+    key = (version.token, memo_key)
+    resp = answer_not_modified(request, route, _validators.get(key))
+    if resp is not None:
+        return resp
+
+    cache_key = f"{cache_key}:{version.token}"
+    cached = await cache_get_async(cache_key)
+    if cached:
+        body, cost = cached["body"].encode(), cached.get("cost", 0.0)
+    else:
+        t0 = time.perf_counter()
+        body = await build()
+        cost = time.perf_counter() - t0
+        await cache_set_async(cache_key, {"body": body.decode(), "cost": cost}, ttl_seconds=300)
+
+    # a worker-local version never sees other workers' writes → ETag only
+    headers = validator_headers(strong_etag(body), version.updated_at if version.shared else None)
+    resp = answer_not_modified(request, route, _validators.put(key, headers, len(body), cost))
+    if resp is not None:
+        return resp
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/", response_model=list[Investor])
-def list_investors(db: Session = Depends(get_session)):
+async def list_investors(request: Request, db: AsyncSession = Depends(get_async_read_session)):
     """
-    Frequently-called, read-heavy endpoint.
-    Cache in Redis for a short TTL to offload DB.
+    Frequently-called, read-heavy endpoint. Cached per investor-corpus version
+    (Redis); revalidating clients get 304 via ETag / Last-Modified.
     """
-    cache_key = "investors:all"
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return [Investor(**row) for row in cached]
+    async def build() -> bytes:
+        rows = (await db.exec(select(Investor))).all()
+        return _json_bytes([r.dict() for r in rows])
 
-    rows = db.exec(select(Investor)).all()
-    cache_set(cache_key, [r.dict() for r in rows], ttl_seconds=60)
-    return rows
+    return await _conditional(request, "/investors/", "all", "investors:all", build)
 
 
 @router.get("/{name}")
-def get_investor(
-    name: str, u=Depends(get_current_user), db: Session = Depends(get_session)
+async def get_investor(
+    name: str,
+    request: Request,
+    u=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_session),
 ):
     """
-    Single investor profile, cached per name.
+    Single investor profile, cached per name and corpus version.
     """
     key = name.strip().lower()
-    cache_key = f"investor:{key}"
-    cached = cache_get(cache_key)
-    if cached is not None:
-        return cached
 
-    inv_row = db.exec(select(Investor).where(Investor.name == name)).first()
-    if inv_row:
-        data = inv_row.dict()
-        cache_set(cache_key, data, ttl_seconds=300)
-        return data
+    async def build() -> bytes:
+        inv_row = (await db.exec(select(Investor).where(Investor.name == name))).first()
+        if inv_row:
+            return _json_bytes(inv_row.dict())
+        # Weaviate fallback (sync client) off the event loop
+        props = await asyncio.to_thread(_get_investor_object_by_name, name)
+        if not props:
+            raise HTTPException(status_code=404, detail="Investor not found")
+        return _json_bytes(props)
+
+    return await _conditional(request, "/investors/{name}", key, f"investor:{key}", build)
 
-    props = _get_investor_object_by_name(name)
-    if not props:
-        raise HTTPException(status_code=404, detail="Investor not found")
 
-    cache_set(cache_key, props, ttl_seconds=300)
-    return props
+# roles allowed to browse founders' pitches
+PITCH_SEARCH_ROLES = {"investor", "analyst", "admin"}
+
+
+@router.get("/{name}/pitches")
+def best_pitches_for_investor(
+    name: str,
+    limit: int = 10,
+    u=Depends(get_current_user),
+    db: Session = Depends(get_session),
+):
+    """
+    Reverse match: which stored pitches best fit this investor.
+    Uses the investor's stored vector against the Pitch collection (same ANN index
+    type as investor matching); falls back to embedding the DB profile.
+    """
+    if (u.role or "") not in PITCH_SEARCH_ROLES:
+        raise HTTPException(status_code=403, detail="Not allowed to browse pitches")
+
+    try:
+        vec = get_investor_vector(name)
+    except Exception:
+        vec = None
+    if not vec:
+        inv_row = db.exec(select(Investor).where(Investor.name == name)).first()
+        if not inv_row:
+            raise HTTPException(status_code=404, detail="Investor not found")
+        profile = " | ".join(
+            filter(None, [inv_row.sectors, inv_row.stages, inv_row.geo,
+                          inv_row.thesis, inv_row.constraints])
+        )
+        vec = embed_text(profile or inv_row.name)
+
+    try:
+        hits = search_pitches(vec, limit=max(1, min(limit, 100)))
+    except Exception:
+        raise HTTPException(status_code=503, detail="Vector search unavailable")
+    return {"investor": name, "pitches": hits}
 
 
 @router.post("/ingest")
@@ -334,20 +420,35 @@ def ingest_investors(
 # =========================
 
 
+def _load_investor(db: Session, name: str) -> Dict[str, Any]:
+    """Investor as a dict: DB row, else the Weaviate object; 404 if neither."""
+    inv_row = db.exec(select(Investor).where(Investor.name == name)).first()
+    inv = inv_row.dict() if inv_row else _get_investor_object_by_name(name)
+    if not inv:
+        raise HTTPException(status_code=404, detail="Investor not found")
+    return inv
+
+
+def _load_investor_standalone(name: str) -> Dict[str, Any]:
+    # streaming routes: runs in a worker thread with its own (read) session
+    with Session(read_engine) as s:
+        return _load_investor(s, name)
+
+
 @router.post("/analyze")
 def analyze_investor(
     payload: AnalyzeReq,
     u=Depends(get_current_user),
     db: Session = Depends(get_session),
 ):
-    inv_row = db.exec(select(Investor).where(Investor.name == payload.name)).first()
-    inv = inv_row.dict() if inv_row else _get_investor_object_by_name(payload.name)
-    if not inv:
-        raise HTTPException(status_code=404, detail="Investor not found")
+    inv = _load_investor(db, payload.name)
+    return _analysis(inv, payload.pitch_summary or "")
 
+
+def _analysis(inv: Dict[str, Any], pitch_summary: str) -> Dict[str, Any]:
     inv = _normalize_money(inv)
 
-    pitch = (payload.pitch_summary or "").strip()
+    pitch = pitch_summary.strip()
     sectors = _split_csvlike(inv.get("sectors", ""))
     stages = _split_csvlike(inv.get("stages", ""))
     geos = _split_csvlike(inv.get("geo", "") or inv.get("geo_include", ""))
@@ -440,7 +541,7 @@ def _investor_chunks(inv: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
         t = (text or "").strip()
         if not t:
             return
-        for ch in split_paragraphs(t, max_len=500):
+        for ch in chunk_text(t):
             parts.append(
                 (
                     ch,
@@ -475,7 +576,7 @@ def _pitch_chunks(pitch_summary: str) -> List[Tuple[str, Dict[str, Any]]]:
     if not pitch_summary:
         return []
     out: List[Tuple[str, Dict[str, Any]]] = []
-    for ch in split_paragraphs(pitch_summary, max_len=500):
+    for ch in chunk_text(pitch_summary):
         out.append(
             (
                 ch,
@@ -618,22 +719,8 @@ def _compose_answer(
     return " | ".join(overview_bits)
 
 
-@router.post("/qa")
-def qa_investor(
-    payload: QAReq,
-    u=Depends(get_current_user),
-    db: Session = Depends(get_session),
-):
-    # Prefer DB; fallback to vector
-    inv_row = db.exec(select(Investor).where(Investor.name == payload.name)).first()
-    inv = inv_row.dict() if inv_row else _get_investor_object_by_name(payload.name)
-    if not inv:
-        raise HTTPException(status_code=404, detail="Investor not found")
-
-    question = (payload.question or "").strip()
-    if not question:
-        raise HTTPException(status_code=400, detail="Question is required")
-
+def _qa_retrieve(inv: Dict[str, Any], payload: QAReq, question: str) -> Tuple[str, str, List[Dict[str, Any]]]:
+    """(mode, intent, ranked citations) for a question about `inv`."""
     mode = _choose_mode(payload.mode, question)
 
     # Build corpora per mode
@@ -660,25 +747,190 @@ def qa_investor(
                 if len(ranked) >= N:
                     break
 
-    # Compose an intent-specific answer
-    intent = _classify_intent(question)
-    answer = _compose_answer(inv, mode, intent, ranked, payload.pitch_summary or "")
+    return mode, _classify_intent(question), ranked
 
-    # persist QA
+
+def _save_qa(db: Session, investor_name: str, user_id: int, question: str, answer: str) -> None:
     db.add(
         QAResponse(
-            investor_name=inv.get("name") or payload.name,
-            user_id=u.id,
+            investor_name=investor_name,
+            user_id=user_id,
             question=question,
             answer=answer,
         )
     )
     db.commit()
 
+
+def _save_qa_standalone(*args: Any) -> None:
+    with Session(engine) as s:
+        _save_qa(s, *args)
+
+
+@router.post("/qa")
+def qa_investor(
+    payload: QAReq,
+    u=Depends(get_current_user),
+    db: Session = Depends(get_session),
+):
+    # Prefer DB; fallback to vector
+    inv = _load_investor(db, payload.name)
+
+    question = (payload.question or "").strip()
+    if not question:
+        raise HTTPException(status_code=400, detail="Question is required")
+
+    mode, intent, ranked = _qa_retrieve(inv, payload, question)
+
+    # Compose an intent-specific answer
+    answer = _compose_answer(inv, mode, intent, ranked, payload.pitch_summary or "")
+
+    # persist QA
+    _save_qa(db, inv.get("name") or payload.name, u.id, question, answer)
+
     return {
         "answer": answer,
         "snippets": [{"text": r["text"], "score": r["score"]} for r in ranked],
         "citations": ranked,  # includes {source,title,field}
         "mode": mode,
         "intent": intent,
-    }
\ No newline at end of file
+    }
+
+
+# =========================
+# Streaming variants (SSE / NDJSON)
+# =========================
+
+_llm_client = None
+
+
+def _stream_response(events, format: str):
+    if format == "ndjson":
+        return ndjson_response(events)
+    if format != "sse":
+        raise HTTPException(status_code=400, detail="format must be 'sse' or 'ndjson'.")
+    return sse_response(events)
+
+
+def _template_tokens(answer: str):
+    # word-sized pieces (whitespace kept) so clients render the same way for template and LLM answers
+    return re.findall(r"\s*\S+\s*", answer) or [answer]
+
+
+async def _llm_tokens(inv: Dict[str, Any], question: str, ranked: List[Dict[str, Any]], mode: str):
+    """Answer tokens from QA_LLM_MODEL, grounded in (and told to cite) the retrieved snippets."""
+    global _llm_client
+    from openai import AsyncOpenAI
+
+    if _llm_client is None:
+        _llm_client = AsyncOpenAI(timeout=QA_LLM_TIMEOUT_SECONDS)
+    context = "\n".join(
+        f"[{i + 1}] ({r['citation'].get('source')}/{r['citation'].get('field')}) {r['text']}"
+        for i, r in enumerate(ranked)
+    )
+    stream = await _llm_client.chat.completions.create(
+        model=QA_LLM_MODEL,
+        stream=True,
+        temperature=0.2,
+        messages=[
+            {"role": "system", "content": (
+                "You answer founders' questions about a venture investor using only the numbered "
+                "snippets. Cite snippets as [n]. Be concise."
+                + (" Compare the investor with the founder's pitch." if mode == "fit" else "")
+            )},
+            {"role": "user", "content": f"Investor: {inv.get('name', '')}\n\nSnippets:\n{context}\n\nQuestion: {question}"},
+        ],
+    )
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
+
+
+@router.post("/qa/stream")
+async def qa_investor_stream(
+    payload: QAReq,
+    format: str = "sse",
+    u=Depends(get_current_user_async),
+):
+    """
+    /qa as a stream: `citations` (mode, intent, ranked snippets) as soon as
+    retrieval is done, then `token` events with answer text as it is
+    produced, then `done` with the full answer. The QAResponse row is written
+    after the last event. `format=ndjson` sends {"event", "data"} lines instead
+    of SSE.
+    """
+    t0 = time.perf_counter()
+    route = "/investors/qa/stream"
+    question = (payload.question or "").strip()
+    if not question:
+        raise HTTPException(status_code=400, detail="Question is required")
+    # lookup + retrieval (DB, Weaviate, embeddings) off the event loop; 404 before the stream starts
+    inv = await asyncio.to_thread(_load_investor_standalone, payload.name)
+    mode, intent, ranked = await asyncio.to_thread(_qa_retrieve, inv, payload, question)
+
+    async def events():
+        yield "citations", {"mode": mode, "intent": intent, "citations": ranked}
+
+        source = "llm" if QA_LLM_MODEL else "template"
+        parts: List[str] = []
+        try:
+            if QA_LLM_MODEL:
+                async for tok in _llm_tokens(inv, question, ranked, mode):
+                    if not parts:
+                        STREAM_TTFT.labels(route, source).observe(time.perf_counter() - t0)
+                    parts.append(tok)
+                    yield "token", {"text": tok}
+        except Exception as e:
+            if parts:
+                # partial answer already sent → report and don't persist it
+                yield "error", {"detail": f"Answer generation failed: {type(e).__name__}"}
+                return
+            source = "template"  # LLM unavailable before the first token → templated answer
+        if not parts:
+            answer = _compose_answer(inv, mode, intent, ranked, payload.pitch_summary or "")
+            for tok in _template_tokens(answer):
+                if not parts:
+                    STREAM_TTFT.labels(route, source).observe(time.perf_counter() - t0)
+                parts.append(tok)
+                yield "token", {"text": tok}
+
+        answer = "".join(parts)
+        yield "done", {"answer": answer, "mode": mode, "intent": intent, "source": source}
+        STREAM_DURATION.labels(route, source).observe(time.perf_counter() - t0)
+        # persisted after the client has the whole answer
+        try:
+            await asyncio.to_thread(
+                _save_qa_standalone, inv.get("name") or payload.name, u.id, question, answer
+            )
+        except Exception:
+            pass
+
+    return _stream_response(events(), format)
+
+
+@router.post("/analyze/stream")
+async def analyze_investor_stream(
+    payload: AnalyzeReq,
+    format: str = "sse",
+    u=Depends(get_current_user_async),
+):
+    """
+    /analyze as a stream: `context` (snippets), one `agent` event per agent,
+    then `done` with score_hint.
+    """
+    t0 = time.perf_counter()
+    route = "/investors/analyze/stream"
+    inv = await asyncio.to_thread(_load_investor_standalone, payload.name)
+
+    async def events():
+        res = _analysis(inv, payload.pitch_summary or "")
+        yield "context", {"context_snippets": res["context_snippets"]}
+        for i, agent in enumerate(res["agents"]):
+            if i == 0:
+                STREAM_TTFT.labels(route, "rules").observe(time.perf_counter() - t0)
+            yield "agent", agent
+        yield "done", {"score_hint": res["score_hint"]}
+        STREAM_DURATION.labels(route, "rules").observe(time.perf_counter() - t0)
+
+    return _stream_response(events(), format)
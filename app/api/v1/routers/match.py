@@ -1,87 +1,223 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks
+from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from pathlib import Path
-import os, uuid, re
+import asyncio, hashlib, json, os, threading, uuid
 
 from sqlmodel import Session, select
 
-from app.deps import get_current_user
-from app.db.core import get_session
-from app.db.models import Pitch, Match, Investor
+from app.cache import cache_get, cache_get_async, cache_set
+from app.core.jobs import JobError, JobQueue, QueueFull
+from app.core.streaming import sse_response
+from app.deps import get_current_user, get_current_user_async
+from app.db.core import get_session, engine, read_engine
+from app.db.models import Pitch, Match
 from app.utils.pdf_loader import pdf_to_text, PdfExtractError
 
-# NEW: embeddings + vector search
-from app.ml.embeddings import embed_text
-from app.adapters.vector.weaviate_investors import search_similar_investors
+# embeddings + vector search: numpy-backed modules are imported at their call sites
+from app.ml.embeddings import embed_document, embed_chunks, pool_chunk_vectors
+from app.adapters.vector.weaviate_investors_async import search_similar_investors
 
 UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# Score every indexed investor with the local vector index and skip keyword
+# scoring for investors that can't reach the top-N (see InvestorSnapshot.rank_with_cutoff).
+# Off by default: at a few thousand investors it is 2–2.5x slower than the plain
+# snapshot path; enable only if scripts.bench_match_alloc shows a win at your catalog size.
+MATCH_EARLY_CUTOFF = os.getenv("MATCH_EARLY_CUTOFF", "0") == "1"
+# identical deck text + params → cached matches (0 disables); catalog edits show up after the TTL
+MATCH_CACHE_TTL_SECONDS = int(os.getenv("MATCH_CACHE_TTL_SECONDS", "300"))
+
 router = APIRouter(prefix="/match", tags=["match"])
 
-def _tokenize(s: str) -> List[str]:
-    return re.findall(r"[a-zA-Z0-9]+", (s or "").lower())
 
-def _score_investor_db(pitch_text: str, inv: Investor) -> float:
+def _rank_with_cutoff(snap, text: str, query_vecs, how: str, top_m: int, top_n: int):
+    """None when the local index is unavailable (→ regular Weaviate path)."""
+    import numpy as np
+    from app.ml.investor_index import load_investor_index
+    from app.ml.multivector import aggregate as aggregate_sims
+
+    idx = load_investor_index()
+    query_vecs = np.asarray(query_vecs, dtype=np.float32)
+    if not len(idx) or not len(query_vecs) or query_vecs.shape[1] != idx.matrix.shape[1]:
+        return None
+    sims = aggregate_sims(idx.similarity(query_vecs), how, top_m)
+    return snap.rank_with_cutoff(text, idx, sims, top_n)
+
+
+def _match_cache_key(text: str, match_mode: str, aggregate: str, top_m: int, top_n: int) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+    return f"match:{digest}:{match_mode}:{aggregate}:{top_m}:{top_n}"
+
+
+def _keyword_stage(text: str, score: bool = True):
     """
-    Very simple DB-only scoring:
-    - +1 per unique sector word match
-    - +1 per unique stage word match
-    - +1 per unique geo word match
-    - + up to +2 for keyword overlap between pitch and (thesis|constraints)
-    Max ≈ 9 points → we normalize later to 0..100.
+    (snapshot, keyword % per snapshot row) — runs in a worker thread, so it
+    uses its own session (on the read replica) rather than the request's.
     """
-    pitch_toks = set(_tokenize(pitch_text))
-    score = 0.0
+    from app.ml.investor_snapshot import get_investor_snapshot
+
+    with Session(read_engine) as s:
+        snap = get_investor_snapshot(s)
+    return snap, (snap.db_pct(text) if score else None)
+
+
+async def _vector_search(pitch_vec, chunk_vecs, match_mode: str, aggregate: str, top_m: int, limit: int):
+    """Weaviate (async client) / multi-vector results, or None if the vector side is down."""
+    try:
+        if match_mode == "multi":
+            from app.ml.multivector import multi_vector_search
+
+            return await asyncio.to_thread(
+                multi_vector_search, chunk_vecs, limit=limit, how=aggregate, top_m=top_m
+            )
+        return await search_similar_investors(pitch_vec, limit=limit)
+    except Exception:
+        return None
+
+
+async def _vector_stage(text: str, match_mode: str, aggregate: str, top_m: int, limit: int, search: bool = True):
+    """(pitch_vec, chunk_vecs, vector results); embedding runs in a worker thread."""
+    chunk_vecs = None
+    try:
+        if match_mode == "multi":
+            # all chunks in one encode batch → one (chunks × investors) scoring pass
+            chunks, chunk_vecs = await asyncio.to_thread(embed_chunks, text)
+            pitch_vec = pool_chunk_vectors(chunks, chunk_vecs).tolist() if chunks else []
+        else:
+            # pooled over token-sized chunks of the whole deck (bounded by DOCUMENT_MAX_CHUNKS)
+            pitch_vec = await asyncio.to_thread(embed_document, text)
+    except Exception:
+        # embedding model unavailable → just skip vector side
+        return [], None, None
+    if not search or not pitch_vec:
+        return pitch_vec, chunk_vecs, None
+    return pitch_vec, chunk_vecs, await _vector_search(pitch_vec, chunk_vecs, match_mode, aggregate, top_m, limit)
+
+
+def _check_match_params(match_mode: str, aggregate: str) -> None:
+    if match_mode not in ("pooled", "multi"):
+        raise HTTPException(status_code=400, detail="match_mode must be 'pooled' or 'multi'.")
+    from app.ml.multivector import AGGREGATIONS
+
+    if aggregate not in AGGREGATIONS:
+        raise HTTPException(status_code=400, detail=f"aggregate must be one of {', '.join(AGGREGATIONS)}.")
+
+
+def _save_upload(content: bytes, filename: Optional[str]) -> str:
+    rid = uuid.uuid4().hex[:8]
+    saved_path = str(UPLOAD_DIR / f"{rid}_{filename}")
+    try:
+        with open(saved_path, "wb") as f:
+            f.write(content)
+    except Exception:
+        saved_path = ""
+    return saved_path
+
+
+def _insert_pitch(db: Session, user_id: int, saved_path: str, text: str) -> Pitch:
+    pitch_row = Pitch(user_id=user_id, file_path=saved_path, summary=text)
+    db.add(pitch_row)
+    db.commit()
+    db.refresh(pitch_row)
+    return pitch_row
+
+
+def _insert_matches(db: Session, pitch_id: int, hits: List[Dict[str, Any]]) -> None:
+    for h in hits:
+        db.add(Match(
+            pitch_id=pitch_id,
+            investor_name=h.get("name") or "",
+            score_pct=int(h.get("score_pct") or 0),
+            distance=h.get("distance"),
+        ))
+    db.commit()
 
-    def uniq_hits(field: Optional[str]) -> int:
-        if not field:
-            return 0
-        words = set(_tokenize(field.replace(",", " ")))
-        return len(words & pitch_toks)
 
-    score += min(3, uniq_hits(inv.sectors))
-    score += min(2, uniq_hits(inv.stages))
-    score += min(2, uniq_hits(inv.geo))
-    thesis_hits = uniq_hits(inv.thesis)
-    const_hits  = uniq_hits(inv.constraints)
-    score += min(2, thesis_hits + const_hits)
+def _store_pitch_vector_quiet(db: Session, pitch_row: Pitch, pitch_vec) -> None:
+    from app.utils.rematch_pitches import store_pitch_vector
 
-    return score
+    try:
+        store_pitch_vector(db, pitch_row, pitch_vec)
+    except Exception:
+        pass
 
-def _norm_db_score(score: float) -> int:
-    # Normalize to a 0–100 hint (cap denominator to the same 9 points)
-    return int(max(0, min(100, round(100 * score / 9.0))))
 
-def _blend_scores(db_pct: Optional[int], vec_pct: Optional[int]) -> int:
+async def _match_text(
+    db: Session, user_id: int, text: str, saved_path: str,
+    top_n: int, match_mode: str, aggregate: str, top_m: int, progress=None,
+) -> Dict[str, Any]:
     """
-    Weighted blend (deterministic):
-    - If both present: 0.4 * DB + 0.6 * Vector
-    - If only one present: return it
+    Persist the pitch, match it and persist the matches; shared by /pitch and
+    pitch jobs. Blocking DB / Weaviate / Redis calls go through worker threads
+    (one at a time, so the sync session is never used concurrently).
     """
-    if db_pct is None and vec_pct is None:
-        return 0
-    if db_pct is None:
-        return int(vec_pct or 0)
-    if vec_pct is None:
-        return int(db_pct or 0)
-    return int(round(0.4 * db_pct + 0.6 * vec_pct))
-
-def _build_card_from_db(inv: Investor, db_score_pct: int) -> Dict[str, Any]:
-    return {
-        "name": inv.name,
-        "firm": inv.firm,
-        "sectors": inv.sectors,
-        "stages": inv.stages,
-        "geo": inv.geo,
-        "check_min": inv.check_min,
-        "check_max": inv.check_max,
-        "check_currency": inv.check_currency,
-        "thesis": inv.thesis,
-        "constraints": inv.constraints,
-        "score_pct": db_score_pct,
-        "distance": None,
-    }
+    pitch_row = await asyncio.to_thread(_insert_pitch, db, user_id, saved_path, text)
+    if progress:
+        await progress(stage="matching", pitch_id=pitch_row.id)
+
+    # ---- Result cache first (one async Redis GET): a hit skips embedding and
+    # keyword scoring entirely; on a miss both sides run concurrently
+    limit = max(20, top_n * 2)
+    cache_key = _match_cache_key(text, match_mode, aggregate, top_m, top_n) if MATCH_CACHE_TTL_SECONDS > 0 else None
+    cached = await cache_get_async(cache_key) if cache_key else None
+    if isinstance(cached, dict) and isinstance(cached.get("matches"), list):
+        hits = cached["matches"]
+        pitch_vec = cached.get("pitch_vec") or []
+        vector_ok = False
+    else:
+        (pitch_vec, chunk_vecs, vec_results), (snap, db_pct) = await asyncio.gather(
+            _vector_stage(text, match_mode, aggregate, top_m, limit, search=not MATCH_EARLY_CUTOFF),
+            asyncio.to_thread(_keyword_stage, text, not MATCH_EARLY_CUTOFF),
+        )
+        hits = None
+        if MATCH_EARLY_CUTOFF and pitch_vec:
+            # exact vector scores for the whole catalog → DB scoring only for contenders
+            try:
+                hits = await asyncio.to_thread(
+                    _rank_with_cutoff,
+                    snap, text, chunk_vecs if match_mode == "multi" else [pitch_vec],
+                    aggregate, top_m, top_n,
+                )
+            except Exception:
+                hits = None
+            if hits is None:
+                vec_results = await _vector_search(pitch_vec, chunk_vecs, match_mode, aggregate, top_m, limit)
+        vector_ok = hits is not None or vec_results is not None
+
+        if hits is None:
+            # ---- Merge & blend (deterministic): score arrays + partial top-N selection;
+            # card dicts are only built for what we return
+            vector_hits: Dict[str, Dict[str, Any]] = {}
+            for r in vec_results or []:
+                name = (r.get("name") or "").strip()
+                if not name:
+                    continue
+                vector_hits[name] = {
+                    "vec_pct": int(r.get("score_pct") or 0),
+                    "distance": r.get("distance"),
+                    "raw": r,
+                }
+            hits = snap.rank(text, vector_hits, top_n, db_pct=db_pct)
+
+    if pitch_vec:
+        # persisted (Weaviate Pitch + Redis, sets Pitch.vector_id) so re-matching
+        # and investor → pitch search never re-parse or re-embed this deck
+        await asyncio.to_thread(_store_pitch_vector_quiet, db, pitch_row, pitch_vec)
+    if cache_key and vector_ok:
+        # degraded (DB-only) results are not cached
+        await asyncio.to_thread(
+            cache_set, cache_key, {"matches": hits, "pitch_vec": pitch_vec}, ttl_seconds=MATCH_CACHE_TTL_SECONDS
+        )
+
+    # ---- Persist matches (what we returned)
+    if progress:
+        await progress(stage="saving")
+    await asyncio.to_thread(_insert_matches, db, pitch_row.id, hits)
+
+    return {"matches": hits, "query_text": text[:3000]}
+
 
 @router.post("/pitch")
 async def recommend_pitch(
@@ -94,11 +230,17 @@ async def recommend_pitch(
     geo: Optional[str]      = Form(default=None),
     traction: Optional[str] = Form(default=None),
 
+    # "pooled": one whole-deck vector; "multi": score investors against every chunk
+    match_mode: str = Form(default="pooled"),
+    aggregate: str  = Form(default="max"),   # multi mode: max | mean | topm
+    top_m: int      = Form(default=3),       # multi mode + topm: chunks averaged
+
     u = Depends(get_current_user),
     db: Session = Depends(get_session),
 ):
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+    _check_match_params(match_mode, aggregate)
 
     # ---- Read / persist pitch
     try:
@@ -112,113 +254,195 @@ async def recommend_pitch(
     if not text:
         raise HTTPException(status_code=400, detail="No text extracted from PDF.")
 
-    rid = uuid.uuid4().hex[:8]
-    saved_path = str(UPLOAD_DIR / f"{rid}_{file.filename}")
+    saved_path = _save_upload(content, file.filename)
+    return await _match_text(db, u.id, text, saved_path, top_n, match_mode, aggregate, top_m)
+
+
+# =========================
+# Batch re-matching
+# =========================
+
+# roles allowed to re-match pitches they don't own (nightly job, analysts)
+BATCH_ADMIN_ROLES = {"admin", "analyst"}
+# local job states kept for fast polls (Redis keeps them for 24h either way)
+BATCH_JOBS_MAX = int(os.getenv("BATCH_JOBS_MAX", "256"))
+
+# written from threadpool threads (progress callbacks) and read by status polls
+_batch_jobs: Dict[str, Dict[str, Any]] = {}
+_batch_jobs_lock = threading.Lock()
+
+
+class BatchMatchReq(BaseModel):
+    pitch_ids: Optional[List[int]] = None  # None → every pitch the caller may re-match
+    top_n: int = 10
+
+
+def _forget_batch_jobs() -> None:
+    # caller holds _batch_jobs_lock; finished jobs go first (oldest first); polls fall back to Redis
+    if len(_batch_jobs) <= BATCH_JOBS_MAX:
+        return
+    finished = [k for k, v in _batch_jobs.items() if v.get("status") in ("done", "failed")]
+    for k in finished[: len(_batch_jobs) - BATCH_JOBS_MAX]:
+        _batch_jobs.pop(k, None)
+
+
+def _set_batch_state(job_id: str, **kw: Any) -> None:
+    with _batch_jobs_lock:
+        state = _batch_jobs.setdefault(job_id, {"job_id": job_id})
+        state.update(kw)
+        state = dict(state)  # serialized below, outside the lock
+        _forget_batch_jobs()
+    # mirrored to Redis so any worker can answer the status poll
+    cache_set(f"rematch:{job_id}", state, ttl_seconds=24 * 3600)
+
+
+def _run_batch(job_id: str, pitch_ids: Optional[List[int]], top_n: int) -> None:
+    from app.utils.rematch_pitches import rematch_pitches
+
     try:
-        with open(saved_path, "wb") as f:
-            f.write(content)
-    except Exception:
-        saved_path = ""
+        with Session(engine) as s:
+            res = rematch_pitches(
+                s, pitch_ids, top_n=top_n,
+                progress=lambda done, total: _set_batch_state(job_id, done=done, total=total),
+            )
+        _set_batch_state(job_id, status="done", result=res)
+    except Exception as e:
+        _set_batch_state(job_id, status="failed", error=str(e)[:500])
 
-    pitch_row = Pitch(user_id=u.id, file_path=saved_path, summary=text)
-    db.add(pitch_row)
-    db.commit()
-    db.refresh(pitch_row)
 
-    # ---- DB scoring
-    investors = db.exec(select(Investor)).all()
-    db_scores: Dict[str, Dict[str, Any]] = {}
-    for inv in investors:
-        db_pct = _norm_db_score(_score_investor_db(text, inv))
-        if db_pct > 0:
-            db_scores[inv.name] = {
-                "card": _build_card_from_db(inv, db_pct),
-                "db_pct": db_pct,
-            }
-
-    # ---- Vector scoring (Weaviate)
-    vector_hits: Dict[str, Dict[str, Any]] = {}
+@router.post("/batch", status_code=202)
+def batch_match(
+    req: BatchMatchReq,
+    background: BackgroundTasks,
+    u = Depends(get_current_user),
+    db: Session = Depends(get_session),
+):
+    """
+    Re-score stored pitches against the current investor catalog without re-parsing PDFs.
+    Runs in the background; poll GET /match/batch/{job_id} for progress.
+    """
+    ids = req.pitch_ids
+    if (u.role or "") not in BATCH_ADMIN_ROLES:
+        # founders may only re-match their own pitches
+        q = select(Pitch.id).where(Pitch.user_id == int(u.id))
+        if ids is not None:
+            q = q.where(Pitch.id.in_(ids))
+        ids = list(db.exec(q).all())
+
+    job_id = uuid.uuid4().hex[:12]
+    _set_batch_state(
+        job_id, status="running", done=0,
+        total=len(ids) if ids is not None else None, user_id=str(u.id),
+    )
+    background.add_task(_run_batch, job_id, ids, max(1, req.top_n))
+    return {"job_id": job_id, "status": "running"}
+
+
+@router.get("/batch/{job_id}")
+def batch_match_status(job_id: str, u = Depends(get_current_user)):
+    with _batch_jobs_lock:
+        state = dict(_batch_jobs.get(job_id) or {})
+    state = state or cache_get(f"rematch:{job_id}")
+    if not state or (
+        state.get("user_id") != str(u.id) and (u.role or "") not in BATCH_ADMIN_ROLES
+    ):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return state
+
+
+# =========================
+# Pitch jobs (async upload → poll / SSE)
+# =========================
+
+async def _run_pitch_job(payload: Dict[str, Any], update) -> Dict[str, Any]:
+    await update(stage="extracting")
     try:
-        pitch_vec = embed_text(text[:4000])  # keep it bounded & deterministic
-        vec_results = search_similar_investors(pitch_vec, limit=max(20, top_n * 2))
-        for r in vec_results:
-            name = (r.get("name") or "").strip()
-            if not name:
-                continue
-            vector_hits[name] = {
-                "vec_pct": int(r.get("score_pct") or 0),
-                "distance": r.get("distance"),
-                "raw": r,
-            }
-    except Exception:
-        # Weaviate not available or vector step failed → just skip vector side
-        vec_results = []
-
-    # ---- Merge & blend (deterministic)
-    merged: Dict[str, Dict[str, Any]] = {}
-
-    # Seed with DB cards
-    for name, item in db_scores.items():
-        merged[name] = {
-            "name": name,
-            "card": item["card"],
-            "db_pct": item["db_pct"],
-            "vec_pct": None,
-            "distance": None,
-        }
-
-    # Merge vector data, create new cards when investor not in DB (rare)
-    for name, v in vector_hits.items():
-        if name in merged:
-            merged[name]["vec_pct"] = v["vec_pct"]
-            merged[name]["distance"] = v["distance"]
-        else:
-            # create a minimal card from vector properties if DB didn’t have it
-            r = v["raw"]
-            card = {
-                "name": r.get("name"),
-                "firm": r.get("firm"),
-                "sectors": r.get("sectors"),
-                "stages": r.get("stages"),
-                "geo": r.get("geo"),
-                "check_min": r.get("check_min"),
-                "check_max": r.get("check_max"),
-                "check_currency": r.get("check_currency"),
-                "thesis": r.get("thesis"),
-                "constraints": r.get("constraints"),
-                "score_pct": 0,   # temporary; set after blending
-                "distance": v["distance"],
-            }
-            merged[name] = {
-                "name": name,
-                "card": card,
-                "db_pct": None,
-                "vec_pct": v["vec_pct"],
-                "distance": v["distance"],
-            }
-
-    # Compute final blended score and finalize cards
-    cards: List[Dict[str, Any]] = []
-    for name, m in merged.items():
-        final_pct = _blend_scores(m.get("db_pct"), m.get("vec_pct"))
-        card = dict(m["card"])
-        card["score_pct"] = final_pct
-        card["distance"] = m.get("distance")
-        cards.append(card)
-
-    # Sort by blended score, tie-breaker: lower distance if available
-    cards.sort(key=lambda c: (-int(c.get("score_pct") or 0), float(c["distance"]) if c.get("distance") is not None else 9e9))
-
-    hits = [c for c in cards[:max(1, top_n)] if int(c.get("score_pct") or 0) > 0]
+        text = await asyncio.to_thread(pdf_to_text, payload["content"])
+    except PdfExtractError as e:
+        raise JobError(str(e))
+    except Exception as e:
+        raise JobError(f"Could not read PDF: {e}")
+    if not text:
+        raise JobError("No text extracted from PDF.")
 
-    # ---- Persist matches (what we returned)
-    for h in hits:
-        db.add(Match(
-            pitch_id=pitch_row.id,
-            investor_name=h.get("name") or "",
-            score_pct=int(h.get("score_pct") or 0),
-            distance=h.get("distance"),
-        ))
-    db.commit()
+    saved_path = await asyncio.to_thread(_save_upload, payload["content"], payload["filename"])
+    with Session(engine) as db:
+        return await _match_text(db, payload["user_id"], text, saved_path, progress=update, **payload["params"])
+
+
+pitch_jobs = JobQueue("pitch", _run_pitch_job)
+
+
+async def _job_for(job_id: str, u) -> Dict[str, Any]:
+    state = await pitch_jobs.get(job_id)
+    if not state or (
+        state.get("owner") != str(u.id) and (u.role or "") not in BATCH_ADMIN_ROLES
+    ):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return state
+
+
+@router.post("/pitch/jobs", status_code=202)
+async def submit_pitch_job(
+    file: UploadFile = File(...),
+    top_n: int = Form(default=10),
+    match_mode: str = Form(default="pooled"),
+    aggregate: str  = Form(default="max"),
+    top_m: int      = Form(default=3),
+    u = Depends(get_current_user_async),
+):
+    """
+    /match/pitch without holding the connection: returns a job id at once.
+    Poll GET /match/pitch/jobs/{job_id} or subscribe to .../events (SSE);
+    re-submitting the same PDF with the same params returns the same job.
+    """
+    if file.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+    _check_match_params(match_mode, aggregate)
+    content = await file.read()
+    if not content:
+        raise HTTPException(status_code=400, detail="Empty file.")
+
+    params = {"top_n": top_n, "match_mode": match_mode, "aggregate": aggregate, "top_m": top_m}
+    h = hashlib.sha256(content)
+    h.update(json.dumps([str(u.id), params], sort_keys=True).encode())
+    try:
+        state, created = await pitch_jobs.submit(
+            {"content": content, "filename": file.filename, "user_id": u.id, "params": params},
+            owner=str(u.id), dedupe_key=h.hexdigest()[:40],
+        )
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Too many pitch jobs queued; retry shortly.",
+                            headers={"Retry-After": "10"})
+    job_id = state["job_id"]
+    return {
+        "job_id": job_id,
+        "status": state.get("status"),
+        "deduplicated": not created,
+        "status_url": f"/api/v1/match/pitch/jobs/{job_id}",
+        "events_url": f"/api/v1/match/pitch/jobs/{job_id}/events",
+    }
+
+
+@router.get("/pitch/jobs/{job_id}")
+async def pitch_job_status(job_id: str, u = Depends(get_current_user_async)):
+    return await _job_for(job_id, u)
+
+
+@router.get("/pitch/jobs/{job_id}/events")
+async def pitch_job_events(job_id: str, u = Depends(get_current_user_async)):
+    """
+    Server-Sent Events: `progress` on every stage change, then one `done`
+    (state incl. result) or `failed` event, after which the stream ends.
+    """
+    await _job_for(job_id, u)
+
+    async def events():
+        async for state in pitch_jobs.watch(job_id):
+            status = state.get("status")
+            if status in ("done", "failed"):
+                yield status, state
+            else:
+                yield "progress", {k: v for k, v in state.items() if k != "result"}
 
-    return {"matches": hits, "query_text": text[:3000]}
\ No newline at end of file
+    return sse_response(events())
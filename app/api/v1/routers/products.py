@@ -1,11 +1,204 @@
 # app/api/v1/routers/products.py
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
+from pydantic import TypeAdapter
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.v1.schemas import ProductFull, ProductOut, ProductRecommendReq, ProductRecommendResp
+from app.api.v1.routers.auth import get_current_user_async
+from app.cache import cache_get_async, cache_set_async
+from app.core import corpus_version
+from app.core.http_cache import (
+    ValidatorMemo, answer_not_modified, is_not_modified, not_modified, strong_etag, validator_headers,
+)
 from app.db.models import Product
-from app.db.core import get_session
+from app.db.core import get_async_read_session
+from app.utils.pdf_loader import PdfExtractError, pdf_to_text
 
 router = APIRouter(prefix="/products", tags=["products"])
 
-@router.get("/", response_model=list[Product])
-def list_products(db: Session = Depends(get_session)):
-    return db.exec(select(Product)).all()
\ No newline at end of file
+PRODUCTS_PAGE_DEFAULT = int(os.getenv("PRODUCTS_PAGE_DEFAULT", "100"))
+PRODUCTS_PAGE_MAX = int(os.getenv("PRODUCTS_PAGE_MAX", "500"))
+# pages are keyed by corpus version, so the TTL only bounds memory, not staleness
+PRODUCTS_CACHE_TTL_SECONDS = int(os.getenv("PRODUCTS_CACHE_TTL_SECONDS", "600"))
+# recommendations are keyed by index generation, so the TTL only bounds memory
+PRODUCT_RECOMMEND_TTL_SECONDS = int(os.getenv("PRODUCT_RECOMMEND_TTL_SECONDS", "900"))
+
+# projection without the `meta` blob (the whole source record) unless asked for
+_LIST_FIELDS = list(ProductOut.model_fields)
+_pages_out = TypeAdapter(list[ProductOut])
+_pages_full = TypeAdapter(list[ProductFull])
+_validators = ValidatorMemo()
+ROUTE = "/products/"
+
+# ORM writes to Product → new catalog version (bulk ingest bumps explicitly)
+corpus_version.track(Product, "products")
+
+
+def _encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page_headers(etag: str, version: corpus_version.Version, next_cursor: Optional[str]) -> dict:
+    extra = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    # a worker-local version never sees other workers' writes → ETag only
+    return validator_headers(etag, version.updated_at if version.shared else None, **extra)
+
+
+@router.get("/", response_model=list[ProductOut])
+async def list_products(
+    request: Request,
+    type: Optional[str] = None,
+    region: Optional[str] = None,
+    risk_label: Optional[str] = None,
+    limit: int = Query(default=PRODUCTS_PAGE_DEFAULT, ge=1, le=PRODUCTS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    include_meta: bool = False,
+    db: AsyncSession = Depends(get_async_read_session),
+):
+    """
+    Product catalog page, ordered by id. Filters use ix_product_type_region
+    (type, region); pass the X-Next-Cursor response header back as `cursor`
+    for the next page. Responses carry a strong ETag — send it as
+    If-None-Match to get 304 while the catalog is unchanged.
+    """
+    after = _decode_cursor(cursor) if cursor else 0
+    version = await corpus_version.current_async("products")
+    params = json.dumps([type, region, risk_label, limit, after, include_meta])
+    memo_key = (version.token, params)
+
+    # 1) revalidation: answered from memory, nothing fetched or serialized
+    resp = answer_not_modified(request, ROUTE, _validators.get(memo_key))
+    if resp is not None:
+        return resp
+
+    # 2) shared page cache (bytes + validators), keyed by catalog version
+    cache_key = f"products:{version.token}:{hashlib.sha1(params.encode()).hexdigest()}"
+    cached = await cache_get_async(cache_key)
+    if cached:
+        headers = _page_headers(cached["etag"], version, cached.get("next"))
+        v = _validators.put(memo_key, headers, len(cached["body"]), cached.get("cost", 0.0))
+        resp = answer_not_modified(request, ROUTE, v)
+        if resp is not None:
+            return resp
+        return Response(content=cached["body"], media_type="application/json", headers=headers)
+
+    # 3) keyset query, one row extra to know whether there is a next page
+    t0 = time.perf_counter()
+    fields = _LIST_FIELDS + (["meta"] if include_meta else [])
+    stmt = select(*[getattr(Product, f) for f in fields]).where(Product.id > after)
+    if type:
+        stmt = stmt.where(Product.type == type)
+    if region:
+        stmt = stmt.where(Product.region == region)
+    if risk_label:
+        stmt = stmt.where(Product.risk_label == risk_label)
+    rows = (await db.exec(stmt.order_by(Product.id).limit(limit + 1))).all()
+
+    next_cursor = _encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    adapter = _pages_full if include_meta else _pages_out
+    body = adapter.dump_json(adapter.validate_python([dict(r._mapping) for r in rows[:limit]]))
+    cost = time.perf_counter() - t0
+    etag = strong_etag(body)
+    headers = _page_headers(etag, version, next_cursor)
+
+    _validators.put(memo_key, headers, len(body), cost)
+    await cache_set_async(
+        cache_key, {"etag": etag, "body": body.decode(), "next": next_cursor, "cost": cost},
+        ttl_seconds=PRODUCTS_CACHE_TTL_SECONDS,
+    )
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+
+# =========================
+# Recommendations
+# =========================
+
+async def _recommend(text: str, k: int, type: Optional[str], region: Optional[str],
+                     risk_label: Optional[str], embed) -> dict:
+    from app.ml.product_index import load_product_index
+
+    idx = await asyncio.to_thread(load_product_index)  # stats CURRENT, may map a new generation
+    if idx is None or not len(idx):
+        raise HTTPException(
+            status_code=503,
+            detail="Product index not built yet (python -m app.utils.ingest_products)",
+        )
+    filters = {"type": type, "region": region, "risk_label": risk_label}
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+    cache_key = "products:rec:{}:{}:{}:{}".format(
+        idx.generation, digest, k, hashlib.sha1(json.dumps(filters).encode()).hexdigest()[:16]
+    )
+    cached = await cache_get_async(cache_key)
+    if cached is not None:
+        return cached
+
+    vec = await asyncio.to_thread(embed, text)  # model inference off the event loop
+    if not vec:
+        raise HTTPException(status_code=400, detail="Nothing to embed.")
+    items = await asyncio.to_thread(idx.recommend, vec, k, **filters)  # matrix product + top-k
+    out = {"items": items, "index_generation": idx.generation}
+    await cache_set_async(cache_key, out, ttl_seconds=PRODUCT_RECOMMEND_TTL_SECONDS)
+    return out
+
+
+@router.post("/recommend", response_model=ProductRecommendResp)
+async def recommend_products(req: ProductRecommendReq, u=Depends(get_current_user_async)):
+    """
+    Rank products for a free-text need ("low-fee APAC equity ETF for a
+    moderate-risk investor"), optionally pre-filtered by type / region / risk_label.
+    """
+    from app.ml.embeddings import embed_text
+
+    text = (req.query or "").strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="query is required.")
+    return await _recommend(text, req.k, req.type, req.region, req.risk_label, embed_text)
+
+
+@router.post("/recommend/pdf", response_model=ProductRecommendResp)
+async def recommend_products_pdf(
+    file: UploadFile = File(...),
+    k: int = Form(default=10),
+    type: Optional[str] = Form(default=None),
+    region: Optional[str] = Form(default=None),
+    risk_label: Optional[str] = Form(default=None),
+    u=Depends(get_current_user_async),
+):
+    """
+    Products most similar to an uploaded factsheet / term sheet (pooled
+    whole-document embedding), e.g. to find alternatives to a given ETF.
+    """
+    from app.ml.embeddings import embed_document
+
+    if file.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+    try:
+        text = await asyncio.to_thread(pdf_to_text, await file.read())
+    except PdfExtractError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read PDF: {e}")
+    if not text:
+        raise HTTPException(status_code=400, detail="No text extracted from PDF.")
+
+    out = await _recommend(text, max(1, min(k, 100)), type, region, risk_label, embed_document)
+    return {**out, "query_text": text[:3000]}
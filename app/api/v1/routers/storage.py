@@ -1,11 +1,17 @@
-import os, uuid, mimetypes, boto3
+import os, uuid, mimetypes
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, Depends
 
 from app.deps import get_current_user   # ← unified import
 
 router = APIRouter(prefix="/storage", tags=["storage"])
 
-_s3 = boto3.client("s3", region_name=os.getenv("AWS_REGION"))
+@lru_cache(maxsize=1)
+def _s3():
+    # boto3 is slow to import and to build a client; do it on first use, not at boot
+    import boto3
+    return boto3.client("s3", region_name=os.getenv("AWS_REGION"))
+
 BUCKET = os.getenv("S3_BUCKET", "")
 PREFIX = os.getenv("S3_PREFIX", "pitches/")
 
@@ -19,7 +25,7 @@ def sign_upload(filename: str, content_type: str, u=Depends(get_current_user)):
 
     obj_key = f"{PREFIX}{uuid.uuid4().hex}{ext}"
     # Either PUT or POST; PUT is simpler for Fetch/Axios
-    url = _s3.generate_presigned_url(
+    url = _s3().generate_presigned_url(
         ClientMethod="put_object",
         Params={"Bucket": BUCKET, "Key": obj_key, "ContentType": content_type},
         ExpiresIn=600,  # 10 min
@@ -1,5 +1,6 @@
 # app/api/v1/schemas.py
 from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 
 # --- Auth ---
@@ -14,6 +15,7 @@ class LoginReq(BaseModel):
 class User(BaseModel):
     id: str | int
     email: EmailStr
+    role: Optional[str] = None
 
 # --- Ingest investors ---
 class InvestorList(BaseModel):
@@ -69,4 +71,33 @@ class QAReq(BaseModel):
 class QAResp(BaseModel):
     answer: str
     snippets: List[Dict[str, Any]] = []
-    citations: List[Dict[str, Any]] = []  # { text, score, citation: {source,title,field} }
\ No newline at end of file
+    citations: List[Dict[str, Any]] = []  # { text, score, citation: {source,title,field} }
+# --- Products ---
+class ProductOut(BaseModel):
+    id: int
+    product_id: str
+    name: str
+    type: Optional[str] = None
+    description: Optional[str] = None
+    region: Optional[str] = None
+    terms: Optional[str] = None
+    fees: Optional[str] = None
+    eligibility: Optional[str] = None
+    risk_label: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class ProductFull(ProductOut):
+    meta: Optional[Dict[str, Any]] = None  # full source record (include_meta=true)
+
+class ProductRecommendReq(BaseModel):
+    query: str
+    k: int = Field(default=10, ge=1, le=100)
+    # structured pre-filters (exact, case-insensitive)
+    type: Optional[str] = None
+    region: Optional[str] = None
+    risk_label: Optional[str] = None
+
+class ProductRecommendResp(BaseModel):
+    items: List[Dict[str, Any]]  # product card + similarity, best first
+    index_generation: Optional[str] = None
+    query_text: Optional[str] = None
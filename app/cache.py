@@ -1,19 +1,26 @@
 # app/cache.py
 import json
 import os
-from typing import Any, Optional
+import time
+from typing import Any, Dict, List, Optional
 import redis
 
 # Example: redis://localhost:6379/0
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# after a failed connect, callers get None without retrying for this long
+# (no connect + ping on every cache call while Redis is down)
+REDIS_RETRY_SECONDS = float(os.getenv("REDIS_RETRY_SECONDS", "5"))
 
 _redis: Optional[redis.Redis] = None
+_redis_failed_at = float("-inf")
 
 
 def get_redis() -> Optional[redis.Redis]:
-    global _redis
+    global _redis, _redis_failed_at
     if _redis is not None:
         return _redis
+    if time.monotonic() - _redis_failed_at < REDIS_RETRY_SECONDS:
+        return None
     try:
         _redis = redis.from_url(REDIS_URL, decode_responses=True)
         # quick ping so misconfig fails fast
@@ -22,6 +29,7 @@ def get_redis() -> Optional[redis.Redis]:
     except Exception:
         # no Redis → app still works, just without cache
         _redis = None
+        _redis_failed_at = time.monotonic()
         return None
 
 
@@ -49,6 +57,39 @@ def cache_set(key: str, value: Any, ttl_seconds: int = 60) -> None:
         pass
 
 
+def cache_get_many(keys: List[str]) -> List[Optional[Any]]:
+    """
+    MGET wrapper: one round-trip for many keys; misses (or no Redis) → None.
+    """
+    r = get_redis()
+    if not r or not keys:
+        return [None] * len(keys)
+    try:
+        vals = r.mget(keys)
+    except Exception:
+        return [None] * len(keys)
+    out: List[Optional[Any]] = []
+    for v in vals:
+        try:
+            out.append(json.loads(v) if v is not None else None)
+        except Exception:
+            out.append(None)
+    return out
+
+
+def cache_set_many(items: Dict[str, Any], ttl_seconds: int = 60) -> None:
+    r = get_redis()
+    if not r or not items:
+        return
+    try:
+        pipe = r.pipeline(transaction=False)
+        for k, v in items.items():
+            pipe.setex(k, ttl_seconds, json.dumps(v))
+        pipe.execute()
+    except Exception:
+        pass
+
+
 def cache_delete_prefix(prefix: str) -> None:
     """
     Simple invalidation: delete all keys that start with prefix.
@@ -62,3 +103,90 @@ def cache_delete_prefix(prefix: str) -> None:
             r.delete(k)
     except Exception:
         pass
+
+
+# ---------------------------------------------------------
+# asyncio variants (for `async def` routes: no threadpool hop, no loop blocking)
+# ---------------------------------------------------------
+_aredis = None
+_aredis_failed_at = float("-inf")
+
+
+async def get_redis_async():
+    global _aredis, _aredis_failed_at
+    if _aredis is not None:
+        return _aredis
+    if time.monotonic() - _aredis_failed_at < REDIS_RETRY_SECONDS:
+        return None
+    try:
+        import redis.asyncio as aioredis
+
+        client = aioredis.from_url(REDIS_URL, decode_responses=True)
+        await client.ping()
+        _aredis = client
+        return _aredis
+    except Exception:
+        _aredis = None
+        _aredis_failed_at = time.monotonic()
+        return None
+
+
+async def cache_get_async(key: str) -> Optional[Any]:
+    r = await get_redis_async()
+    if not r:
+        return None
+    try:
+        val = await r.get(key)
+    except Exception:
+        return None
+    if val is None:
+        return None
+    try:
+        return json.loads(val)
+    except Exception:
+        return None
+
+
+async def cache_set_async(key: str, value: Any, ttl_seconds: int = 60) -> None:
+    r = await get_redis_async()
+    if not r:
+        return
+    try:
+        await r.setex(key, ttl_seconds, json.dumps(value))
+    except Exception:
+        # fail open – never block main path on cache errors
+        pass
+
+
+async def cache_add_async(key: str, value: Any, ttl_seconds: int = 60) -> Optional[bool]:
+    """
+    SET NX: True if stored, False if the key already exists, None without
+    Redis (caller falls back to process-local state).
+    """
+    r = await get_redis_async()
+    if not r:
+        return None
+    try:
+        return bool(await r.set(key, json.dumps(value), ex=ttl_seconds, nx=True))
+    except Exception:
+        return None
+
+
+async def cache_delete_async(key: str) -> None:
+    r = await get_redis_async()
+    if not r:
+        return
+    try:
+        await r.delete(key)
+    except Exception:
+        pass
+
+
+async def close_redis_async() -> None:
+    global _aredis
+    client, _aredis = _aredis, None
+    if client is not None:
+        try:
+            await client.aclose()
+        except Exception:
+            pass
@@ -17,5 +17,14 @@ class Settings(BaseModel):
     jwt_secret: str = os.getenv("JWT_SECRET", "dev_secret_change_me")
     jwt_algo: str = os.getenv("JWT_ALGO", "HS256")
     jwt_ttl_seconds: int = int(os.getenv("JWT_TTL_SECONDS", str(24 * 60 * 60)))
+    # On an auth-cache miss, trust the signed `uid`/`sub`/`role` claims instead of reading the user row.
+    # Only while the user has no revocation stamp newer than the token's `iat` (auth_cache.revoke_user,
+    # shared via Redis); without Redis, tokens missing `role`/`iat`, or after a revocation → normal lookup.
+    auth_trust_token_claims: bool = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "0") == "1"
+
+    # Password hashing (bcrypt cost + dedicated worker pool)
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    password_pool_workers: int = int(os.getenv("PASSWORD_POOL_WORKERS", "2"))
+    password_pool_max_queue: int = int(os.getenv("PASSWORD_POOL_MAX_QUEUE", "32"))
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,197 @@
+# app/core/auth_cache.py
+"""
+Short-TTL, in-process cache of verified bearer tokens.
+
+Maps a raw token → (user_id, email, role) so the auth dependency can skip both
+the HMAC/JSON decode and the user lookup on repeat requests. Entries never
+outlive the token's own `exp`, and `invalidate_user` drops every entry for a
+user (deletion, role change, password change).
+
+NOTE: the cache is per process. Across workers, staleness is bounded by
+AUTH_CACHE_TTL_SECONDS (keep it short).
+
+Revocation stamps (`revoke_user`) back AUTH_TRUST_TOKEN_CLAIMS: a token's
+claims are only trusted if no stamp for its user (or the global "*" stamp)
+is at or after the token's `iat`. Stamps are kept locally and in Redis
+(`auth:revoked:{uid}`) for the token lifetime; when Redis can't be asked the
+answer is "unknown" and callers fall back to the user lookup.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set
+
+from app.cache import get_redis, get_redis_async
+from app.config import settings
+
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+
+class CachedUser(NamedTuple):
+    user_id: str
+    email: str
+    role: Optional[str]
+
+
+class _Entry(NamedTuple):
+    expires_at: float
+    user: CachedUser
+
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, _Entry]" = OrderedDict()
+# user_id / email → tokens currently cached for that user (for invalidation)
+_by_user: Dict[str, Set[str]] = {}
+
+
+def _user_keys(user: CachedUser) -> tuple:
+    return (f"id:{user.user_id}", f"email:{user.email.lower()}")
+
+
+def _drop(token: str) -> None:
+    entry = _entries.pop(token, None)
+    if entry is None:
+        return
+    for k in _user_keys(entry.user):
+        toks = _by_user.get(k)
+        if toks is not None:
+            toks.discard(token)
+            if not toks:
+                _by_user.pop(k, None)
+
+
+def get_cached_user(token: str) -> Optional[CachedUser]:
+    """
+    Return the cached user for `token`, or None on miss/expiry.
+    """
+    if AUTH_CACHE_TTL_SECONDS <= 0:
+        return None
+    now = time.time()
+    with _lock:
+        entry = _entries.get(token)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            _drop(token)
+            return None
+        _entries.move_to_end(token)
+        return entry.user
+
+
+def cache_user(token: str, user: CachedUser, token_exp: Optional[float] = None) -> None:
+    """
+    Remember a verified token. TTL = min(AUTH_CACHE_TTL_SECONDS, token exp - now).
+    """
+    if AUTH_CACHE_TTL_SECONDS <= 0:
+        return
+    now = time.time()
+    expires_at = now + AUTH_CACHE_TTL_SECONDS
+    if token_exp is not None:
+        expires_at = min(expires_at, float(token_exp))
+    if expires_at <= now:
+        return
+    with _lock:
+        _drop(token)
+        _entries[token] = _Entry(expires_at, user)
+        for k in _user_keys(user):
+            _by_user.setdefault(k, set()).add(token)
+        while len(_entries) > AUTH_CACHE_MAX_ENTRIES:
+            oldest = next(iter(_entries))
+            _drop(oldest)
+
+
+def invalidate_user(user_id: Optional[object] = None, email: Optional[str] = None) -> int:
+    """
+    Drop every cached token for a user. Call on deletion, role or credential change.
+    Returns the number of entries removed.
+    """
+    keys = []
+    if user_id is not None:
+        keys.append(f"id:{user_id}")
+    if email:
+        keys.append(f"email:{email.lower()}")
+    removed = 0
+    with _lock:
+        for k in keys:
+            for token in list(_by_user.get(k, ())):
+                if token in _entries:
+                    _drop(token)
+                    removed += 1
+    return removed
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+        _by_user.clear()
+
+
+# ---------------------------------------------------------
+# Revocation stamps (trusted-claims path)
+# ---------------------------------------------------------
+_revoked: Dict[str, float] = {}  # user_id | "*" → unix time of the last revocation
+
+
+def _revoked_keys(user_id: object) -> list:
+    return [f"auth:revoked:{user_id}", "auth:revoked:*"]
+
+
+def revoke_user(user_id: Optional[object] = None) -> None:
+    """
+    Stop trusting the claims of tokens issued up to now for `user_id`
+    (None → every user, e.g. after a bulk UPDATE/DELETE of users).
+    """
+    key = str(user_id) if user_id is not None else "*"
+    now = time.time()
+    with _lock:
+        _revoked[key] = now
+    r = get_redis()
+    if r:
+        try:
+            r.setex(f"auth:revoked:{key}", settings.jwt_ttl_seconds, repr(now))
+        except Exception:
+            pass
+
+
+def _local_revoked(user_id: object, issued_at: float) -> bool:
+    with _lock:
+        return max(_revoked.get(str(user_id), 0.0), _revoked.get("*", 0.0)) >= issued_at
+
+
+def _stamp(vals) -> float:
+    out = 0.0
+    for v in vals:
+        try:
+            out = max(out, float(v or 0))
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+def claims_revoked(user_id: object, issued_at: float) -> Optional[bool]:
+    """True / False, or None when the shared stamps can't be read (no Redis)."""
+    if _local_revoked(user_id, issued_at):
+        return True
+    r = get_redis()
+    if not r:
+        return None
+    try:
+        return _stamp(r.mget(_revoked_keys(user_id))) >= issued_at
+    except Exception:
+        return None
+
+
+async def claims_revoked_async(user_id: object, issued_at: float) -> Optional[bool]:
+    if _local_revoked(user_id, issued_at):
+        return True
+    r = await get_redis_async()
+    if not r:
+        return None
+    try:
+        return _stamp(await r.mget(_revoked_keys(user_id))) >= issued_at
+    except Exception:
+        return None
@@ -0,0 +1,158 @@
+# app/core/circuit_breaker.py
+"""
+Minimal thread-safe circuit breaker for calls to external services.
+
+closed     calls pass; `failure_threshold` consecutive failures → open
+open       calls fail immediately with CircuitOpen for `reset_seconds`
+half-open  one trial call passes (after the optional `on_half_open` probe,
+           e.g. a health check + reconnect); success → closed, failure → open
+
+`guard` wraps sync functions, `guard_async` coroutine functions; both share the
+same state, so sync and async adapters for one service trip a single breaker.
+"""
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from prometheus_client import Counter, Gauge
+
+T = TypeVar("T")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = Gauge(
+    "circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ["name"]
+)
+CIRCUIT_OPENED = Counter(
+    "circuit_breaker_opened_total", "Times the circuit opened", ["name"]
+)
+CIRCUIT_REJECTED = Counter(
+    "circuit_breaker_rejected_total", "Calls rejected while the circuit was open", ["name"]
+)
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency that is known to be down."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_seconds: float = 15.0,
+        on_half_open: Optional[Callable[[], None]] = None,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.on_half_open = on_half_open
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        CIRCUIT_STATE.labels(name).set(0)
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUE[state])
+
+    def before_call(self, run_probe: bool = True) -> None:
+        """
+        Raise CircuitOpen unless a call may go through now. With `run_probe=False`
+        (async callers: the probe is blocking) the trial call itself is the probe.
+        """
+        probe = False
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    CIRCUIT_REJECTED.labels(self.name).inc()
+                    raise CircuitOpen(f"{self.name} unavailable (circuit open)")
+                self._set_state(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._trial_running:
+                    CIRCUIT_REJECTED.labels(self.name).inc()
+                    raise CircuitOpen(f"{self.name} unavailable (circuit half-open)")
+                self._trial_running = True
+                probe = True
+        if probe and run_probe and self.on_half_open is not None:
+            try:
+                self.on_half_open()
+            except Exception:
+                self.record_failure()
+                raise
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            was_trial = self._trial_running
+            self._trial_running = False
+            if was_trial or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    CIRCUIT_OPENED.labels(self.name).inc()
+                self._set_state(OPEN)
+                self._opened_at = time.monotonic()
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def guard(self, fn: Callable[..., T]) -> Callable[..., T]:
+        """Decorator form of `call`."""
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            return self.call(fn, *args, **kwargs)
+
+        return wrapper
+
+    async def call_async(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        self.before_call(run_probe=False)
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # cancelled (client went away, sibling task failed): says nothing about
+            # the dependency — just free a half-open trial slot
+            with self._lock:
+                self._trial_running = False
+            raise
+        self.record_success()
+        return result
+
+    def guard_async(self, fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        """Decorator form of `call_async`."""
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await self.call_async(fn, *args, **kwargs)
+
+        return wrapper
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"state": self._state, "failures": self._failures}
@@ -0,0 +1,164 @@
+# app/core/compression.py
+"""
+Response compression (brotli / gzip) as ASGI middleware, with per-route
+bytes and CPU metrics.
+
+Only complete, single-chunk responses are compressed (JSON from the routes);
+streaming bodies (SSE, NDJSON, file downloads) pass through untouched, as do
+bodies below COMPRESSION_MIN_BYTES, non-text media types and responses that
+already carry a Content-Encoding. brotli is used when the client accepts it
+and the `brotli` package is installed, else gzip.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import time
+from typing import List, Optional
+
+from prometheus_client import Counter
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Match
+
+from app.core.http_cache import HTTP_BYTES_SAVED
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+COMPRESSION_BYTES_IN = Counter(
+    "http_compression_bytes_in_total", "Response bytes before compression", ["route", "encoding"]
+)
+COMPRESSION_BYTES_OUT = Counter(
+    "http_compression_bytes_out_total", "Response bytes after compression", ["route", "encoding"]
+)
+COMPRESSION_CPU = Counter(
+    "http_compression_cpu_seconds_total", "CPU time spent compressing responses", ["route", "encoding"]
+)
+
+try:
+    import brotli  # optional
+except ImportError:
+    brotli = None
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported coding from Accept-Encoding (q=0 excludes)."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            accepted[token.strip().lower()] = q
+    wildcard = accepted.get("*", 0.0)
+    for enc in (["br"] if brotli is not None else []) + ["gzip"]:
+        if accepted.get(enc, wildcard) > 0:
+            return enc
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    app = scope.get("app")
+    for r in getattr(app, "routes", ()):
+        try:
+            if r.matches(scope)[0] == Match.FULL:
+                return getattr(r, "path", "other")
+        except Exception:
+            continue
+    return "other"
+
+
+def _weaken_etag(mh: MutableHeaders) -> None:
+    mh.add_vary_header("Accept-Encoding")
+    etag = mh.get("etag")
+    if etag and not etag.startswith("W/"):
+        # different bytes than the identity representation → weak validator
+        mh["ETag"] = "W/" + etag
+
+
+class CompressionMiddleware:
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: List[dict] = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                start.append(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if not start:  # already sent (more_body chunk after the first)
+                await send(message)
+                return
+
+            head = start.pop()
+            if head["status"] == 304:
+                # the 200 this revalidates was (or would be) compressed for this client →
+                # same weak validator; weak comparison still selects a stored strong one
+                _weaken_etag(MutableHeaders(raw=head["headers"]))
+                await send(head)
+                await send(message)
+                return
+            headers = Headers(raw=head["headers"])
+            body = message.get("body", b"")
+            streaming = message.get("more_body", False)
+            ctype = headers.get("content-type", "")
+            if (
+                streaming
+                or len(body) < self.min_size
+                or "content-encoding" in headers
+                or not ctype.startswith(COMPRESSIBLE_TYPES)
+            ):
+                if streaming:
+                    passthrough = True
+                await send(head)
+                await send(message)
+                return
+
+            t0 = time.thread_time()
+            out = compress(body, encoding)
+            cpu = time.thread_time() - t0
+            route = _route_label(scope)
+            COMPRESSION_BYTES_IN.labels(route, encoding).inc(len(body))
+            COMPRESSION_BYTES_OUT.labels(route, encoding).inc(len(out))
+            COMPRESSION_CPU.labels(route, encoding).inc(cpu)
+            HTTP_BYTES_SAVED.labels(route, "compression").inc(max(0, len(body) - len(out)))
+
+            mh = MutableHeaders(raw=head["headers"])
+            mh["Content-Encoding"] = encoding
+            mh["Content-Length"] = str(len(out))
+            _weaken_etag(mh)
+            await send(head)
+            await send({"type": "http.response.body", "body": out, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,173 @@
+# app/core/corpus_version.py
+"""
+Version counters for read-mostly corpora ("products", "investors").
+
+A corpus version changes whenever rows of its table are committed. Read
+paths put the version into cache keys and ETags, so a write invalidates
+every cached page at once and polling clients get 304 until something
+actually changes.
+
+- `track(Model, name)` bumps `name` after any commit that inserted, updated
+  or deleted a `Model` row (ORM writes; bulk Core statements call `bump`).
+- `current(name)` answers from process memory (`current_async` in async
+  routes: the periodic Redis read doesn't block the event loop). The shared counter lives in
+  Redis (`corpus:{name}` hash: v, ts) and is re-read at most every
+  CORPUS_VERSION_REFRESH_SECONDS, so other workers' writes show up within
+  that window. Without Redis each process counts alone (token includes a
+  per-boot id, `Version.shared` is False): another worker's writes are never
+  seen, so callers must not derive Last-Modified from it, and staleness is
+  bounded only by their memo / cache max ages
+  (HTTP_VALIDATOR_MEMO_MAX_AGE_SECONDS).
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from typing import Dict, NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.cache import get_redis, get_redis_async
+
+CORPUS_VERSION_REFRESH_SECONDS = float(os.getenv("CORPUS_VERSION_REFRESH_SECONDS", "2"))
+
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class Version(NamedTuple):
+    token: str          # opaque; goes into cache keys / ETags
+    updated_at: float   # unix time of the last change (Last-Modified)
+
+    @property
+    def shared(self) -> bool:
+        """True when read from the Redis counter (valid across workers)."""
+        return self.token.startswith("r")
+
+
+class _State:
+    __slots__ = ("local", "version", "checked_at")
+
+    def __init__(self) -> None:
+        self.local = 0
+        self.version = Version(f"{_BOOT_ID}.0", time.time())
+        self.checked_at = 0.0
+
+
+_lock = threading.Lock()
+_states: Dict[str, _State] = {}
+
+
+def _state(name: str) -> _State:
+    st = _states.get(name)
+    if st is None:
+        with _lock:
+            st = _states.setdefault(name, _State())
+    return st
+
+
+def _shared_version(h) -> Version:
+    if not h:
+        return Version("r0", 0.0)
+    return Version(f"r{h.get('v', '0')}", float(h.get("ts") or 0.0))
+
+
+def _read_shared(name: str):
+    r = get_redis()
+    if not r:
+        return None
+    try:
+        return _shared_version(r.hgetall(f"corpus:{name}"))
+    except Exception:
+        return None
+
+
+async def _read_shared_async(name: str):
+    r = await get_redis_async()
+    if not r:
+        return None
+    try:
+        return _shared_version(await r.hgetall(f"corpus:{name}"))
+    except Exception:
+        return None
+
+
+def _due(st: _State, now: float) -> bool:
+    return now - st.checked_at >= CORPUS_VERSION_REFRESH_SECONDS
+
+
+def current(name: str) -> Version:
+    """Version of `name` (no I/O unless the refresh interval has passed)."""
+    st = _state(name)
+    now = time.monotonic()
+    if not _due(st, now):
+        return st.version
+    return _refreshed(st, now, _read_shared(name))
+
+
+async def current_async(name: str) -> Version:
+    """`current` for async routes (redis.asyncio for the refresh)."""
+    st = _state(name)
+    now = time.monotonic()
+    if not _due(st, now):
+        return st.version
+    st.checked_at = now  # one refresh per interval, not one per concurrent request
+    return _refreshed(st, now, await _read_shared_async(name))
+
+
+def _refreshed(st: _State, now: float, shared) -> Version:
+    with _lock:
+        if st.checked_at > now:
+            return st.version  # bumped locally while we were reading: that one is newer
+        st.checked_at = now
+        if shared is not None:
+            # a fresh counter has no timestamp yet: keep the boot-time one
+            st.version = shared if shared.updated_at else Version(shared.token, st.version.updated_at)
+        return st.version
+
+
+def bump(name: str) -> Version:
+    """Record a change to `name` (shared via Redis when available)."""
+    st = _state(name)
+    ts = time.time()
+    r = get_redis()
+    version = None
+    if r:
+        try:
+            pipe = r.pipeline(transaction=True)
+            pipe.hincrby(f"corpus:{name}", "v", 1)
+            pipe.hset(f"corpus:{name}", "ts", repr(ts))
+            v, _ = pipe.execute()
+            version = Version(f"r{v}", ts)
+        except Exception:
+            version = None
+    with _lock:
+        st.local += 1
+        st.version = version or Version(f"{_BOOT_ID}.{st.local}", ts)
+        st.checked_at = time.monotonic()
+        return st.version
+
+
+def track(model: type, name: str) -> None:
+    """Bump `name` once per commit that wrote `model` rows."""
+
+    def _mark(mapper, connection, target) -> None:
+        sess = object_session(target)
+        if sess is not None:
+            sess.info.setdefault("corpus_dirty", set()).add(name)
+
+    for evt in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, evt, _mark)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_dirty(session) -> None:
+    for name in session.info.pop("corpus_dirty", ()):
+        bump(name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_dirty(session) -> None:
+    session.info.pop("corpus_dirty", None)
@@ -0,0 +1,131 @@
+# app/core/http_cache.py
+"""
+HTTP validators for cached read endpoints: strong ETags over the exact
+response bytes, Last-Modified from the corpus version, If-None-Match /
+If-Modified-Since evaluation, and a small in-process memo of
+(corpus version, request key) → validators so a revalidating client can be
+answered 304 before any cache lookup, query or serialization. Memo entries
+expire after HTTP_VALIDATOR_MEMO_MAX_AGE_SECONDS, which bounds how long a
+worker that missed a version change keeps answering 304.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, NamedTuple, Optional
+
+from fastapi import Request, Response
+from prometheus_client import Counter
+
+HTTP_VALIDATOR_MEMO_SIZE = int(os.getenv("HTTP_VALIDATOR_MEMO_SIZE", "4096"))
+# a memo entry is trusted for at most this long, so a version change this
+# worker hasn't seen (other worker, no Redis) can't keep answering 304
+HTTP_VALIDATOR_MEMO_MAX_AGE_SECONDS = float(os.getenv("HTTP_VALIDATOR_MEMO_MAX_AGE_SECONDS", "30"))
+
+HTTP_NOT_MODIFIED = Counter(
+    "http_not_modified_total", "Conditional requests answered 304", ["route"]
+)
+HTTP_BYTES_SAVED = Counter(
+    "http_bytes_saved_total", "Response bytes not sent", ["route", "reason"]
+)
+HTTP_BUILD_SAVED = Counter(
+    "http_build_seconds_saved_total",
+    "Query + serialize time skipped by answering 304 (as measured when the body was built)",
+    ["route"],
+)
+
+
+class Validated(NamedTuple):
+    headers: Dict[str, str]  # ETag, Last-Modified, Cache-Control, route extras
+    size: int                # body bytes a 304 saves
+    cost: float              # seconds it took to build the body
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def http_date(ts: float) -> str:
+    return formatdate(ts, usegmt=True)
+
+
+def validator_headers(etag: str, updated_at: Optional[float] = None, **extra: str) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if updated_at:
+        headers["Last-Modified"] = http_date(updated_at)
+    headers.update(extra)
+    return headers
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses the weak comparison (RFC 9110 §13.1.2): W/ is ignored."""
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(t.strip().removeprefix("W/") == bare for t in header.split(","))
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """If-None-Match wins when present; otherwise If-Modified-Since vs Last-Modified."""
+    if request.headers.get("if-none-match"):
+        return etag_matches(request, headers.get("ETag", ""))
+    ims, lm = request.headers.get("if-modified-since"), headers.get("Last-Modified")
+    if not ims or not lm:
+        return False
+    try:
+        return parsedate_to_datetime(lm) <= parsedate_to_datetime(ims)
+    except (TypeError, ValueError):
+        return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    # 304 carries the validators / caching headers, never a body
+    return Response(status_code=304, headers=headers)
+
+
+def answer_not_modified(request: Request, route: str, v: Optional[Validated]) -> Optional[Response]:
+    """304 (and savings metrics) if the client's copy is current, else None."""
+    if v is None or not is_not_modified(request, v.headers):
+        return None
+    HTTP_NOT_MODIFIED.labels(route).inc()
+    HTTP_BYTES_SAVED.labels(route, "not_modified").inc(v.size)
+    HTTP_BUILD_SAVED.labels(route).inc(v.cost)
+    return not_modified(v.headers)
+
+
+class ValidatorMemo:
+    """Bounded LRU with a max age: key → Validated."""
+
+    def __init__(self, max_entries: int = HTTP_VALIDATOR_MEMO_SIZE,
+                 max_age: float = HTTP_VALIDATOR_MEMO_MAX_AGE_SECONDS):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Any, tuple[float, Validated]]" = OrderedDict()
+
+    def get(self, key: Any) -> Optional[Validated]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if time.monotonic() - item[0] > self.max_age:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key: Any, headers: Dict[str, str], size: int = 0, cost: float = 0.0) -> Validated:
+        v = Validated(headers, size, cost)
+        with self._lock:
+            self._items[key] = (time.monotonic(), v)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return v
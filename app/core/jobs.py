@@ -0,0 +1,243 @@
+# app/core/jobs.py
+"""
+Bounded background job queues for long-running requests (pitch matching).
+
+Submitting returns a job id at once; JOB_WORKERS asyncio workers per queue
+run the handler (CPU-bound steps inside handlers go through to_thread). The
+queue holds at most JOB_QUEUE_MAX waiting jobs — beyond that `submit` raises
+QueueFull and the route answers 503.
+
+Job state (status, stage, result, error) is kept in process memory and
+mirrored to Redis (`jobs:{kind}:{id}`), so any worker can answer a status
+poll or an SSE subscription. Jobs run in the process that accepted them; a
+restart loses queued work (the state then expires after JOB_TTL_SECONDS).
+
+Idempotency: a submission carrying a dedupe key (e.g. sha256 of the PDF +
+params + user) returns the existing job unless that one failed — SET NX in
+Redis, a process-local map without it.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.cache import cache_add_async, cache_delete_async, cache_get_async, cache_set_async
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "50"))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", str(24 * 3600)))
+# how often subscribers re-read state owned by another worker
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+
+JOB_QUEUE_DEPTH = Gauge("jobs_queue_depth", "Jobs waiting for a worker", ["kind"])
+JOB_RUNNING = Gauge("jobs_running", "Jobs currently running", ["kind"])
+JOB_TOTAL = Counter(
+    "jobs_total", "Job submissions and outcomes", ["kind", "status"]
+)  # status: submitted | deduplicated | rejected | done | failed
+JOB_WAIT = Histogram("job_queue_wait_seconds", "Time from submit to start", ["kind"])
+JOB_DURATION = Histogram(
+    "job_duration_seconds", "Handler run time", ["kind"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300),
+)
+
+TERMINAL = ("done", "failed")
+
+Update = Callable[..., Awaitable[None]]
+Handler = Callable[[Dict[str, Any], Update], Awaitable[Any]]
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobError(Exception):
+    """Expected handler failure; the message is shown to the client as-is."""
+
+
+class JobQueue:
+    def __init__(self, kind: str, handler: Handler,
+                 workers: int = JOB_WORKERS, max_depth: int = JOB_QUEUE_MAX):
+        self.kind = kind
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_depth = max(1, max_depth)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._dedupe: Dict[str, str] = {}
+        self._reserved = 0  # slots held by submits between their check and put
+        _queues.append(self)
+
+    # ---- state
+    def _key(self, job_id: str) -> str:
+        return f"jobs:{self.kind}:{job_id}"
+
+    async def _save(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        state = self._states.setdefault(job_id, {"job_id": job_id, "kind": self.kind, "v": 0})
+        state.update(fields, updated_at=time.time())
+        state["v"] += 1
+        await cache_set_async(self._key(job_id), state, ttl_seconds=JOB_TTL_SECONDS)
+        ev = self._changed.pop(job_id, None)
+        if ev is not None:
+            ev.set()  # wake local subscribers
+        if state.get("status") not in TERMINAL:
+            self._changed[job_id] = asyncio.Event()
+        return state
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        state = self._states.get(job_id)
+        if state is not None:
+            return dict(state)
+        return await cache_get_async(self._key(job_id))
+
+    # ---- submit
+    async def _existing(self, dedupe_key: str) -> Optional[Dict[str, Any]]:
+        job_id = self._dedupe.get(dedupe_key) or await cache_get_async(dedupe_key)
+        if not job_id:
+            return None
+        state = await self.get(job_id)
+        if state is None or state.get("status") == "failed":
+            return None
+        return state
+
+    async def submit(self, payload: Dict[str, Any], owner: str,
+                     dedupe_key: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """(job state, created). Raises QueueFull when JOB_QUEUE_MAX jobs are waiting."""
+        if dedupe_key:
+            dedupe_key = f"jobs:{self.kind}:key:{dedupe_key}"
+            state = await self._existing(dedupe_key)
+            if state is not None:
+                JOB_TOTAL.labels(self.kind, "deduplicated").inc()
+                return state, False
+
+        # reserve the slot before any await: concurrent submits can't overfill
+        # the queue between this check and put_nowait below
+        q = self._ensure_started()
+        if q.qsize() + self._reserved >= self.max_depth:
+            JOB_TOTAL.labels(self.kind, "rejected").inc()
+            raise QueueFull(f"{self.kind} queue is full ({self.max_depth} waiting)")
+        self._reserved += 1
+        job_id = uuid.uuid4().hex[:16]
+        try:
+            if dedupe_key:
+                added = await cache_add_async(dedupe_key, job_id, ttl_seconds=JOB_TTL_SECONDS)
+                if added is False:
+                    # lost a race with an identical submission (or a failed job's key)
+                    state = await self._existing(dedupe_key)
+                    if state is not None:
+                        JOB_TOTAL.labels(self.kind, "deduplicated").inc()
+                        return state, False
+                    await cache_set_async(dedupe_key, job_id, ttl_seconds=JOB_TTL_SECONDS)
+                self._dedupe[dedupe_key] = job_id
+
+            state = await self._save(job_id, status="queued", stage="queued", owner=owner,
+                                     created_at=time.time(), result=None, error=None)
+            q.put_nowait((job_id, payload, time.perf_counter()))  # fits: slot reserved above
+        except BaseException:
+            # never leave a "queued" job nobody runs, nor a dedupe key pointing at it
+            await asyncio.shield(self._abandon(job_id, dedupe_key))
+            raise
+        finally:
+            self._reserved -= 1
+        JOB_QUEUE_DEPTH.labels(self.kind).set(q.qsize())
+        JOB_TOTAL.labels(self.kind, "submitted").inc()
+        return dict(state), True
+
+    async def _abandon(self, job_id: str, dedupe_key: Optional[str]) -> None:
+        if dedupe_key and self._dedupe.get(dedupe_key) == job_id:
+            self._dedupe.pop(dedupe_key, None)
+            await cache_delete_async(dedupe_key)
+        if job_id in self._states:
+            await self._save(job_id, status="failed", error="not queued")
+
+    # ---- workers
+    def _ensure_started(self) -> asyncio.Queue:
+        # bound to the serving loop; started on first use
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_depth)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self._queue
+
+    async def _worker(self) -> None:
+        q = self._queue
+        while True:
+            job_id, payload, queued_at = await q.get()
+            JOB_QUEUE_DEPTH.labels(self.kind).set(q.qsize())
+            JOB_WAIT.labels(self.kind).observe(time.perf_counter() - queued_at)
+            JOB_RUNNING.labels(self.kind).inc()
+            t0 = time.perf_counter()
+
+            async def update(**fields: Any) -> None:
+                await self._save(job_id, **fields)
+
+            try:
+                await self._save(job_id, status="running", stage="running")
+                result = await self.handler(payload, update)
+                await self._save(job_id, status="done", stage="done", result=result)
+                JOB_TOTAL.labels(self.kind, "done").inc()
+            except asyncio.CancelledError:
+                await asyncio.shield(self._save(job_id, status="failed", error="shutdown"))
+                raise
+            except JobError as e:
+                await self._save(job_id, status="failed", error=str(e)[:500])
+                JOB_TOTAL.labels(self.kind, "failed").inc()
+            except Exception as e:
+                await self._save(job_id, status="failed", error=f"{type(e).__name__}: {e}"[:500])
+                JOB_TOTAL.labels(self.kind, "failed").inc()
+            finally:
+                JOB_RUNNING.labels(self.kind).dec()
+                JOB_DURATION.labels(self.kind).observe(time.perf_counter() - t0)
+                q.task_done()
+                self._forget_done()
+
+    def _forget_done(self) -> None:
+        # finished jobs are served from Redis; keep the local map bounded
+        done = [k for k, s in self._states.items() if s.get("status") in TERMINAL]
+        for k in done[:-self.max_depth * 4]:
+            self._states.pop(k, None)
+        if len(self._dedupe) > self.max_depth * 8:
+            live = set(self._states)
+            self._dedupe = {k: v for k, v in self._dedupe.items() if v in live}
+
+    # ---- subscribe
+    async def watch(self, job_id: str, poll: float = JOB_POLL_SECONDS) -> AsyncIterator[Dict[str, Any]]:
+        """Every state change of `job_id` until it finishes (first item = current state)."""
+        seen = None
+        while True:
+            ev = self._changed.get(job_id)
+            state = await self.get(job_id)
+            if state is None:
+                return
+            if state.get("v") != seen:
+                seen = state.get("v")
+                yield state
+            if state.get("status") in TERMINAL:
+                return
+            if ev is not None:
+                # local job: woken on the next update
+                try:
+                    await asyncio.wait_for(ev.wait(), timeout=max(poll, 5.0))
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(poll)
+
+    async def shutdown(self) -> None:
+        tasks, self._tasks, self._queue = self._tasks, [], None
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_queues: List[JobQueue] = []
+
+
+async def shutdown_queues() -> None:
+    for q in _queues:
+        await q.shutdown()
@@ -0,0 +1,136 @@
+# app/core/password_pool.py
+"""
+Dedicated, size-limited executor for bcrypt work.
+
+bcrypt.hash/verify burn 100+ ms of CPU each. Running them inline (or on
+FastAPI's shared threadpool) lets a login burst starve match/QA traffic, so
+password operations get their own small pool:
+- at most PASSWORD_POOL_WORKERS hashes run at once
+- at most PASSWORD_POOL_MAX_QUEUE more wait; beyond that we shed load
+  (PasswordPoolBusy → 503 + Retry-After) instead of queueing unboundedly
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.config import settings
+from app.core.security import hash_password, verify_password, password_needs_rehash
+
+T = TypeVar("T")
+
+PASSWORD_POOL_INFLIGHT = Gauge(
+    "password_pool_inflight", "Password operations running or queued in the bcrypt pool"
+)
+PASSWORD_POOL_QUEUED = Gauge(
+    "password_pool_queued", "Password operations waiting for a bcrypt worker"
+)
+PASSWORD_POOL_REJECTED = Counter(
+    "password_pool_rejected_total", "Password operations shed because the pool was full", ["op"]
+)
+PASSWORD_POOL_SECONDS = Histogram(
+    "password_pool_seconds", "Time spent in bcrypt (excluding queue wait)", ["op"]
+)
+PASSWORD_POOL_WAIT_SECONDS = Histogram(
+    "password_pool_wait_seconds", "Time a password operation waited for a worker", ["op"]
+)
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the pool is saturated; callers should answer 503."""
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(
+    max(1, settings.password_pool_workers) + max(0, settings.password_pool_max_queue)
+)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.password_pool_workers),
+                    thread_name_prefix="bcrypt",
+                )
+    return _executor
+
+
+def _instrumented(op: str, fn: Callable[..., T], *args) -> Callable[[], T]:
+    submitted = time.perf_counter()
+
+    def run() -> T:
+        started = time.perf_counter()
+        PASSWORD_POOL_WAIT_SECONDS.labels(op).observe(started - submitted)
+        PASSWORD_POOL_QUEUED.dec()
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_POOL_SECONDS.labels(op).observe(time.perf_counter() - started)
+
+    return run
+
+
+def _release(fut: "Future") -> None:
+    # runs when the bcrypt call really ends (or is cancelled before it started),
+    # not when the awaiting request goes away — the slot stays held meanwhile
+    if fut.cancelled():
+        PASSWORD_POOL_QUEUED.dec()  # never reached a worker
+    PASSWORD_POOL_INFLIGHT.dec()
+    _slots.release()
+
+
+async def _submit(op: str, fn: Callable[..., T], *args) -> T:
+    if not _slots.acquire(blocking=False):
+        PASSWORD_POOL_REJECTED.labels(op).inc()
+        raise PasswordPoolBusy(f"password pool saturated ({op})")
+    PASSWORD_POOL_INFLIGHT.inc()
+    PASSWORD_POOL_QUEUED.inc()
+    try:
+        fut = _get_executor().submit(_instrumented(op, fn, *args))
+    except BaseException:
+        PASSWORD_POOL_QUEUED.dec()
+        PASSWORD_POOL_INFLIGHT.dec()
+        _slots.release()
+        raise
+    fut.add_done_callback(_release)
+    return await asyncio.wrap_future(fut)
+
+
+async def hash_password_async(pw: str) -> str:
+    return await _submit("hash", hash_password, pw)
+
+
+async def verify_password_async(pw: str, hashed: str) -> bool:
+    return await _submit("verify", verify_password, pw, hashed)
+
+
+async def verify_and_maybe_rehash(pw: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify `pw`; if it matches and `hashed` was made with a different bcrypt cost,
+    also return a fresh hash at the configured cost (else None).
+    """
+    ok = await verify_password_async(pw, hashed)
+    if not ok or not password_needs_rehash(hashed):
+        return ok, None
+    try:
+        return ok, await hash_password_async(pw)
+    except PasswordPoolBusy:
+        # login still succeeds; upgrade on a later login
+        return ok, None
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
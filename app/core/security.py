@@ -2,11 +2,21 @@ import os, time, hmac, hashlib, base64, json
 from passlib.hash import bcrypt
 from app.config import settings
 
+# Cost is configurable; hashes made with another cost still verify and get
+# upgraded on the next successful login (see password_needs_rehash).
+_bcrypt = bcrypt.using(rounds=settings.bcrypt_rounds)
+
 def hash_password(pw: str) -> str:
-    return bcrypt.hash(pw)
+    return _bcrypt.hash(pw)
 
 def verify_password(pw: str, hashed: str) -> bool:
-    return bcrypt.verify(pw, hashed)
+    return _bcrypt.verify(pw, hashed)
+
+def password_needs_rehash(hashed: str) -> bool:
+    try:
+        return _bcrypt.needs_update(hashed)
+    except Exception:
+        return False
 
 def _b64url(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
@@ -14,9 +24,15 @@ def _b64url(data: bytes) -> str:
 def _b64url_json(obj) -> str:
     return _b64url(json.dumps(obj, separators=(",", ":")).encode())
 
-def create_access_token(sub: str, ttl: int = settings.jwt_ttl_seconds) -> str:
+def create_access_token(sub: str, ttl: int = settings.jwt_ttl_seconds, uid=None, role=None) -> str:
     header  = {"alg": settings.jwt_algo, "typ": "JWT"}
-    payload = {"sub": sub, "exp": int(time.time()) + ttl}
+    now = int(time.time())
+    payload = {"sub": sub, "iat": now, "exp": now + ttl}
+    if uid is not None:
+        # carry the primary key (and role) so auth can look the user up by id (or skip the lookup)
+        payload["uid"] = str(uid)
+        if role is not None:
+            payload["role"] = role
     signing_input = f"{_b64url_json(header)}.{_b64url_json(payload)}".encode()
     sig = hmac.new(settings.jwt_secret.encode(), signing_input, hashlib.sha256).digest()
     return f"{signing_input.decode()}.{_b64url(sig)}"
@@ -0,0 +1,81 @@
+# app/core/startup.py
+"""
+Tiny startup profiler.
+
+Records how long each app module takes to import (and which heavy third-party
+packages it dragged in), so cold-start regressions show up in logs and on
+/health/startup instead of as a slow first deploy on Render.
+
+Set STARTUP_PROFILE=1 to also print the report at boot.
+"""
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import time
+from types import ModuleType
+from typing import Any, Dict, List
+
+# process-relative boot clock (app/main imports this first)
+BOOT_STARTED = time.perf_counter()
+
+# Packages that are expensive enough that we want to know who imports them
+HEAVY_PACKAGES = (
+    "torch",
+    "sentence_transformers",
+    "transformers",
+    "weaviate",
+    "grpc",
+    "boto3",
+    "botocore",
+    "onnxruntime",
+    "numpy",
+    "scipy",
+    "openai",
+    "langchain",
+)
+
+_timings: Dict[str, Dict[str, Any]] = {}
+
+
+def timed_import(name: str) -> ModuleType:
+    """
+    importlib.import_module + bookkeeping of wall time and newly loaded heavy packages.
+    """
+    before = set(sys.modules)
+    t0 = time.perf_counter()
+    mod = importlib.import_module(name)
+    dt_ms = (time.perf_counter() - t0) * 1000.0
+    new = set(sys.modules) - before
+    heavy = sorted({m.split(".")[0] for m in new if m.split(".")[0] in HEAVY_PACKAGES})
+    _timings[name] = {
+        "ms": round(dt_ms, 1),
+        "new_modules": len(new),
+        "heavy": heavy,
+    }
+    return mod
+
+
+def record(name: str, started: float) -> None:
+    """Record an arbitrary startup phase that began at perf_counter() == started."""
+    _timings[name] = {"ms": round((time.perf_counter() - started) * 1000.0, 1)}
+
+
+def report() -> Dict[str, Any]:
+    loaded_heavy: List[str] = sorted(p for p in HEAVY_PACKAGES if p in sys.modules)
+    return {
+        "since_boot_ms": round((time.perf_counter() - BOOT_STARTED) * 1000.0, 1),
+        "imports": dict(_timings),
+        "heavy_loaded": loaded_heavy,
+    }
+
+
+def log_report() -> None:
+    if os.getenv("STARTUP_PROFILE", "0") != "1":
+        return
+    r = report()
+    print(f"⏱  startup: {r['since_boot_ms']} ms since boot")
+    for name, t in sorted(r["imports"].items(), key=lambda kv: -kv[1]["ms"]):
+        heavy = f" heavy={','.join(t['heavy'])}" if t.get("heavy") else ""
+        print(f"   {t['ms']:>8.1f} ms  {name}{heavy}")
@@ -0,0 +1,89 @@
+# app/core/streaming.py
+"""
+Streaming response helpers: Server-Sent Events and newline-delimited JSON.
+
+Producers are plain async generators of (event, data) pairs / dicts; these
+helpers do the framing, send keep-alive comments while the producer is idle
+(so proxies don't cut long-running streams) and disable proxy buffering.
+CompressionMiddleware passes multi-chunk bodies through untouched.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def sse_event(data: Any, event: Optional[str] = None, id: Optional[str] = None) -> str:
+    lines = []
+    if id is not None:
+        lines.append(f"id: {id}")
+    if event:
+        lines.append(f"event: {event}")
+    payload = data if isinstance(data, str) else _dumps(data)
+    lines.extend(f"data: {line}" for line in payload.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+
+def ndjson_line(data: Any) -> str:
+    return _dumps(data) + "\n"
+
+
+async def with_keepalive(agen: AsyncIterator[Any], interval: float, ping: Any) -> AsyncIterator[Any]:
+    """Items of `agen`, with `ping` inserted whenever nothing arrived for `interval` seconds."""
+    it = agen.__aiter__()
+    nxt = asyncio.ensure_future(it.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({nxt}, timeout=interval if interval > 0 else None)
+            if not done:
+                yield ping
+                continue
+            try:
+                item = nxt.result()
+            except StopAsyncIteration:
+                return
+            yield item
+            nxt = asyncio.ensure_future(it.__anext__())
+    finally:
+        if not nxt.done():
+            nxt.cancel()
+        aclose = getattr(it, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception:
+                pass
+
+
+async def _sse_frames(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    async for event, data in events:
+        yield sse_event(data, event=event)
+
+
+async def _ndjson_frames(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    async for event, data in events:
+        yield ndjson_line({"event": event, "data": data})
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]], keepalive: float = SSE_KEEPALIVE_SECONDS) -> StreamingResponse:
+    """text/event-stream from (event name, JSON-able data) pairs."""
+    frames = with_keepalive(_sse_frames(events), keepalive, ": keep-alive\n\n")
+    return StreamingResponse(frames, media_type="text/event-stream", headers=STREAM_HEADERS)
+
+
+def ndjson_response(events: AsyncIterator[Tuple[str, Any]], keepalive: float = SSE_KEEPALIVE_SECONDS) -> StreamingResponse:
+    """application/x-ndjson: one {"event", "data"} object per line (blank lines are keep-alives)."""
+    frames = with_keepalive(_ndjson_frames(events), keepalive, "\n")
+    return StreamingResponse(frames, media_type="application/x-ndjson", headers=STREAM_HEADERS)
@@ -0,0 +1,175 @@
+# app/core/warmup.py
+"""
+Startup warm-up + readiness tracking.
+
+Instead of making the first user after a deploy pay for model download/load,
+first-inference JIT, DB connects and Weaviate startup, we do that work right
+after boot (in a background thread, so /health stays instant) and expose the
+per-component state on /ready for load-balancer gating.
+
+Components:
+- model     : load the embedding model and encode a dummy batch
+- db        : pre-open DB_WARMUP_CONNECTIONS pool connections
+- weaviate  : create the client (+ schema)
+- extra hooks registered via register_warmup() (e.g. local vector indexes)
+
+Env:
+  WARMUP_ON_STARTUP=1       run warm-up at startup (default on)
+  WARMUP_BLOCKING=0         block startup until warm-up finishes
+  READY_REQUIRED=model,db   components that must be ready for /ready → 200
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+WARMUP_BLOCKING = os.getenv("WARMUP_BLOCKING", "0") == "1"
+READY_REQUIRED = [
+    c.strip() for c in os.getenv("READY_REQUIRED", "model,db").split(",") if c.strip()
+]
+
+_lock = threading.Lock()
+_state: Dict[str, Dict[str, Any]] = {}
+_hooks: List[tuple[str, Callable[[], Any], bool]] = []
+_thread: Optional[threading.Thread] = None
+
+
+def register_warmup(name: str, fn: Callable[[], Any], enabled: bool = True) -> None:
+    """
+    Add a warm-up step. `fn` may return a small dict of details for /ready.
+    Steps run in registration order after the built-in ones (READY_REQUIRED
+    components always go first).
+    """
+    with _lock:
+        _hooks.append((name, fn, enabled))
+        _state.setdefault(name, {"status": "pending" if enabled else "disabled"})
+
+
+def _set(name: str, **kw: Any) -> None:
+    with _lock:
+        _state.setdefault(name, {}).update(kw)
+
+
+def _run_step(name: str, fn: Callable[[], Any]) -> None:
+    _set(name, status="warming", error=None)
+    t0 = time.perf_counter()
+    try:
+        details = fn()
+        _set(
+            name,
+            status="ready",
+            duration_ms=round((time.perf_counter() - t0) * 1000.0, 1),
+            **({"details": details} if details else {}),
+        )
+    except Exception as e:
+        _set(
+            name,
+            status="failed",
+            duration_ms=round((time.perf_counter() - t0) * 1000.0, 1),
+            error=str(e)[:300],
+        )
+
+
+# ----------------------------
+# Built-in steps
+# ----------------------------
+
+def _warm_model() -> Dict[str, Any]:
+    from app.ml.embeddings import EMBEDDING_MODEL_NAME, get_backend, embed_texts
+
+    backend = get_backend()
+    # a small batch triggers first-inference allocations / kernel selection
+    vecs = embed_texts(["warm-up sentence for the embedding model"] * 8)
+    return {
+        "model": EMBEDDING_MODEL_NAME,
+        "backend": backend.name,
+        "dim": len(vecs[0]) if vecs else 0,
+    }
+
+
+def _warm_db() -> Dict[str, Any]:
+    from sqlalchemy import text
+    from app.db.core import engine, read_engine, DB_POOL_SIZE, DB_READ_POOL_SIZE
+
+    engines = [(engine, DB_POOL_SIZE)]
+    if read_engine is not engine:
+        engines.append((read_engine, DB_READ_POOL_SIZE))
+    conns = []
+    try:
+        for eng, size in engines:
+            n = max(1, int(os.getenv("DB_WARMUP_CONNECTIONS", str(size))))
+            for _ in range(n):
+                c = eng.connect()
+                c.execute(text("SELECT 1"))
+                conns.append(c)
+    finally:
+        # back to the pool, now established
+        for c in conns:
+            c.close()
+    return {"connections": len(conns), "read_replica": read_engine is not engine}
+
+
+def _warm_weaviate() -> Dict[str, Any]:
+    from app.adapters.vector.weaviate_client import get_client
+
+    client = get_client()
+    return {"ready": bool(client.is_ready())}
+
+
+def _all_steps() -> List[tuple[str, Callable[[], Any]]]:
+    steps: List[tuple[str, Callable[[], Any]]] = [
+        ("db", _warm_db),
+        ("weaviate", _warm_weaviate),
+        ("model", _warm_model),
+    ]
+    with _lock:
+        steps.extend((n, fn) for (n, fn, enabled) in _hooks if enabled)
+    return steps
+
+
+def run_warmup() -> None:
+    t0 = time.perf_counter()
+    # READY_REQUIRED components first: /ready must not wait on optional ones
+    # (a slow or unreachable Weaviate, index builds)
+    steps = sorted(_all_steps(), key=lambda step: step[0] not in READY_REQUIRED)
+    for name, fn in steps:
+        _run_step(name, fn)
+    _set("_total", status="done", duration_ms=round((time.perf_counter() - t0) * 1000.0, 1))
+
+
+def start_warmup() -> None:
+    """
+    Called from the FastAPI startup hook.
+    """
+    global _thread
+    for name, _fn in _all_steps():
+        _set(name, status="pending")
+    if not WARMUP_ON_STARTUP:
+        return
+    if WARMUP_BLOCKING:
+        run_warmup()
+        return
+    _thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    _thread.start()
+
+
+def readiness() -> tuple[bool, Dict[str, Any]]:
+    """
+    (ready, report). Ready when every READY_REQUIRED component is ready.
+    With warm-up disabled, required components are considered lazily ready.
+    """
+    with _lock:
+        components = {k: dict(v) for k, v in _state.items() if not k.startswith("_")}
+        total = dict(_state.get("_total", {}))
+    if not WARMUP_ON_STARTUP:
+        return True, {"ready": True, "warmup": "disabled", "components": components}
+    ready = all(components.get(c, {}).get("status") == "ready" for c in READY_REQUIRED)
+    return ready, {
+        "ready": ready,
+        "required": READY_REQUIRED,
+        "components": components,
+        "warmup_ms": total.get("duration_ms"),
+    }
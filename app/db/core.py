@@ -1,61 +1,166 @@
 # app/db/core.py
 
 import os
+import time
+from typing import Optional
 from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import SQLModel, create_engine, Session
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # ---------------------------------------------------------
-# Resolve DATABASE_URL
+# Resolve DATABASE_URL (+ optional DATABASE_READ_URL)
 # ---------------------------------------------------------
-raw = os.getenv("DATABASE_URL") or os.getenv("DB_URL")
-if not raw:
-    raise RuntimeError("DATABASE_URL is not set")
 
-# 1) Normalize Postgres URI → psycopg2 driver
-url = raw.replace("postgres://", "postgresql://", 1)
-if url.startswith("postgresql://"):
-    url = url.replace("postgresql://", "postgresql+psycopg2://", 1)
+def normalize_url(raw: str) -> str:
+    # 1) Normalize Postgres URI → psycopg2 driver
+    url = raw.replace("postgres://", "postgresql://", 1)
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+psycopg2://", 1)
 
-# 2) Add sslmode=require for cloud DBs (not localhost)
-try:
-    parsed = urlparse(url)
-    host = (parsed.hostname or "").lower()
+    # 2) Add sslmode=require for cloud DBs (not localhost)
+    try:
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
 
-    is_local = host in ("localhost", "127.0.0.1", "::1") or url.startswith("sqlite")
+        is_local = host in ("localhost", "127.0.0.1", "::1") or url.startswith("sqlite")
 
-    query = dict(parse_qsl(parsed.query, keep_blank_values=True))
-    if not is_local and "sslmode" not in query:
-        query["sslmode"] = "require"
+        query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+        if not is_local and "sslmode" not in query:
+            query["sslmode"] = "require"
 
-    new_query = urlencode(query)
-    url = urlunparse(parsed._replace(query=new_query))
-except Exception:
-    # fallback — don't break app if parsing error
-    pass
+        new_query = urlencode(query)
+        url = urlunparse(parsed._replace(query=new_query))
+    except Exception:
+        # fallback — don't break app if parsing error
+        pass
+    return url
 
-print("✅ DATABASE_URL in use:", url)
 
-# ---------------------------------------------------------
-# SQLite special handling
-# ---------------------------------------------------------
-connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+def display_url(db_url: str) -> str:
+    """URL safe for logs (password masked)."""
+    try:
+        return make_url(db_url).render_as_string(hide_password=True)
+    except Exception:
+        return "<unparseable database URL>"
+
+
+raw = os.getenv("DATABASE_URL") or os.getenv("DB_URL")
+if not raw:
+    raise RuntimeError("DATABASE_URL is not set")
+
+url = normalize_url(raw)
+print("✅ DATABASE_URL in use:", display_url(url))
+
+# Read replica for read-only routes (list/get investors, products, match scans).
+# Unset → reads go to the primary. A second local Postgres, or a SQLite copy
+# (sqlite:///./replica.db), stands in for a replica in development.
+raw_read = os.getenv("DATABASE_READ_URL")
+read_url = normalize_url(raw_read) if raw_read else None
+if read_url:
+    print("✅ DATABASE_READ_URL in use:", display_url(read_url))
 
 # ---------------------------------------------------------
 # Connection Pool Settings (Scaling)
 # ---------------------------------------------------------
 DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
 DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# seconds a request waits for a free connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# recycle connections older than this (proxies / PgBouncer drop idle ones); -1 = never
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(DB_POOL_SIZE)))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", str(DB_MAX_OVERFLOW)))
+
+# Postgres statement_timeout (ms, 0 = none): connection default, and the
+# tighter one applied per request by get_read_session
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+DB_READ_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_READ_STATEMENT_TIMEOUT_MS", "5000"))
 
-engine = create_engine(
-    url,
-    connect_args=connect_args,
-    pool_pre_ping=True,
-    pool_size=DB_POOL_SIZE,
-    max_overflow=DB_MAX_OVERFLOW,
+# ---------------------------------------------------------
+# Pool metrics
+# ---------------------------------------------------------
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", ["engine"]
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond pool_size", ["engine"]
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection", ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ["engine"]
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout (including waits on an exhausted pool)."""
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            DB_POOL_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            DB_POOL_WAIT.labels(self.metrics_name).observe(time.perf_counter() - t0)
+
+
+def _connect_args(db_url: str, statement_timeout_ms: int) -> dict:
+    if db_url.startswith("sqlite"):
+        # SQLite special handling
+        return {"check_same_thread": False}
+    if db_url.startswith("postgresql") and statement_timeout_ms > 0:
+        return {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    return {}
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Same instrumentation for async engines (asyncpg / aiosqlite)."""
+
+
+def _pool_class(name: str, base: type = InstrumentedQueuePool) -> type:
+    # per-engine subclass: the label survives pool.recreate() (engine.dispose())
+    return type(f"{base.__name__}_{name}", (base,), {"metrics_name": name})
+
+
+def _watch_pool(name: str, sync_engine) -> None:
+    # sampled at scrape time, so they're always current
+    DB_POOL_CHECKED_OUT.labels(name).set_function(lambda: sync_engine.pool.checkedout())
+    DB_POOL_OVERFLOW.labels(name).set_function(lambda: max(0, sync_engine.pool.overflow()))
+
+
+def make_engine(db_url: str, name: str, pool_size: int, max_overflow: int):
+    """Engine with an instrumented pool; `name` labels its metrics."""
+    eng = create_engine(
+        db_url,
+        connect_args=_connect_args(db_url, DB_STATEMENT_TIMEOUT_MS),
+        poolclass=_pool_class(name),
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    _watch_pool(name, eng)
+    return eng
+
+
+engine = make_engine(url, "primary", DB_POOL_SIZE, DB_MAX_OVERFLOW)
+read_engine = (
+    make_engine(read_url, "read", DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW) if read_url else engine
 )
 
 # ---------------------------------------------------------
@@ -68,6 +173,50 @@ def init_db() -> None:
     """
     from app.db import models  # ensures SQLModel metadata is loaded
     SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
+
+
+def _add_missing_columns() -> None:
+    """
+    create_all never alters existing tables: add nullable columns introduced
+    since a table was created (additive only — anything else needs a real
+    migration).
+    """
+    from sqlalchemy import inspect
+    from sqlalchemy.exc import DBAPIError
+
+    insp = inspect(engine)
+    guard = "IF NOT EXISTS " if engine.dialect.name == "postgresql" else ""
+    for table in SQLModel.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {c["name"] for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if col.name in existing or not col.nullable:
+                continue
+            ddl = col.type.compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN {guard}"{col.name}" {ddl}'))
+            except DBAPIError:
+                # several workers booting at once: fine if another one added it first
+                if col.name not in {c["name"] for c in inspect(engine).get_columns(table.name)}:
+                    raise
+
+
+def set_statement_timeout(session: Session, ms: Optional[int]) -> None:
+    """
+    Statement timeout for every transaction this session begins (Postgres
+    SET LOCAL; no-op elsewhere). Applied when a transaction actually starts,
+    so requests answered from cache never check out a connection for it.
+    """
+    if not ms or ms <= 0 or session.get_bind().dialect.name != "postgresql":
+        return
+    stmt = text(f"SET LOCAL statement_timeout = {int(ms)}")
+
+    @event.listens_for(session, "after_begin")
+    def _apply_timeout(sess, transaction, connection):
+        connection.execute(stmt)
 
 
 def get_session():
@@ -76,3 +225,116 @@ def get_session():
     """
     with Session(engine) as session:
         yield session
+
+
+def get_read_session():
+    """
+    Dependency for read-only endpoints: replica when DATABASE_READ_URL is set
+    (may lag the primary — don't use it to read back a write from the same
+    request), with the tighter DB_READ_STATEMENT_TIMEOUT_MS.
+    """
+    with Session(read_engine) as session:
+        set_statement_timeout(session, DB_READ_STATEMENT_TIMEOUT_MS)
+        yield session
+
+
+# ---------------------------------------------------------
+# Async engines + AsyncSession (asyncpg / aiosqlite)
+# ---------------------------------------------------------
+# For hot read endpoints declared `async def`: they wait on the database
+# without holding one of FastAPI's threadpool threads. Engines are created on
+# first use, so the async drivers are only needed once such a route is hit.
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "20"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "20"))
+
+_async_engines: dict = {}
+
+
+# asyncpg.connect() keywords accepted in the URL query; SQLAlchemy passes every
+# query param through as a keyword, so libpq-only ones (channel_binding,
+# gssencmode, sslrootcert, application_name, ...) would fail at connect time
+ASYNCPG_QUERY_PARAMS = {
+    "ssl", "direct_tls", "timeout", "command_timeout", "target_session_attrs", "passfile",
+    "prepared_statement_cache_size", "statement_cache_size",
+    "max_cached_statement_lifetime", "max_cacheable_statement_size",
+}
+
+
+def async_url(db_url: str) -> str:
+    """
+    Sync URL → async driver URL. libpq's `sslmode` / `connect_timeout` become
+    asyncpg's `ssl` / `timeout`; params asyncpg doesn't understand are dropped.
+    """
+    if db_url.startswith("sqlite"):
+        return db_url.replace("sqlite://", "sqlite+aiosqlite://", 1).replace(
+            "sqlite+pysqlite://", "sqlite+aiosqlite://", 1
+        )
+    if not db_url.startswith("postgresql"):
+        return db_url
+    parsed = urlparse(db_url)
+    query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    if "connect_timeout" in query:
+        query["timeout"] = query.pop("connect_timeout")
+    query = {k: v for k, v in query.items() if k in ASYNCPG_QUERY_PARAMS}
+    return urlunparse(parsed._replace(scheme="postgresql+asyncpg", query=urlencode(query)))
+
+
+def _async_connect_args(db_url: str, statement_timeout_ms: int) -> dict:
+    if db_url.startswith("postgresql") and statement_timeout_ms > 0:
+        return {"server_settings": {"statement_timeout": str(statement_timeout_ms)}}
+    return {}
+
+
+def get_async_engine(read: bool = False):
+    """Lazily created async engine for the primary (or the replica, `read=True`)."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    key = "read" if read and read_url else "primary"
+    eng = _async_engines.get(key)
+    if eng is None:
+        db_url = read_url if key == "read" else url
+        name = f"{key}_async"
+        eng = create_async_engine(
+            async_url(db_url),
+            connect_args=_async_connect_args(db_url, DB_STATEMENT_TIMEOUT_MS),
+            poolclass=_pool_class(name, InstrumentedAsyncQueuePool),
+            pool_pre_ping=True,
+            pool_size=DB_ASYNC_POOL_SIZE,
+            max_overflow=DB_ASYNC_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+        _watch_pool(name, eng.sync_engine)
+        _async_engines[key] = eng
+    return eng
+
+
+async def get_async_session():
+    """
+    Async counterpart of get_session (primary).
+    """
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_read_session():
+    """
+    Async counterpart of get_read_session (replica if configured, read timeout).
+    """
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async with AsyncSession(get_async_engine(read=True), expire_on_commit=False) as session:
+        set_statement_timeout(session.sync_session, DB_READ_STATEMENT_TIMEOUT_MS)
+        yield session
+
+
+async def dispose_async_engines() -> None:
+    """Close pooled async connections (FastAPI shutdown)."""
+    engines = list(_async_engines.values())
+    _async_engines.clear()
+    for eng in engines:
+        await eng.dispose()
@@ -88,7 +88,10 @@ class Product(SQLModel, table=True):
     fees: Optional[str] = None
     eligibility: Optional[str] = None
     risk_label: Optional[str] = None
+    # full source record as ingested (include_meta=true on /products/)
     meta: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    # sha1 of the normalized source record; unchanged rows are skipped on re-ingest
+    content_hash: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     __table_args__ = (
@@ -1,14 +1,30 @@
 # app/main.py
 import os
+import time
 from dotenv import load_dotenv
 load_dotenv()
 
+from app.core import startup  # first: starts the boot clock
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 
-from app.db.core import init_db
-from app.api.v1.routers import auth, match, investors, products
+from app.core import password_pool, warmup
+from app.core.jobs import shutdown_queues
+from app.core.compression import CompressionMiddleware
+from app.adapters.vector.weaviate_client import close_async_client, close_client, weaviate_health
+from app.cache import close_redis_async
+from app.db.core import dispose_async_engines, init_db
+
+# Routers are imported through the profiler so per-module import cost is visible
+# (/health/startup). Heavy deps (numpy, torch, weaviate, boto3) load on first use
+# or in the startup hook below.
+auth      = startup.timed_import("app.api.v1.routers.auth")
+match     = startup.timed_import("app.api.v1.routers.match")
+investors = startup.timed_import("app.api.v1.routers.investors")
+products  = startup.timed_import("app.api.v1.routers.products")
 
 app = FastAPI(title="Startup→Investor Matcher")
 
@@ -25,11 +41,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# brotli/gzip for large JSON bodies (COMPRESSION_MIN_BYTES); streams pass through
+app.add_middleware(CompressionMiddleware)
+
 Instrumentator().instrument(app).expose(app, endpoint="/metrics", include_in_schema=False)
 
 @app.on_event("startup")
 def on_startup():
+    t0 = time.perf_counter()
     init_db()
+    startup.record("init_db", t0)
+    t0 = time.perf_counter()
+    from app.ml.scoring import load_blend_config  # numpy-backed: kept off the import path
+
+    load_blend_config()  # tuned blend weights (SCORING_CONFIG_PATH), defaults if absent
+    startup.record("scoring_config", t0)
+
+    # local indexes built during warm-up (see app/core/warmup.py)
+    from app.ml.investor_index import warm_investor_index
+    from app.ml.multivector import MULTIVECTOR_SOURCE
+    from app.ml.product_index import warm_product_index
+
+    warmup.register_warmup("investor_index", warm_investor_index, enabled=MULTIVECTOR_SOURCE == "local")
+    warmup.register_warmup("product_index", warm_product_index)
+    startup.log_report()
+    # model / DB pool / Weaviate warm-up (background unless WARMUP_BLOCKING=1)
+    warmup.start_warmup()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    password_pool.shutdown()
+    close_client()  # stops embedded Weaviate / closes the gRPC channel cleanly
+
+@app.on_event("shutdown")
+async def on_shutdown_async():
+    # loop-bound workers / clients → stopped on the serving loop
+    await shutdown_queues()
+    await close_async_client()
+    await dispose_async_engines()
+    await close_redis_async()
 
 # Routers
 app.include_router(auth.router,      prefix="/api/v1")
@@ -40,3 +90,22 @@ app.include_router(products.router,  prefix="/api/v1")
 @app.get("/health")
 def health():
     return {"ok": True}
+
+@app.get("/ready")
+def ready():
+    """
+    Readiness for load-balancer gating: 200 once required components are warm, else 503.
+    """
+    ok, report = warmup.readiness()
+    return JSONResponse(report, status_code=200 if ok else 503)
+
+@app.get("/health/weaviate", include_in_schema=False)
+def health_weaviate():
+    """Connection + circuit-breaker state; 503 while the circuit is open."""
+    report = weaviate_health()
+    ok = report["circuit"]["state"] != "open"
+    return JSONResponse(report, status_code=200 if ok else 503)
+
+@app.get("/health/startup", include_in_schema=False)
+def health_startup():
+    return startup.report()
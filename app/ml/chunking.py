@@ -0,0 +1,136 @@
+# app/ml/chunking.py
+"""
+Token-aware chunker shared by RAG, investor QA and PDF loading.
+
+Character-based splits either waste compute (the model silently truncates at
+max_seq_length tokens — 256 for all-MiniLM-L6-v2) or drop coverage. Here we
+count tokens with the embedding model's own tokenizer and pack whole sentences
+into chunks of at most `max_tokens`, with a small sentence-level overlap.
+
+If the tokenizer can't be loaded (offline, model not cached) we fall back to a
+conservative regex estimate so callers with keyword fallbacks keep working.
+"""
+from __future__ import annotations
+
+import math
+import os
+import re
+from typing import Callable, List, Optional
+
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+# room for [CLS]/[SEP]
+_SPECIAL_TOKENS = 2
+_FALLBACK_MAX_TOKENS = 254
+
+_SENT_END = re.compile(r"(?<=[.!?;])\s+(?=[\"'(\[]?[A-Z0-9•\-])")
+_ROUGH_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def _approx_counts(texts: List[str]) -> List[int]:
+    # WordPiece splits ~1.3 tokens per word on English prose; round up to stay under budget
+    return [int(math.ceil(len(_ROUGH_TOKEN.findall(t)) * 1.3)) for t in texts]
+
+
+# set once the backend failed to load: lru_cache doesn't cache exceptions, so
+# without it every chunk_text call would retry the full model load
+_backend_failed = False
+
+
+def _counter() -> tuple[Callable[[List[str]], List[int]], int]:
+    """(count_fn, model max content tokens)."""
+    global _backend_failed
+    if _backend_failed:
+        return _approx_counts, _FALLBACK_MAX_TOKENS
+    try:
+        from app.ml.embeddings import get_backend
+
+        b = get_backend()
+        return b.count_tokens, max(16, b.max_seq_length - _SPECIAL_TOKENS)
+    except Exception:
+        _backend_failed = True
+        return _approx_counts, _FALLBACK_MAX_TOKENS
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split on line breaks (paragraphs, bullets, PDF lines) and sentence punctuation.
+    """
+    if not text:
+        return []
+    out: List[str] = []
+    for para in text.replace("\r", "").split("\n"):
+        para = para.strip()
+        if not para:
+            continue
+        out.extend(s.strip() for s in _SENT_END.split(para) if s.strip())
+    return out
+
+
+def _split_long(sentence: str, n_tokens: int, max_tokens: int) -> List[str]:
+    """
+    A single sentence over budget: cut it into word windows sized by its token density.
+    """
+    words = sentence.split()
+    if len(words) <= 1:
+        return [sentence]
+    per_word = max(1.0, n_tokens / len(words))
+    step = max(1, int(max_tokens / per_word))
+    return [" ".join(words[i : i + step]) for i in range(0, len(words), step)]
+
+
+def chunk_text(
+    text: str,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> List[str]:
+    """
+    Greedy sentence packer:
+    - never exceeds `max_tokens` (defaults to the model's max_seq_length minus specials)
+    - keeps sentences whole unless a single sentence is over budget
+    - each new chunk starts with up to `overlap_tokens` of trailing sentences
+      from the previous chunk, so facts spanning a boundary stay retrievable
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+
+    count, model_max = _counter()
+    budget = min(max_tokens or model_max, model_max)
+    try:
+        counts = count(sentences)
+    except Exception:
+        counts = _approx_counts(sentences)
+
+    # explode over-budget sentences first
+    units: List[tuple[str, int]] = []
+    for s, n in zip(sentences, counts):
+        if n <= budget:
+            units.append((s, n))
+            continue
+        parts = _split_long(s, n, budget)
+        try:
+            part_counts = count(parts)
+        except Exception:
+            part_counts = _approx_counts(parts)
+        units.extend(zip(parts, part_counts))
+
+    chunks: List[str] = []
+    buf: List[tuple[str, int]] = []
+    size = 0
+    for s, n in units:
+        if buf and size + n > budget:
+            chunks.append(" ".join(t for t, _ in buf))
+            # carry a tail of the previous chunk as overlap
+            tail: List[tuple[str, int]] = []
+            tail_size = 0
+            for t, tn in reversed(buf):
+                if tail_size + tn > overlap_tokens or tail_size + tn + n > budget:
+                    break
+                tail.insert(0, (t, tn))
+                tail_size += tn
+            buf, size = tail, tail_size
+        buf.append((s, n))
+        size += n
+    if buf:
+        chunks.append(" ".join(t for t, _ in buf))
+    return chunks
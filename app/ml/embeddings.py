@@ -1,9 +1,13 @@
 # app/ml/embeddings.py
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import List
+import json
 import os
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, TYPE_CHECKING
 
 # Avoid tokenizer parallel warnings in production logs
 os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
@@ -12,12 +16,17 @@ os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 # export EMBEDDING_MODEL_NAME="mixedbread-ai/mxbai-embed-large-v1"  (or any sentence-transformers compatible model)
 EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
 
-try:
+# ...and the inference backend, same idea:
+#   sentence-transformers  fp32 torch (default, reference vectors)
+#   torch-int8             dynamic int8 quantization of the Linear layers (CPU)
+#   onnx                   ONNX Runtime; exported on first use to EMBEDDING_ONNX_DIR
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence-transformers").strip().lower()
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", ".onnx")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
     from sentence_transformers import SentenceTransformer
-except Exception as e:  # pragma: no cover
-    raise RuntimeError(
-        "sentence-transformers is required. Install with: pip install sentence-transformers"
-    ) from e
 
 
 @lru_cache(maxsize=1)
@@ -25,10 +34,268 @@ def _model() -> "SentenceTransformer":
     """
     Lazily load the embedding model once per process.
     all-MiniLM-L6-v2 → 384-dim, fast, widely used for RAG.
+
+    sentence-transformers (and torch) are imported here, not at module import,
+    so importing the API doesn't pay for them at boot.
     """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError(
+            "sentence-transformers is required. Install with: pip install sentence-transformers"
+        ) from e
     return SentenceTransformer(EMBEDDING_MODEL_NAME)
 
 
+# ----------------------------
+# Backends
+# ----------------------------
+
+class EmbeddingBackend(ABC):
+    """
+    Minimal interface every backend implements (a backend missing one fails
+    at construction, not mid-request).
+    encode() returns a float32 (n, dim) matrix of L2-normalized rows.
+    """
+    name: str = "base"
+
+    @abstractmethod
+    def encode(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> "np.ndarray":
+        ...
+
+    @property
+    @abstractmethod
+    def max_seq_length(self) -> int:
+        ...
+
+    @abstractmethod
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """Model-tokenizer token counts, excluding special tokens ([CLS]/[SEP])."""
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """fp32 torch via sentence-transformers; the reference implementation."""
+    name = "sentence-transformers"
+
+    def __init__(self, model: "SentenceTransformer | None" = None):
+        self.model = model if model is not None else _model()
+
+    def encode(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> "np.ndarray":
+        import numpy as np
+
+        # normalize_embeddings=True ensures vectors are unit length
+        vecs = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return np.asarray(vecs, dtype=np.float32)
+
+    @property
+    def max_seq_length(self) -> int:
+        return int(getattr(self.model, "max_seq_length", 0) or 512)
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        ids = self.model.tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return [len(x) for x in ids]
+
+
+class QuantizedTorchBackend(SentenceTransformerBackend):
+    """
+    Dynamic int8 quantization of every nn.Linear (weights int8, activations
+    quantized on the fly). No export step, ~2x faster on CPU for MiniLM.
+    Loads its own copy of the model so the fp32 reference stays intact.
+    """
+    name = "torch-int8"
+
+    def __init__(self):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        fp32 = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+        q = torch.quantization.quantize_dynamic(fp32, {torch.nn.Linear}, dtype=torch.qint8)
+        super().__init__(model=q)
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    ONNX Runtime over the exported transformer + numpy pooling/normalization.
+
+    Layout of EMBEDDING_ONNX_DIR/<model>/:
+      model.onnx       transformer graph (input_ids, attention_mask[, token_type_ids])
+      tokenizer.json   fast tokenizer (loaded with `tokenizers`, no torch needed)
+      embedding.json   {"pooling": "mean"|"cls", "max_seq_length": int, "dim": int}
+
+    If the directory is missing it's exported once from the sentence-transformers
+    model (needs torch for that one-off step only).
+    """
+    name = "onnx"
+
+    def __init__(self, model_dir: str | Path | None = None):
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except Exception as e:  # pragma: no cover
+            raise RuntimeError(
+                "EMBEDDING_BACKEND=onnx needs onnxruntime and tokenizers. "
+                "Install with: pip install onnxruntime tokenizers"
+            ) from e
+
+        self.model_dir = Path(model_dir) if model_dir else _onnx_dir()
+        if not (self.model_dir / "model.onnx").exists():
+            export_onnx(self.model_dir)
+
+        self.meta: Dict[str, Any] = json.loads((self.model_dir / "embedding.json").read_text())
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding()
+        # separate, untruncated copy for counting (chunking needs true lengths)
+        self._counter = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+        self._counter.no_truncation()
+        self._counter.no_padding()
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(self.model_dir / "model.onnx"), opts, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+    @property
+    def max_seq_length(self) -> int:
+        return int(self.meta.get("max_seq_length") or 256)
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        return [len(e.ids) for e in self._counter.encode_batch(texts, add_special_tokens=False)]
+
+    def encode(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> "np.ndarray":
+        import numpy as np
+
+        out = []
+        for i in range(0, len(texts), max(1, batch_size)):
+            enc = self.tokenizer.encode_batch(texts[i : i + batch_size])
+            ids = np.asarray([e.ids for e in enc], dtype=np.int64)
+            mask = np.asarray([e.attention_mask for e in enc], dtype=np.int64)
+            feeds = {"input_ids": ids, "attention_mask": mask}
+            if "token_type_ids" in self._inputs:
+                feeds["token_type_ids"] = np.asarray([e.type_ids for e in enc], dtype=np.int64)
+            hidden = self.session.run(None, feeds)[0]  # (b, seq, dim)
+
+            if self.meta.get("pooling") == "cls":
+                pooled = hidden[:, 0, :]
+            else:
+                m = mask[:, :, None].astype(np.float32)
+                pooled = (hidden * m).sum(axis=1) / np.clip(m.sum(axis=1), 1e-9, None)
+            out.append(pooled.astype(np.float32))
+
+        vecs = np.concatenate(out, axis=0) if out else np.zeros((0, 0), dtype=np.float32)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        return vecs / np.clip(norms, 1e-12, None)
+
+
+def _onnx_dir() -> Path:
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", EMBEDDING_MODEL_NAME)
+    return Path(EMBEDDING_ONNX_DIR) / safe
+
+
+def export_onnx(model_dir: str | Path) -> Path:
+    """
+    One-off export of the sentence-transformers model to ONNX (+ tokenizer + pooling meta).
+    Supports mean/CLS pooling models such as all-MiniLM-L6-v2.
+    """
+    import torch
+
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+
+    st = _model()
+    transformer = st[0].auto_model.eval()
+    tokenizer = st.tokenizer
+    pooling = "mean"
+    if len(st) > 1 and hasattr(st[1], "get_pooling_mode_str"):
+        pooling = "cls" if st[1].get_pooling_mode_str() == "cls" else "mean"
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    dyn = {n: {0: "batch", 1: "seq"} for n in names}
+    dyn["last_hidden_state"] = {0: "batch", 1: "seq"}
+
+    class _Wrapper(torch.nn.Module):
+        def __init__(self, m):
+            super().__init__()
+            self.m = m
+
+        def forward(self, *args):
+            return self.m(**dict(zip(names, args))).last_hidden_state
+
+    with torch.no_grad():
+        torch.onnx.export(
+            _Wrapper(transformer),
+            tuple(sample[n] for n in names),
+            str(model_dir / "model.onnx"),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dyn,
+            opset_version=14,
+        )
+
+    tokenizer.save_pretrained(str(model_dir))  # writes tokenizer.json for fast tokenizers
+    (model_dir / "embedding.json").write_text(json.dumps({
+        "model": EMBEDDING_MODEL_NAME,
+        "pooling": pooling,
+        "max_seq_length": int(st.max_seq_length),
+        "dim": int(st.get_sentence_embedding_dimension()),
+    }))
+    return model_dir
+
+
+_BACKENDS = {
+    "sentence-transformers": SentenceTransformerBackend,
+    "st": SentenceTransformerBackend,
+    "fp32": SentenceTransformerBackend,
+    "torch-int8": QuantizedTorchBackend,
+    "int8": QuantizedTorchBackend,
+    "onnx": OnnxBackend,
+}
+
+
+def make_backend(name: str) -> EmbeddingBackend:
+    """Build a backend by name (see EMBEDDING_BACKEND). Used by get_backend() and benchmarks."""
+    cls = _BACKENDS.get(name.strip().lower())
+    if cls is None:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND={name!r}; choose from {sorted(_BACKENDS)}")
+    return cls()
+
+
+@lru_cache(maxsize=1)
+def get_backend() -> EmbeddingBackend:
+    """
+    The process-wide backend selected by EMBEDDING_BACKEND.
+    """
+    return make_backend(EMBEDDING_BACKEND)
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+
+def embed_matrix(texts: List[str]) -> "np.ndarray":
+    """
+    Embed texts into a float32 (n, dim) matrix of unit-length rows.
+    Prefer this in vectorized code paths; it skips the list conversion.
+    """
+    import numpy as np
+
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    return get_backend().encode(texts)
+
+
 def embed_texts(texts: List[str]) -> List[List[float]]:
     """
     Embed a list of texts with L2-normalized vectors (cosine-ready).
@@ -36,10 +303,7 @@ def embed_texts(texts: List[str]) -> List[List[float]]:
     """
     if not texts:
         return []
-    # normalize_embeddings=True ensures vectors are unit length
-    vecs = _model().encode(texts, normalize_embeddings=True)
-    # Some backends return numpy arrays; convert to plain lists
-    return [v.tolist() if hasattr(v, "tolist") else list(v) for v in vecs]
+    return embed_matrix(texts).tolist()
 
 
 def embed_text(text: str) -> List[float]:
@@ -47,3 +311,63 @@ def embed_text(text: str) -> List[float]:
     Convenience wrapper to embed a single text; returns a unit-length vector.
     """
     return embed_texts([text])[0] if text else []
+
+
+# Upper bound on chunks embedded per document (a 40-page deck is ~30-60 chunks)
+DOCUMENT_MAX_CHUNKS = int(os.getenv("DOCUMENT_MAX_CHUNKS", "96"))
+
+
+def embed_chunks(text: str, max_chunks: int = DOCUMENT_MAX_CHUNKS) -> "tuple[List[str], np.ndarray]":
+    """
+    Token-aware chunking of a whole document + one batched encode.
+    Returns (chunks, (n_chunks, dim) unit-length matrix).
+    """
+    from app.ml.chunking import chunk_text
+
+    chunks = chunk_text(text)[: max(1, max_chunks)]
+    return chunks, embed_matrix(chunks)
+
+
+def pool_chunk_vectors(chunks: List[str], mat: "np.ndarray") -> "np.ndarray":
+    """Length-weighted mean of chunk vectors, re-normalized (see embed_document)."""
+    import numpy as np
+
+    weights = np.asarray([max(1, len(c)) for c in chunks], dtype=np.float32)
+    pooled = (mat * weights[:, None]).sum(axis=0)
+    norm = float(np.linalg.norm(pooled))
+    return pooled / norm if norm > 0 else pooled
+
+
+def embed_document(text: str) -> List[float]:
+    """
+    Pooled embedding over the whole document (not just its first N characters):
+    length-weighted mean of the chunk vectors (chars as a cheap proxy), re-normalized to unit length.
+    """
+    if not text:
+        return []
+    chunks, mat = embed_chunks(text)
+    if not chunks:
+        return []
+    return pool_chunk_vectors(chunks, mat).tolist()
+
+
+def embed_documents(texts: List[str], max_chunks: int = DOCUMENT_MAX_CHUNKS) -> "np.ndarray":
+    """
+    embed_document for many documents with ONE encode call over all their chunks.
+    Returns a (len(texts), dim) matrix; empty documents get zero rows.
+    """
+    import numpy as np
+    from app.ml.chunking import chunk_text
+
+    per_doc = [chunk_text(t)[: max(1, max_chunks)] if t else [] for t in texts]
+    flat = [c for chunks in per_doc for c in chunks]
+    if not flat:
+        return np.zeros((len(texts), 0), dtype=np.float32)
+    mat = embed_matrix(flat)
+    out = np.zeros((len(texts), mat.shape[1]), dtype=np.float32)
+    i = 0
+    for d, chunks in enumerate(per_doc):
+        if chunks:
+            out[d] = pool_chunk_vectors(chunks, mat[i : i + len(chunks)])
+            i += len(chunks)
+    return out
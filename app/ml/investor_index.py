@@ -0,0 +1,159 @@
+# app/ml/investor_index.py
+"""
+Local (in-process) exact index over investor vectors.
+
+Loaded from Weaviate once and refreshed every INVESTOR_INDEX_TTL_SECONDS, it
+lets us score *many* query vectors (all chunks of a pitch deck, or many pitches)
+against the whole catalog with one matrix product instead of one ANN query per
+vector.
+
+If a memory-mapped store has been published (python -m app.utils.build_vector_store),
+the index is a zero-copy view of its CURRENT generation instead: every worker
+shares the same page-cache pages, boot does no Weaviate scan, and a newly
+published generation is picked up on the next call.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INVESTOR_INDEX_TTL_SECONDS = int(os.getenv("INVESTOR_INDEX_TTL_SECONDS", "300"))
+# read the memory-mapped investor store when one has been published
+USE_VECTOR_STORE = os.getenv("USE_VECTOR_STORE", "1") == "1"
+
+
+class InvestorVectorIndex:
+    """
+    names[i] / props[i] describe row i of `matrix` (float32, unit-length rows).
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        props: Sequence[Dict[str, Any]],
+        matrix: np.ndarray,
+        store: Any = None,
+    ):
+        self.names = names
+        self.props = props
+        self.matrix = matrix
+        self.store = store
+        self.row_of = {n: i for i, n in enumerate(names)}
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "InvestorVectorIndex":
+        names: List[str] = []
+        props: List[Dict[str, Any]] = []
+        vecs: List[list] = []
+        for r in records:
+            name = (r.get("name") or "").strip()
+            vec = r.get("vector")
+            if not name or vec is None or len(vec) == 0:
+                continue
+            names.append(name)
+            props.append({k: v for k, v in r.items() if k != "vector"})
+            vecs.append(vec)
+        mat = np.asarray(vecs, dtype=np.float32) if vecs else np.zeros((0, 0), dtype=np.float32)
+        if len(mat):
+            mat /= np.clip(np.linalg.norm(mat, axis=1, keepdims=True), 1e-12, None)
+        return cls(names, props, mat)
+
+    @classmethod
+    def from_store(cls, store) -> "InvestorVectorIndex":
+        """Wrap a mapped VectorStore: no vectors are copied, metadata is decoded on access."""
+        from app.adapters.vector.mmap_store import LazyMeta
+
+        return cls(store.ids, LazyMeta(store), store.matrix, store=store)
+
+    def similarity(self, queries: np.ndarray) -> np.ndarray:
+        """(Q, I) cosine similarities for unit-length query rows."""
+        q = np.asarray(queries, dtype=np.float32)
+        if q.ndim == 1:
+            q = q[None, :]
+        if self.store is not None:
+            return self.store.similarity(q)  # handles float16 stores blockwise
+        return q @ self.matrix.T
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Batched exact top-k for every query row: (indices (Q, k), sims (Q, k)), best first.
+        """
+        sims = self.similarity(queries)
+        k = max(1, min(k, sims.shape[1]))
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        part_sims = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-part_sims, axis=1)
+        return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_sims, order, axis=1)
+
+
+_lock = threading.Lock()
+_index: Optional[InvestorVectorIndex] = None
+
+
+def _open_store():
+    if not USE_VECTOR_STORE:
+        return None
+    try:
+        from app.adapters.vector.mmap_store import INVESTOR_STORE, open_store
+
+        return open_store(INVESTOR_STORE)
+    except Exception:
+        return None  # unreadable/partial store → fall back to Weaviate
+
+
+def _build() -> InvestorVectorIndex:
+    store = _open_store()
+    if store is not None:
+        return InvestorVectorIndex.from_store(store)
+
+    from app.adapters.vector.weaviate_investors import fetch_investor_vectors
+
+    return InvestorVectorIndex.from_records(fetch_investor_vectors())
+
+
+def load_investor_index(force: bool = False) -> InvestorVectorIndex:
+    """
+    Process-wide index. Store-backed: follows the CURRENT generation.
+    Weaviate-backed: rebuilt when older than INVESTOR_INDEX_TTL_SECONDS.
+    """
+    global _index
+    idx = _index
+    if idx is not None and not force:
+        if idx.store is not None:
+            store = _open_store()  # cheap: cached, re-stats CURRENT periodically
+            if store is idx.store:
+                return idx
+            if store is not None:
+                with _lock:
+                    _index = idx = InvestorVectorIndex.from_store(store)
+                return idx
+        elif time.time() - idx.loaded_at < INVESTOR_INDEX_TTL_SECONDS:
+            return idx
+    with _lock:
+        idx = _index
+        if idx is None or force or time.time() - idx.loaded_at >= INVESTOR_INDEX_TTL_SECONDS:
+            _index = idx = _build()
+    return idx
+
+
+def invalidate_investor_index() -> None:
+    global _index
+    with _lock:
+        _index = None
+
+
+def warm_investor_index() -> Dict[str, Any]:
+    idx = load_investor_index(force=True)
+    return {
+        "investors": len(idx),
+        "dim": int(idx.matrix.shape[1]) if len(idx) else 0,
+        "source": idx.store.path.name if idx.store is not None else "weaviate",
+    }
@@ -0,0 +1,249 @@
+# app/ml/investor_snapshot.py
+"""
+Compact, process-wide snapshot of the investor catalog for the matching hot path.
+
+/match/pitch used to load every Investor as a full SQLModel object and build a
+card dict per investor on every request. The snapshot instead keeps one
+__slots__ record per investor (only the card columns) plus a prebuilt
+KeywordScorer, so a request does one sparse product for the DB scores and
+builds card dicts only for the investors it actually returns.
+
+Refreshed every INVESTOR_SNAPSHOT_TTL_SECONDS, and immediately when this
+process writes to the investor table.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.db.models import Investor
+from app.ml.scoring import KeywordScorer, blend_bounds, blend_matrix, top_n_order
+
+INVESTOR_SNAPSHOT_TTL_SECONDS = int(os.getenv("INVESTOR_SNAPSHOT_TTL_SECONDS", "60"))
+
+# the columns a match card shows, in card order
+CARD_FIELDS = (
+    "name", "firm", "sectors", "stages", "geo",
+    "check_min", "check_max", "check_currency", "thesis", "constraints",
+)
+
+
+class InvestorRecord:
+    """One investor row, card columns only (no pydantic/ORM state, no per-instance dict)."""
+
+    __slots__ = CARD_FIELDS
+
+    def __init__(self, *values: Any):
+        for f, v in zip(CARD_FIELDS, values):
+            setattr(self, f, v)
+
+    def card(self, score_pct: int, distance: Optional[float] = None) -> Dict[str, Any]:
+        c = {f: getattr(self, f) for f in CARD_FIELDS}
+        c["score_pct"] = score_pct
+        c["distance"] = distance
+        return c
+
+
+def card_from_props(props: Dict[str, Any], score_pct: int, distance: Optional[float]) -> Dict[str, Any]:
+    """Card for a vector hit with no DB row (built from the Weaviate properties)."""
+    c = {f: props.get(f) for f in CARD_FIELDS}
+    c["score_pct"] = score_pct
+    c["distance"] = distance
+    return c
+
+
+class InvestorSnapshot:
+    """
+    records[i] / names[i] are row i of the keyword scorer's investor axis.
+    """
+
+    def __init__(self, records: Sequence[InvestorRecord]):
+        self.records: List[InvestorRecord] = list(records)
+        self.names: List[str] = [r.name for r in self.records]
+        self.row_of: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+        self.scorer = KeywordScorer(self.records)
+        self.loaded_at = time.time()
+        self._aligned: Optional[tuple] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    # ---- ranking (the /match/pitch merge step)
+    #
+    # Scores live in arrays over a "universe" of columns: the snapshot rows,
+    # then vector hits that have no DB row. Only the top-N columns become cards.
+
+    def _cards(
+        self,
+        db_pct: np.ndarray,
+        vec_pct: np.ndarray,
+        has_vec: np.ndarray,
+        dist: np.ndarray,
+        raw_of: Callable[[int], Optional[Dict[str, Any]]],
+        top_n: int,
+    ) -> List[Dict[str, Any]]:
+        blended = blend_matrix(db_pct[None, :], vec_pct[None, :], has_vec[None, :])[0]
+        n = len(self)
+        out: List[Dict[str, Any]] = []
+        for c in top_n_order(blended, dist, max(1, top_n)).tolist():
+            score = int(blended[c])
+            if score <= 0:
+                continue
+            d = None if np.isnan(dist[c]) else float(dist[c])
+            raw = raw_of(c)
+            if c < n and (db_pct[c] > 0 or raw is None):
+                out.append(self.records[c].card(score, d))
+            else:
+                # vector-only hit: card from the vector store's properties
+                out.append(card_from_props(raw, score, d))
+        return out
+
+    def db_pct(self, text: str) -> np.ndarray:
+        """Keyword % for every snapshot row (pure numpy; safe to run in a worker thread)."""
+        if not len(self):
+            return np.zeros(0, dtype=np.int32)
+        return self.scorer.pct([text])[0]
+
+    def rank(
+        self,
+        text: str,
+        vector_hits: Dict[str, Dict[str, Any]],
+        top_n: int,
+        db_pct: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Blend DB keyword scores for the whole catalog with a (partial) set of
+        vector hits {name: {vec_pct, distance, raw}} and return the top-N cards.
+        `db_pct` (from `db_pct(text)`) may be computed ahead, e.g. concurrently
+        with the vector query.
+        """
+        n = len(self)
+        col_of: Dict[str, int] = {}
+        extra = 0
+        for name in vector_hits:
+            row = self.row_of.get(name)
+            if row is None:
+                row = n + extra
+                extra += 1
+            col_of[name] = row
+        size = n + extra
+
+        pct = np.zeros(size, dtype=np.int32)
+        if n:
+            pct[:n] = self.db_pct(text) if db_pct is None else db_pct
+        vec_pct = np.zeros(size, dtype=np.int32)
+        has_vec = np.zeros(size, dtype=bool)
+        dist = np.full(size, np.nan, dtype=np.float64)
+        raws: Dict[int, Dict[str, Any]] = {}
+        for name, v in vector_hits.items():
+            c = col_of[name]
+            vec_pct[c] = v["vec_pct"]
+            has_vec[c] = True
+            if v.get("distance") is not None:
+                dist[c] = v["distance"]
+            raws[c] = v["raw"]
+        return self._cards(pct, vec_pct, has_vec, dist, raws.get, top_n)
+
+    def _align(self, index) -> tuple:
+        """
+        (universe column of every index row, index rows without a DB row), cached
+        per index object so requests don't redo the name join.
+        """
+        cached = self._aligned
+        if cached is not None and cached[0] is index:
+            return cached[1], cached[2]
+        n = len(self)
+        extras: List[int] = []
+        cols = np.empty(len(index), dtype=np.int64)
+        for i, name in enumerate(index.names):
+            row = self.row_of.get(name)
+            if row is None:
+                row = n + len(extras)
+                extras.append(i)
+            cols[i] = row
+        self._aligned = (index, cols, extras)
+        return cols, extras
+
+    def rank_with_cutoff(self, text: str, index, sims: np.ndarray, top_n: int) -> List[Dict[str, Any]]:
+        """
+        Like `rank`, but with the vector side known for every indexed investor
+        (`sims[i]` = cosine similarity of index row i, from the local index).
+
+        Keyword scoring is skipped for investors whose best possible blended
+        score (blend_bounds) is below the N-th best guaranteed score, so the
+        sparse work is bounded by the contenders, not the catalog size.
+
+        Not a win for small catalogs: scoring every indexed investor plus the
+        bounds pass costs more than the full sparse product it avoids (2–2.5x
+        slower than `rank` at 500–3000 investors, scripts.bench_match_alloc).
+        """
+        from app.ml.multivector import sims_to_pct
+
+        n = len(self)
+        cols, extras = self._align(index)
+        size = n + len(extras)
+
+        vec_pct = np.zeros(size, dtype=np.int32)
+        has_vec = np.zeros(size, dtype=bool)
+        dist = np.full(size, np.nan, dtype=np.float64)
+        vec_pct[cols] = sims_to_pct(sims)
+        has_vec[cols] = True
+        dist[cols] = 1.0 - sims
+
+        max_db = np.zeros(size, dtype=np.int32)
+        max_db[:n] = self.scorer.max_pct
+        lb, ub = blend_bounds(vec_pct, has_vec, max_db)
+        k = max(1, min(top_n, size)) if size else 0
+
+        db_pct = np.zeros(size, dtype=np.int32)
+        if k and n:
+            threshold = np.partition(lb, size - k)[size - k]  # N-th best guaranteed score
+            need = np.flatnonzero(ub[:n] >= threshold)
+            if len(need):
+                db_pct[need] = self.scorer.pct([text], cols=need)[0]
+
+        def raw_of(c: int) -> Optional[Dict[str, Any]]:
+            return index.props[extras[c - n]] if c >= n else None
+
+        return self._cards(db_pct, vec_pct, has_vec, dist, raw_of, top_n)
+
+    @classmethod
+    def load(cls, db: Session) -> "InvestorSnapshot":
+        cols = [getattr(Investor, f) for f in CARD_FIELDS]
+        rows = db.exec(select(*cols).order_by(Investor.id)).all()
+        return cls([InvestorRecord(*row) for row in rows])
+
+
+_lock = threading.Lock()
+_snapshot: Optional[InvestorSnapshot] = None
+
+
+def get_investor_snapshot(db: Session) -> InvestorSnapshot:
+    global _snapshot
+    snap = _snapshot
+    if snap is not None and time.time() - snap.loaded_at < INVESTOR_SNAPSHOT_TTL_SECONDS:
+        return snap
+    with _lock:
+        snap = _snapshot
+        if snap is None or time.time() - snap.loaded_at >= INVESTOR_SNAPSHOT_TTL_SECONDS:
+            _snapshot = snap = InvestorSnapshot.load(db)
+    return snap
+
+
+def invalidate_investor_snapshot() -> None:
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+@event.listens_for(Investor, "after_insert")
+@event.listens_for(Investor, "after_update")
+@event.listens_for(Investor, "after_delete")
+def _investor_changed(mapper, connection, target) -> None:
+    invalidate_investor_snapshot()
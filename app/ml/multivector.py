@@ -0,0 +1,99 @@
+# app/ml/multivector.py
+"""
+Multi-vector pitch matching: score investors against *every* chunk of a deck.
+
+All chunk vectors are scored against all candidate investors as one
+(chunks × investors) similarity matrix, then reduced per investor:
+  max        best single chunk (the "market slide on page 8" case)
+  mean       average over all chunks (whole-deck fit)
+  topm       mean of the m best chunks (robust middle ground)
+Scoring 40 chunks is one matmul, so it costs about the same as scoring one.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+
+AGGREGATIONS = ("max", "mean", "topm")
+# "local" (in-process exact index, default) or "weaviate" (per-chunk ANN fan-out)
+MULTIVECTOR_SOURCE = os.getenv("MULTIVECTOR_SOURCE", "local").strip().lower()
+
+
+def aggregate(sims: np.ndarray, how: str = "max", top_m: int = 3) -> np.ndarray:
+    """
+    Reduce a (chunks, investors) similarity matrix to one score per investor.
+    """
+    if sims.ndim == 1:
+        return sims
+    how = (how or "max").lower()
+    if how == "max":
+        return sims.max(axis=0)
+    if how == "mean":
+        return sims.mean(axis=0)
+    if how == "topm":
+        m = max(1, min(int(top_m), sims.shape[0]))
+        if m == sims.shape[0]:
+            return sims.mean(axis=0)
+        # m largest per column, no full sort
+        top = np.partition(sims, sims.shape[0] - m, axis=0)[-m:, :]
+        return top.mean(axis=0)
+    raise ValueError(f"Unknown aggregation {how!r}; choose from {AGGREGATIONS}")
+
+
+def sims_to_pct(sims: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity [-1, 1] → 0..100 through the active BlendConfig window
+    (default (1 + cos) / 2, the same scale as Weaviate certainty).
+    """
+    from app.ml.scoring import sim_to_pct
+
+    return sim_to_pct(sims)
+
+
+def _results(props: List[Dict[str, Any]], scores: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+    if not len(scores):
+        return []
+    k = max(1, min(limit, len(scores)))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    pct = sims_to_pct(scores[top])
+    out: List[Dict[str, Any]] = []
+    for i, p in zip(top, pct):
+        item = {k2: v for k2, v in props[int(i)].items() if k2 not in ("vector", "id")}
+        item["distance"] = float(1.0 - scores[int(i)])  # cosine distance of the aggregate
+        item["score_pct"] = int(p)
+        out.append(item)
+    return out
+
+
+def multi_vector_search(
+    chunk_vecs: np.ndarray, limit: int = 10, how: str = "max", top_m: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    Same output shape as weaviate_investors.search_similar_investors, but each
+    investor's score aggregates its similarity to all chunk vectors.
+    """
+    chunk_vecs = np.asarray(chunk_vecs, dtype=np.float32)
+    if chunk_vecs.ndim == 1:
+        chunk_vecs = chunk_vecs[None, :]
+    if not len(chunk_vecs):
+        return []
+
+    if MULTIVECTOR_SOURCE == "local":
+        from app.ml.investor_index import load_investor_index
+
+        idx = load_investor_index()
+        if len(idx):
+            return _results(idx.props, aggregate(idx.similarity(chunk_vecs), how, top_m), limit)
+
+    # ANN fan-out: candidates = union of per-chunk neighbours, then exact chunk × candidate scoring
+    from app.adapters.vector.weaviate_investors import search_similar_investors_many
+
+    cands = search_similar_investors_many(chunk_vecs.tolist(), limit=limit)
+    if not cands:
+        return []
+    mat = np.asarray([c["vector"] for c in cands], dtype=np.float32)
+    mat /= np.clip(np.linalg.norm(mat, axis=1, keepdims=True), 1e-12, None)
+    return _results(cands, aggregate(chunk_vecs @ mat.T, how, top_m), limit)
@@ -0,0 +1,175 @@
+# app/ml/product_index.py
+"""
+Semantic index over the Product catalog.
+
+Built at ingest time (python -m app.utils.ingest_products): every product's
+text (name, type, region, risk, description, terms, eligibility) is embedded
+in batches and published as a generation of the memory-mapped "products"
+vector store (app.adapters.vector.mmap_store). Workers map the CURRENT
+generation and follow new ones without a restart.
+
+Queries are exact: structured pre-filters (type / region / risk_label,
+case-insensitive) narrow the rows, one matrix product scores the rest, and a
+partial sort picks the top-k.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+PRODUCT_CARD_FIELDS = [
+    "product_id", "name", "type", "region", "risk_label",
+    "description", "terms", "fees", "eligibility",
+]
+PRODUCT_FILTER_FIELDS = ("type", "region", "risk_label")
+# products embedded per encode call while building (bounds peak memory)
+PRODUCT_EMBED_BLOCK = 1024
+
+
+def product_embedding_text(p: Dict[str, Any]) -> str:
+    parts = [
+        p.get("name"),
+        p.get("type"),
+        f"region: {p['region']}" if p.get("region") else None,
+        f"risk: {p['risk_label']}" if p.get("risk_label") else None,
+        p.get("description"),
+        p.get("terms"),
+        p.get("eligibility"),
+    ]
+    return " | ".join(str(x) for x in parts if x)
+
+
+class ProductIndex:
+    """
+    Thin view over a mapped store: `metas[i]` decodes row i's metadata on
+    access (only the top-k are decoded per query), and `columns[f]` — the
+    lower-cased filter field f for every row, for boolean masks in one pass —
+    is built on the first filtered query (or at warm-up) and kept.
+    """
+
+    def __init__(self, store):
+        from app.adapters.vector.mmap_store import LazyMeta
+
+        self.store = store
+        self.metas = LazyMeta(store)
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+        self._columns_lock = threading.Lock()
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        if self._columns is None:
+            with self._columns_lock:
+                if self._columns is None:
+                    values: Dict[str, List[str]] = {f: [] for f in PRODUCT_FILTER_FIELDS}
+                    for i in range(len(self.store)):
+                        m = self.store.meta(i)
+                        for f in PRODUCT_FILTER_FIELDS:
+                            values[f].append(str(m.get(f) or "").strip().lower())
+                    self._columns = {f: np.asarray(v, dtype=object) for f, v in values.items()}
+        return self._columns
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @property
+    def generation(self) -> str:
+        return self.store.path.name
+
+    def mask(self, **filters: Optional[str]) -> Optional[np.ndarray]:
+        """Rows passing every given filter, or None when no filter is set."""
+        m = None
+        for f, value in filters.items():
+            if value is None or value == "":
+                continue
+            hit = self.columns[f] == value.strip().lower()
+            m = hit if m is None else (m & hit)
+        return m
+
+    def recommend(self, query_vec: Sequence[float], k: int = 10, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """Top-k products for a unit-length query vector, best first."""
+        if not len(self):
+            return []
+        q = np.asarray(query_vec, dtype=np.float32)[None, :]
+        if q.shape[1] != self.store.dim:
+            return []
+        sims = self.store.similarity(q)[0]
+        m = self.mask(**filters)
+        if m is not None:
+            rows = np.flatnonzero(m)
+            sims = sims[rows]
+        else:
+            rows = np.arange(len(sims))
+        if not len(rows):
+            return []
+        k = max(1, min(k, len(rows)))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind="stable")]
+        out = []
+        for j in top.tolist():
+            card = dict(self.metas[int(rows[j])])
+            card["similarity"] = round(float(sims[j]), 4)
+            out.append(card)
+        return out
+
+
+_lock = threading.Lock()
+_index: Optional[ProductIndex] = None
+
+
+def load_product_index() -> Optional[ProductIndex]:
+    """ProductIndex over the CURRENT store generation (None until one is built)."""
+    global _index
+    from app.adapters.vector.mmap_store import PRODUCT_STORE, open_store
+
+    try:
+        store = open_store(PRODUCT_STORE)
+    except Exception:
+        return None
+    if store is None:
+        return None
+    idx = _index
+    if idx is not None and idx.store is store:
+        return idx
+    with _lock:
+        if _index is None or _index.store is not store:
+            _index = ProductIndex(store)
+        return _index
+
+
+def build_product_index(products: Sequence[Dict[str, Any]], dtype: Any = np.float32):
+    """
+    Embed `products` (dicts with PRODUCT_CARD_FIELDS) and publish them as a new
+    generation of the products store. Returns the generation path, or None for
+    an empty catalog.
+    """
+    from app.adapters.vector.mmap_store import PRODUCT_STORE, publish_generation
+    from app.ml.embeddings import embed_matrix
+
+    rows = [p for p in products if p.get("product_id")]
+    if not rows:
+        return None
+    blocks = []
+    for s in range(0, len(rows), PRODUCT_EMBED_BLOCK):
+        blocks.append(embed_matrix([product_embedding_text(p) for p in rows[s:s + PRODUCT_EMBED_BLOCK]]))
+    mat = np.vstack(blocks)
+    metas = [{f: p.get(f) for f in PRODUCT_CARD_FIELDS} for p in rows]
+    return publish_generation(PRODUCT_STORE, [p["product_id"] for p in rows], mat, metas, dtype=dtype)
+
+
+def build_product_index_from_db(db, dtype: Any = np.float32):
+    """build_product_index over every Product row (projection, no `meta` blob)."""
+    from sqlmodel import select
+    from app.db.models import Product
+
+    cols = [getattr(Product, f) for f in PRODUCT_CARD_FIELDS]
+    rows = db.exec(select(*cols).order_by(Product.id)).all()
+    return build_product_index([dict(zip(PRODUCT_CARD_FIELDS, r)) for r in rows], dtype=dtype)
+
+
+def warm_product_index() -> Dict[str, Any]:
+    idx = load_product_index()
+    if idx is not None:
+        idx.columns  # filter columns built here, not by the first filtered request
+    return {"products": len(idx) if idx else 0, "generation": idx.generation if idx else None}
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from typing import List, Dict, Any, Tuple
+from app.ml.chunking import chunk_text
 from app.ml.embeddings import embed_texts, embed_text
 
 # ----------------------------
@@ -17,30 +18,6 @@ def _cos_sim(a: List[float], b: List[float]) -> float:
     return sum(x * y for x, y in zip(a, b))
 
 
-def split_paragraphs(text: str, max_len: int = 600) -> List[str]:
-    """
-    Greedy paragraph joiner:
-    - Splits input on newlines
-    - Re-wraps into chunks up to ~max_len chars (soft limit)
-    - Preserves paragraph boundaries as much as possible
-    """
-    if not text:
-        return []
-    raw = [p.strip() for p in text.replace("\r", "").split("\n") if p.strip()]
-    out: List[str] = []
-    buf = ""
-    for p in raw:
-        if len(buf) + (1 if buf else 0) + len(p) <= max_len:
-            buf = (buf + " " + p).strip()
-        else:
-            if buf:
-                out.append(buf)
-            buf = p
-    if buf:
-        out.append(buf)
-    return out
-
-
 # ----------------------------
 # Retrieval
 # ----------------------------
@@ -104,7 +81,7 @@ def agents_analysis(investor: Dict[str, Any], pitch_summary: str) -> Dict[str, A
     )
 
     # Retrieval context
-    passages = split_paragraphs(inv_text, max_len=500) or [inv_text]
+    passages = chunk_text(inv_text) or [inv_text]
     why_query = f"Why is this investor a fit for startup with: {pitch_summary}"
     top = retrieve(passages, why_query, top_k=4)
 
@@ -183,7 +160,7 @@ def rag_qa(investor: Dict[str, Any], pitch_summary: str, question: str) -> Dict[
         )
     )
 
-    chunks = split_paragraphs(ctx, 500) or [ctx]
+    chunks = chunk_text(ctx) or [ctx]
     top = retrieve(chunks, question, top_k=3)
 
     answer = (
@@ -0,0 +1,300 @@
+# app/ml/scoring.py
+"""
+Investor scoring shared by /match/pitch and batch re-matching.
+
+Scalar versions score one pitch against one investor; the matrix versions
+(KeywordScorer, blend_matrix) compute the same numbers for
+(pitches × investors) in one vectorized pass.
+
+Blend weights, the DB normalization denominator and the similarity → % mapping
+come from a BlendConfig: defaults below, or the JSON at SCORING_CONFIG_PATH
+(written by `python -m scripts.eval_ranking --grid --out ...`), loaded once.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+log = logging.getLogger(__name__)
+
+# per-field caps of the keyword score; the total max is the normalization denominator
+FIELD_CAPS = {"sectors": 3, "stages": 2, "geo": 2, "thesis_constraints": 2}
+DB_SCORE_MAX = float(sum(FIELD_CAPS.values()))  # 9 points
+DB_WEIGHT = 0.4
+VEC_WEIGHT = 0.6
+
+SCORING_CONFIG_PATH = os.getenv("SCORING_CONFIG_PATH", "scoring.json")
+
+
+class BlendConfig(BaseModel):
+    db_weight: float = DB_WEIGHT
+    vec_weight: float = VEC_WEIGHT
+    # raw keyword points that map to 100% (lower = generous with partial matches)
+    db_score_max: float = DB_SCORE_MAX
+    # cosine similarities mapped to 0% / 100%; the defaults (-1, 1) give (1 + cos) / 2,
+    # the same scale as Weaviate certainty. Narrowing them spreads the useful range.
+    vec_sim_floor: float = -1.0
+    vec_sim_ceil: float = 1.0
+
+
+_config: Optional[BlendConfig] = None
+
+
+def load_blend_config(path: Optional[str] = None) -> BlendConfig:
+    """
+    (Re)load the active config from JSON; missing file → defaults, bad file → defaults + warning.
+    """
+    global _config
+    p = Path(path or SCORING_CONFIG_PATH)
+    cfg = BlendConfig()
+    if p.exists():
+        try:
+            cfg = BlendConfig(**json.loads(p.read_text()))
+            log.info("Scoring config loaded from %s: %s", p, dict(cfg))
+        except Exception as e:
+            log.warning("Ignoring scoring config %s: %s", p, e)
+    _config = cfg
+    return cfg
+
+
+def get_blend_config() -> BlendConfig:
+    return _config if _config is not None else load_blend_config()
+
+
+def set_blend_config(cfg: BlendConfig) -> None:
+    global _config
+    _config = cfg
+
+
+def sim_to_pct(sims: np.ndarray, cfg: Optional[BlendConfig] = None) -> np.ndarray:
+    """Cosine similarity → 0..100 ints through the configured [floor, ceil] window."""
+    cfg = cfg or get_blend_config()
+    span = max(1e-6, cfg.vec_sim_ceil - cfg.vec_sim_floor)
+    frac = (np.asarray(sims, dtype=np.float32) - cfg.vec_sim_floor) / span
+    return np.rint(np.clip(frac, 0.0, 1.0) * 100.0).astype(np.int32)
+
+
+def distance_to_pct(dist: Optional[float], cfg: Optional[BlendConfig] = None) -> int:
+    """Weaviate cosine distance (1 - cos) → 0..100; None/invalid → 0."""
+    try:
+        d = float(dist)
+    except (TypeError, ValueError):
+        return 0
+    return int(sim_to_pct(np.float32(1.0 - d), cfg))
+
+
+def tokenize(s: str) -> List[str]:
+    return re.findall(r"[a-zA-Z0-9]+", (s or "").lower())
+
+
+def _field_tokens(field: Optional[str]) -> set:
+    if not field:
+        return set()
+    return set(tokenize(field.replace(",", " ")))
+
+
+def score_investor_db(pitch_text: str, inv: Any) -> float:
+    """
+    Very simple DB-only scoring:
+    - +1 per unique sector word match
+    - +1 per unique stage word match
+    - +1 per unique geo word match
+    - + up to +2 for keyword overlap between pitch and (thesis|constraints)
+    Max ≈ 9 points → we normalize later to 0..100.
+    """
+    pitch_toks = set(tokenize(pitch_text))
+    score = 0.0
+
+    def uniq_hits(field: Optional[str]) -> int:
+        return len(_field_tokens(field) & pitch_toks)
+
+    score += min(FIELD_CAPS["sectors"], uniq_hits(inv.sectors))
+    score += min(FIELD_CAPS["stages"], uniq_hits(inv.stages))
+    score += min(FIELD_CAPS["geo"], uniq_hits(inv.geo))
+    thesis_hits = uniq_hits(inv.thesis)
+    const_hits  = uniq_hits(inv.constraints)
+    score += min(FIELD_CAPS["thesis_constraints"], thesis_hits + const_hits)
+
+    return score
+
+
+def norm_db_score(score: float, cfg: Optional[BlendConfig] = None) -> int:
+    # Normalize to a 0–100 hint (denominator: db_score_max, 9 points by default)
+    cfg = cfg or get_blend_config()
+    return int(max(0, min(100, round(100 * score / cfg.db_score_max))))
+
+
+def blend_scores(db_pct: Optional[int], vec_pct: Optional[int], cfg: Optional[BlendConfig] = None) -> int:
+    """
+    Weighted blend (deterministic):
+    - If both present: db_weight * DB + vec_weight * Vector (0.4 / 0.6 by default)
+    - If only one present: return it
+    """
+    if db_pct is None and vec_pct is None:
+        return 0
+    if db_pct is None:
+        return int(vec_pct or 0)
+    if vec_pct is None:
+        return int(db_pct or 0)
+    cfg = cfg or get_blend_config()
+    return int(round(cfg.db_weight * db_pct + cfg.vec_weight * vec_pct))
+
+
+# ----------------------------
+# Vectorized (pitches × investors)
+# ----------------------------
+
+class KeywordScorer:
+    """
+    Sparse token-incidence form of score_investor_db.
+
+    Each field becomes a (vocab × investors) 0/1 matrix; a batch of pitches is a
+    (pitches × vocab) 0/1 matrix, so unique-word hits for every pair are one
+    sparse product per field.
+    """
+
+    def __init__(self, investors: Sequence[Any]):
+        from scipy import sparse
+
+        self.names: List[str] = [inv.name for inv in investors]
+        self.vocab: Dict[str, int] = {}
+        fields = ("sectors", "stages", "geo", "thesis", "constraints")
+        rows: Dict[str, List[int]] = {f: [] for f in fields}
+        cols: Dict[str, List[int]] = {f: [] for f in fields}
+        for j, inv in enumerate(investors):
+            for f in fields:
+                for tok in _field_tokens(getattr(inv, f, None)):
+                    rows[f].append(self.vocab.setdefault(tok, len(self.vocab)))
+                    cols[f].append(j)
+        shape = (max(1, len(self.vocab)), len(self.names))
+        self.fields = {
+            f: sparse.csr_matrix(
+                (np.ones(len(rows[f]), dtype=np.float32), (rows[f], cols[f])), shape=shape
+            )
+            for f in fields
+        }
+        # column-major copies: scoring a subset of investors touches only their columns
+        self._fields_csc = {f: m.tocsc() for f, m in self.fields.items()}
+
+        # best score each investor could reach (every field token matched) → pruning bound
+        n_toks = {
+            f: np.bincount(np.asarray(cols[f], dtype=np.int64), minlength=len(self.names))
+            for f in fields
+        }
+        self.max_raw = (
+            np.minimum(FIELD_CAPS["sectors"], n_toks["sectors"])
+            + np.minimum(FIELD_CAPS["stages"], n_toks["stages"])
+            + np.minimum(FIELD_CAPS["geo"], n_toks["geo"])
+            + np.minimum(FIELD_CAPS["thesis_constraints"], n_toks["thesis"] + n_toks["constraints"])
+        ).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def pitch_matrix(self, pitch_texts: Sequence[str]):
+        from scipy import sparse
+
+        r: List[int] = []
+        c: List[int] = []
+        for i, text in enumerate(pitch_texts):
+            for tok in set(tokenize(text)):
+                j = self.vocab.get(tok)
+                if j is not None:
+                    r.append(i)
+                    c.append(j)
+        return sparse.csr_matrix(
+            (np.ones(len(r), dtype=np.float32), (r, c)),
+            shape=(len(pitch_texts), max(1, len(self.vocab))),
+        )
+
+    def raw_scores(self, pitch_texts: Sequence[str], cols: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        (pitches, investors) raw keyword scores, identical to score_investor_db.
+        With `cols`, only those investors are scored: (pitches, len(cols)).
+        """
+        P = self.pitch_matrix(pitch_texts)
+
+        def hits(f: str) -> np.ndarray:
+            if cols is None:
+                return (P @ self.fields[f]).toarray()
+            return (P @ self._fields_csc[f][:, cols].tocsr()).toarray()
+
+        score = np.minimum(FIELD_CAPS["sectors"], hits("sectors"))
+        score += np.minimum(FIELD_CAPS["stages"], hits("stages"))
+        score += np.minimum(FIELD_CAPS["geo"], hits("geo"))
+        score += np.minimum(FIELD_CAPS["thesis_constraints"], hits("thesis") + hits("constraints"))
+        return score
+
+    def pct(self, pitch_texts: Sequence[str], cols: Optional[np.ndarray] = None) -> np.ndarray:
+        """(pitches, investors) normalized 0..100 ints, identical to norm_db_score."""
+        return norm_db_matrix(self.raw_scores(pitch_texts, cols))
+
+    @property
+    def max_pct(self) -> np.ndarray:
+        return norm_db_matrix(self.max_raw)
+
+
+def norm_db_matrix(raw: np.ndarray, cfg: Optional[BlendConfig] = None) -> np.ndarray:
+    cfg = cfg or get_blend_config()
+    return np.clip(np.rint(100.0 * raw / cfg.db_score_max), 0, 100).astype(np.int32)
+
+
+def blend_matrix(
+    db_pct: np.ndarray, vec_pct: np.ndarray, has_vec: np.ndarray, cfg: Optional[BlendConfig] = None
+) -> np.ndarray:
+    """
+    Vectorized blend_scores. DB scores of 0 count as "absent", as in /match/pitch
+    (only investors with db_pct > 0 get a DB card there).
+    """
+    cfg = cfg or get_blend_config()
+    has_db = db_pct > 0
+    both = np.rint(cfg.db_weight * db_pct + cfg.vec_weight * vec_pct).astype(np.int32)
+    return np.where(
+        has_db & has_vec, both,
+        np.where(has_db, db_pct, np.where(has_vec, vec_pct, 0)),
+    ).astype(np.int32)
+
+
+def blend_bounds(
+    vec_pct: np.ndarray, has_vec: np.ndarray, max_db_pct: np.ndarray
+) -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Lower/upper bounds of blend_matrix before the DB side is known, given each
+    investor's best possible DB score. Used to skip keyword scoring for
+    investors that cannot reach the top-N.
+
+    The blend is not monotonic in db_pct (db 0 counts as "absent", so a weak
+    keyword hit can pull a strong vector score down), hence the min/max with
+    the vector-only score.
+    """
+    cfg = get_blend_config()
+    min_db = max(1, norm_db_score(1, cfg))  # smallest non-zero DB score
+    with_min = np.rint(cfg.db_weight * min_db + cfg.vec_weight * vec_pct).astype(np.int32)
+    with_max = np.rint(cfg.db_weight * max_db_pct + cfg.vec_weight * vec_pct).astype(np.int32)
+    can_hit = max_db_pct > 0
+    lb = np.where(has_vec, np.where(can_hit, np.minimum(vec_pct, with_min), vec_pct), 0)
+    ub = np.where(has_vec, np.where(can_hit, np.maximum(vec_pct, with_max), vec_pct), max_db_pct)
+    return lb.astype(np.int32), ub.astype(np.int32)
+
+
+def top_n_order(scores: np.ndarray, distance: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the n best entries, best first: score desc, then distance asc
+    (NaN = no distance, last), then original order — the same order as a full
+    stable sort, but only the entries tied with the n-th best score are sorted.
+    """
+    size = len(scores)
+    n = min(max(0, n), size)
+    if not n:
+        return np.zeros(0, dtype=np.int64)
+    kth = np.partition(scores, size - n)[size - n]
+    cand = np.flatnonzero(scores >= kth)
+    order = np.lexsort((np.nan_to_num(distance[cand], nan=9e9), -scores[cand]))
+    return cand[order[:n]]
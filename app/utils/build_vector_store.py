@@ -0,0 +1,34 @@
+# app/utils/build_vector_store.py
+"""
+Publish a new generation of the memory-mapped investor store from Weaviate.
+
+    python -m app.utils.build_vector_store           # float32
+    python -m app.utils.build_vector_store --f16     # half the size on disk / in page cache
+
+Run after an investor ingest. Running workers switch to the new generation on
+their next index access (see app.ml.investor_index); nothing needs a restart.
+"""
+from __future__ import annotations
+
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from app.adapters.vector.mmap_store import VectorStore, build_investor_store
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    dtype = np.float16 if "--f16" in argv else np.float32
+    t0 = time.perf_counter()
+    path = build_investor_store(dtype=dtype)
+    store = VectorStore(path)
+    size_mb = path.stat().st_size / 1e6
+    print(f"Vector store: {path} n={store.n} dim={store.dim} "
+          f"dtype={np.dtype(dtype).name} size={size_mb:.1f}MB in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 from typing import Dict, Any
 from sqlmodel import Session, select
+from app.core import corpus_version
 from app.db.core import engine, init_db
 from app.db.models import Investor
 
@@ -32,6 +33,9 @@ def main():
                 s.add(Investor(**{k: v for k, v in r.items() if hasattr(Investor, k)}))
                 inserted += 1
         s.commit()
+    # the router's track() listener isn't registered in this process → bump explicitly
+    # so cached investor reads and ETags roll over
+    corpus_version.bump("investors")
     print(f"Investors: inserted={inserted}, updated={updated}")
 
 if __name__ == "__main__":
@@ -1,55 +1,260 @@
 # app/utils/ingest_products.py
+"""
+Streaming product catalog ingest.
+
+    python -m app.utils.ingest_products                        # data/product_catalog.json
+    python -m app.utils.ingest_products catalog.jsonl --batch-size 2000
+    python -m app.utils.ingest_products catalog.csv --skip-index
+
+Records are read incrementally (JSON array item by item, JSONL line by line,
+CSV row by row), so memory stays flat for million-row catalogs. Each batch is
+one INSERT .. ON CONFLICT (product_id) DO UPDATE in its own transaction;
+rows whose content hash matches the stored one are not written at all.
+"""
+import argparse
+import csv
+import hashlib
 import json
 import re
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
 from sqlmodel import Session, select
+
+from app.core import corpus_version
 from app.db.core import engine, init_db
 from app.db.models import Product
 
 DATA_FILE = Path(__file__).resolve().parents[2] / "data" / "product_catalog.json"
 
+# source key → Product column (the whole record is kept in `meta`)
+FIELD_MAP = {
+    "name": "name",
+    "type": "type",
+    "description": "description",
+    "region": "region",
+    "terms": "terms",
+    "fees": "fees",
+    "eligibility": "eligibility",
+    "riskLabel": "risk_label",
+    "risk_label": "risk_label",
+}
+UPSERT_COLUMNS = ["name", "type", "description", "region", "terms", "fees",
+                  "eligibility", "risk_label", "meta", "content_hash"]
+READ_CHUNK = 1 << 16
+
+
 def slugify_name(name: str) -> str:
     s = name.strip().lower()
     s = re.sub(r"[^a-z0-9]+", "-", s)
     return s.strip("-")
 
-def main():
-    if not DATA_FILE.exists():
-        raise FileNotFoundError(f"Could not find product catalog at: {DATA_FILE}")
 
-    init_db()  # ensure tables exist
-    items = json.loads(DATA_FILE.read_text())
+# ----------------------------
+# Streaming readers
+# ----------------------------
+
+def iter_json_array(f: IO[str], chunk_size: int = READ_CHUNK) -> Iterator[Any]:
+    """Items of a top-level JSON array; ijson when installed, else raw_decode over a sliding buffer."""
+    try:
+        import ijson  # optional
+    except ImportError:
+        ijson = None
+    if ijson is not None:
+        yield from ijson.items(f, "item", use_float=True)
+        return
+
+    decoder = json.JSONDecoder()
+    buf, pos, started, eof = "", 0, False, False
+
+    def refill() -> None:
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                if started:
+                    raise ValueError("unterminated JSON array")
+                return
+            refill()
+            continue
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("expected a top-level JSON array")
+            started, pos = True, pos + 1
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            end = None
+        if end is None or (end == len(buf) and not eof):
+            if eof:
+                raise ValueError("truncated JSON item")
+            refill()  # item spans the buffer edge (a bare number may decode short)
+            continue
+        pos = end
+        yield item
+
+
+def iter_jsonl(f: IO[str]) -> Iterator[Any]:
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_csv(f: IO[str]) -> Iterator[Dict[str, Any]]:
+    for row in csv.DictReader(f):
+        yield {k: (v if v != "" else None) for k, v in row.items() if k}
+
+
+def iter_records(path: Path, fmt: str = "auto") -> Iterator[Any]:
+    if fmt == "auto":
+        fmt = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}.get(path.suffix.lower(), "json")
+    reader = {"json": iter_json_array, "jsonl": iter_jsonl, "csv": iter_csv}[fmt]
+    with open(path, "r", encoding="utf-8", newline="" if fmt == "csv" else None) as f:
+        yield from reader(f)
+
+
+# ----------------------------
+# Normalize + upsert
+# ----------------------------
 
-    inserted, updated = 0, 0
+def to_row(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Source record → Product column values incl. content_hash (None = skip)."""
+    pid = slugify_name(str(item.get("name") or ""))
+    if not pid:
+        return None
+    row: Dict[str, Any] = {c: None for c in UPSERT_COLUMNS}
+    for k, v in item.items():
+        col = FIELD_MAP.get(k)
+        if col:
+            row[col] = v if v is None or isinstance(v, str) else str(v)
+    row["name"] = row["name"] or ""
+    row["meta"] = item
+    canonical = json.dumps(row, sort_keys=True, separators=(",", ":"), default=str)
+    row["content_hash"] = hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+    row["product_id"] = pid
+    return row
+
+
+def _insert(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"ON CONFLICT upsert is not supported on {dialect}")
+    return insert(Product.__table__)
+
+
+def _max_rows(dialect: str, batch_size: int) -> int:
+    # bound parameters per statement: SQLite 32766, Postgres 65535
+    limit = 32766 if dialect == "sqlite" else 65535
+    return max(1, min(batch_size, limit // (len(UPSERT_COLUMNS) + 2)))
+
+
+def upsert_batch(s: Session, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """One transaction: drop rows whose content_hash is unchanged, upsert the rest."""
+    by_id = {r["product_id"]: r for r in rows}  # last occurrence wins within a batch
+    stored = dict(s.exec(
+        select(Product.product_id, Product.content_hash).where(Product.product_id.in_(list(by_id)))
+    ).all())
+    changed = [r for pid, r in by_id.items() if pid not in stored or stored[pid] != r["content_hash"]]
+    counts = {
+        "inserted": sum(1 for r in changed if r["product_id"] not in stored),
+        "unchanged": len(by_id) - len(changed),
+    }
+    counts["updated"] = len(changed) - counts["inserted"]
+    if changed:
+        now = datetime.utcnow()
+        stmt = _insert(s.get_bind().dialect.name).values([{**r, "created_at": now} for r in changed])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["product_id"],
+            set_={c: getattr(stmt.excluded, c) for c in UPSERT_COLUMNS},  # created_at kept
+        )
+        s.exec(stmt)
+    s.commit()
+    return counts
+
+
+def ingest(records: Iterable[Any], batch_size: int = 1000, report_every: float = 5.0) -> Dict[str, Any]:
+    totals = {"read": 0, "skipped": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+    t0 = last = time.perf_counter()
     with Session(engine) as s:
-        for it in items:
-            pid = slugify_name(it.get("name", ""))
-            if not pid:
+        size = _max_rows(s.get_bind().dialect.name, batch_size)
+        batch: List[Dict[str, Any]] = []
+
+        def flush() -> None:
+            nonlocal last
+            for k, v in upsert_batch(s, batch).items():
+                totals[k] += v
+            batch.clear()
+            now = time.perf_counter()
+            if now - last >= report_every:
+                last = now
+                print(f"  {totals['read']:,} rows, {totals['read'] / (now - t0):,.0f} rows/s "
+                      f"(inserted={totals['inserted']:,} updated={totals['updated']:,} "
+                      f"unchanged={totals['unchanged']:,})")
+
+        for item in records:
+            totals["read"] += 1
+            row = to_row(item) if isinstance(item, dict) else None
+            if row is None:
+                totals["skipped"] += 1
                 continue
+            batch.append(row)
+            if len(batch) >= size:
+                flush()
+        if batch:
+            flush()
+    totals["seconds"] = time.perf_counter() - t0
+    return totals
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Stream a product catalog into the Product table.")
+    ap.add_argument("path", nargs="?", default=str(DATA_FILE))
+    ap.add_argument("--format", default="auto", choices=["auto", "json", "jsonl", "csv"])
+    ap.add_argument("--batch-size", type=int, default=1000)
+    ap.add_argument("--skip-index", action="store_true", help="don't rebuild the product vector index")
+    args = ap.parse_args(argv)
+
+    path = Path(args.path)
+    if not path.exists():
+        raise FileNotFoundError(f"Could not find product catalog at: {path}")
+
+    init_db()  # ensure tables exist (and new nullable columns)
+    res = ingest(iter_records(path, args.format), batch_size=args.batch_size)
+    rate = res["read"] / res["seconds"] if res["seconds"] > 0 else 0.0
+    print(f"Products: inserted={res['inserted']}, updated={res['updated']}, "
+          f"unchanged={res['unchanged']}, skipped={res['skipped']} "
+          f"— {res['read']:,} rows in {res['seconds']:.1f}s ({rate:,.0f} rows/s)")
+
+    changed = res["inserted"] or res["updated"]
+    if changed:
+        # new catalog version → cached /products/ pages and ETags roll over
+        corpus_version.bump("products")
+
+    if not args.skip_index:
+        from app.ml.product_index import build_product_index_from_db, load_product_index
+
+        if changed or load_product_index() is None:
+            # semantic index for /products/recommend (batch embeddings → mmap store)
+            t0 = time.perf_counter()
+            with Session(engine) as s:
+                index_path = build_product_index_from_db(s)
+            print(f"Product index: {index_path} in {time.perf_counter() - t0:.1f}s")
 
-            existing = s.exec(select(Product).where(Product.product_id == pid)).first()
-            payload = Product(
-                product_id=pid,
-                name=it.get("name", ""),
-                type=it.get("type"),
-                description=it.get("description"),
-                region=it.get("region"),
-                terms=it.get("terms"),
-                fees=it.get("fees"),
-                eligibility=it.get("eligibility"),
-                risk_label=it.get("riskLabel"),
-                meta=it,
-            )
-            if existing:
-                # update fields
-                for f in ["name","type","description","region","terms","fees","eligibility","risk_label","meta"]:
-                    setattr(existing, f, getattr(payload, f))
-                updated += 1
-            else:
-                s.add(payload)
-                inserted += 1
-        s.commit()
-    print(f"Products: inserted={inserted}, updated={updated}")
 
 if __name__ == "__main__":
     main()
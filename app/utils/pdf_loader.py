@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from io import BytesIO
-from typing import Iterable, List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
 from pypdf import PdfReader
 
+from app.ml.chunking import chunk_text
+
 
 class PdfExtractError(Exception):
     pass
@@ -29,43 +31,13 @@ def pdf_to_text(file: Union[str, bytes, BytesIO]) -> str:
         raise PdfExtractError(f"Could not read PDF: {e}") from e
 
 
-def _chunk_lines(lines: Iterable[str], max_chars: int = 1200) -> List[str]:
-    """
-    Very small, dependency-free chunker: packs lines into ~max_chars chunks.
-    Keeps paragraphs intact when possible.
-    """
-    chunks: List[str] = []
-    buf: List[str] = []
-    size = 0
-
-    for ln in lines:
-        ln = (ln or "").rstrip()
-        if not ln:
-            # paragraph break helps readability
-            ln = "\n"
-        add = (len(ln) + 1)
-        if size + add > max_chars and buf:
-            chunks.append("\n".join(buf).strip())
-            buf = [ln]
-            size = add
-        else:
-            buf.append(ln)
-            size += add
-
-    if buf:
-        chunks.append("\n".join(buf).strip())
-
-    # drop any empty tails
-    return [c for c in chunks if c]
-
-
 def load_pdf_chunks(
     file: Union[str, bytes, BytesIO],
-    max_chars: int = 1200,
+    max_tokens: Optional[int] = None,
 ) -> Tuple[List[str], int]:
     """
     Returns (chunks, page_count).
-    - chunks: list[str] sized for embedding/RAG
+    - chunks: list[str] sized in model tokens for embedding/RAG (see app.ml.chunking)
     - page_count: number of pages detected
     """
     try:
@@ -86,7 +58,7 @@ def load_pdf_chunks(
             lines.extend(txt.splitlines())
             lines.append("")  # paragraph break between pages
 
-        chunks = _chunk_lines(lines, max_chars=max_chars)
+        chunks = chunk_text("\n".join(lines), max_tokens=max_tokens)
         return chunks, page_count
     except Exception as e:
         raise PdfExtractError(f"Could not chunk PDF: {e}") from e
\ No newline at end of file
@@ -0,0 +1,55 @@
+# app/utils/reindex_investors.py
+"""
+Zero-downtime rebuild of the Investor collection (see app/adapters/vector/weaviate_reindex.py).
+
+    python -m app.utils.reindex_investors                # copy vectors into a new version (schema / HNSW change)
+    python -m app.utils.reindex_investors --reembed      # recompute vectors (embedding model switch)
+    python -m app.utils.reindex_investors --no-switch    # build + verify only
+    python -m app.utils.reindex_investors --rollback     # alias back to the previous version
+
+--publish-store also writes a new memory-mapped vector store generation after the switch.
+
+Live queries keep using the current version until the verified switch.
+"""
+from __future__ import annotations
+
+import sys
+import time
+from typing import List, Optional
+
+from app.adapters.vector.weaviate_reindex import ReindexError, reindex_investors, rollback
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if "--rollback" in argv:
+        print(f"Investor alias now points at {rollback()}")
+        return 0
+
+    t0 = time.perf_counter()
+
+    def report(copied: int) -> None:
+        print(f"  {copied} objects ({copied / max(1e-9, time.perf_counter() - t0):.0f}/s)")
+
+    try:
+        res = reindex_investors(
+            reembed="--reembed" in argv,
+            verify="--no-verify" not in argv,
+            switch="--no-switch" not in argv,
+            progress=report,
+        )
+    except ReindexError as e:
+        print(f"Reindex aborted, live collection unchanged: {e}")
+        return 1
+    print(f"Reindex: {res}")
+
+    if res.get("switched") and "--publish-store" in argv:
+        # refresh the memory-mapped copy workers read (app.ml.investor_index)
+        from app.adapters.vector.mmap_store import build_investor_store
+
+        print(f"Vector store: {build_investor_store()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
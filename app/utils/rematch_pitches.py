@@ -0,0 +1,236 @@
+# app/utils/rematch_pitches.py
+"""
+Batch re-matching of stored pitches against the current investor catalog.
+
+Run nightly (or after an investor ingest):
+
+    python -m app.utils.rematch_pitches                # every pitch
+    python -m app.utils.rematch_pitches 12 13 14       # selected pitch ids
+
+No PDF re-parsing: we reuse stored pitch vectors (Redis, then the Weaviate
+Pitch collection) or Pitch.summary (the extracted text), embed the misses in
+large batches, and score each chunk of
+pitches against all investors as one (pitches × investors) matrix —
+DB keyword component included — before bulk-writing Match rows.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+
+from app.cache import cache_get_many, cache_set_many
+from app.db.core import engine
+from app.db.models import Investor, Match, Pitch
+from app.ml.embeddings import EMBEDDING_MODEL_NAME, embed_documents
+from app.ml.multivector import sims_to_pct
+from app.ml.scoring import KeywordScorer, blend_matrix
+
+REMATCH_BATCH_SIZE = int(os.getenv("REMATCH_BATCH_SIZE", "64"))
+PITCH_VECTOR_TTL_SECONDS = int(os.getenv("PITCH_VECTOR_TTL_SECONDS", str(7 * 24 * 3600)))
+
+Progress = Callable[[int, int], None]
+
+
+def pitch_vector_key(pitch_id: int) -> str:
+    return f"pitchvec:{EMBEDDING_MODEL_NAME}:{pitch_id}"
+
+
+def _stored_vectors(pitch_ids: List[int]) -> Dict[int, list]:
+    try:
+        from app.adapters.vector.weaviate_pitches import get_pitch_vectors
+
+        return get_pitch_vectors(pitch_ids)
+    except Exception:
+        return {}
+
+
+def store_pitch_vector(db: Session, pitch: Pitch, vector: list) -> Optional[str]:
+    """
+    Persist a pitch vector (Weaviate Pitch collection + Redis) and record Pitch.vector_id.
+    Best effort: the caller commits; Weaviate being down just leaves vector_id unset.
+    """
+    cache_set_many({pitch_vector_key(pitch.id): vector}, ttl_seconds=PITCH_VECTOR_TTL_SECONDS)
+    try:
+        from app.adapters.vector.weaviate_pitches import upsert_pitch
+
+        pitch.vector_id = upsert_pitch(pitch.id, pitch.user_id, pitch.summary, vector)
+        db.add(pitch)
+        return pitch.vector_id
+    except Exception:
+        return None
+
+
+def pitch_vectors(db: Session, pitches: Sequence[Pitch]) -> np.ndarray:
+    """
+    (len(pitches), dim) unit vectors, cheapest source first:
+    Redis cache → Weaviate Pitch collection (one filtered fetch) → embed the rest
+    from Pitch.summary in one batch (and persist them for next time).
+    """
+    found: Dict[int, list] = {}
+    for p, v in zip(pitches, cache_get_many([pitch_vector_key(p.id) for p in pitches])):
+        if v:
+            found[p.id] = v
+    missing = [p.id for p in pitches if p.id not in found]
+    if missing:
+        stored = _stored_vectors(missing)
+        found.update(stored)
+        if stored:
+            cache_set_many(
+                {pitch_vector_key(pid): v for pid, v in stored.items()},
+                ttl_seconds=PITCH_VECTOR_TTL_SECONDS,
+            )
+
+    todo = [p for p in pitches if p.id not in found]
+    if todo:
+        fresh = embed_documents([p.summary or "" for p in todo])
+        for p, v in zip(todo, fresh):
+            if v.any():
+                found[p.id] = v.tolist()
+                store_pitch_vector(db, p, found[p.id])
+
+    dim = next((len(v) for v in found.values()), 0)
+    out = np.zeros((len(pitches), dim), dtype=np.float32)
+    for i, p in enumerate(pitches):
+        v = found.get(p.id)
+        if v and len(v) == dim:
+            out[i] = v
+    return out
+
+
+def _load_vector_index():
+    try:
+        from app.ml.investor_index import load_investor_index
+
+        idx = load_investor_index()
+        return idx if len(idx) else None
+    except Exception:
+        # Weaviate down → DB keyword scoring only
+        return None
+
+
+def rematch_pitches(
+    db: Session,
+    pitch_ids: Optional[Sequence[int]] = None,
+    top_n: int = 10,
+    batch_size: int = REMATCH_BATCH_SIZE,
+    progress: Optional[Progress] = None,
+) -> Dict[str, int]:
+    """
+    Recompute and replace Match rows for `pitch_ids` (all pitches if None).
+    Memory is bounded by `batch_size` pitches × catalog size per step.
+    """
+    q = select(Pitch.id).order_by(Pitch.id)
+    if pitch_ids is not None:
+        q = q.where(Pitch.id.in_(list(pitch_ids)))
+    ids: List[int] = list(db.exec(q).all())
+    total = len(ids)
+
+    # ---- Catalog (once per run)
+    investors = db.exec(
+        select(Investor.name, Investor.sectors, Investor.stages,
+               Investor.geo, Investor.thesis, Investor.constraints)
+    ).all()
+    scorer = KeywordScorer(investors)
+    index = _load_vector_index()
+
+    universe: List[str] = list(scorer.names)
+    col_of = {n: i for i, n in enumerate(universe)}
+    vec_cols = None
+    if index is not None:
+        for n in index.names:
+            if n not in col_of:
+                col_of[n] = len(universe)
+                universe.append(n)
+        vec_cols = np.asarray([col_of[n] for n in index.names], dtype=np.int64)
+    n_db, n_all = len(scorer), len(universe)
+
+    written = 0
+    done = 0
+    for start in range(0, total, max(1, batch_size)):
+        batch_ids = ids[start : start + batch_size]
+        pitches = db.exec(select(Pitch).where(Pitch.id.in_(batch_ids)).order_by(Pitch.id)).all()
+        texts = [p.summary or "" for p in pitches]
+        B = len(pitches)
+
+        db_pct = np.zeros((B, n_all), dtype=np.int32)
+        if n_db:
+            db_pct[:, :n_db] = scorer.pct(texts)
+
+        vec_pct = np.zeros((B, n_all), dtype=np.int32)
+        has_vec = np.zeros((B, n_all), dtype=bool)
+        dist = np.full((B, n_all), np.nan, dtype=np.float32)
+        pv = None
+        if vec_cols is not None:
+            try:
+                pv = pitch_vectors(db, pitches)
+            except Exception:
+                pv = None  # embedding backend unavailable → keyword scores only
+        if pv is not None:
+            if pv.shape[1] == index.matrix.shape[1]:
+                sims = index.similarity(pv)                        # (B, I_vec)
+                valid = pv.any(axis=1)[:, None]                    # empty summaries: no vector side
+                vec_pct[:, vec_cols] = sims_to_pct(sims)
+                has_vec[:, vec_cols] = valid
+                dist[:, vec_cols] = np.where(valid, 1.0 - sims, np.nan)
+
+        blended = blend_matrix(db_pct, vec_pct, has_vec)          # (B, U)
+
+        # ---- top-N per pitch without a full sort
+        k = max(1, min(top_n, n_all)) if n_all else 0
+        rows = []
+        now = datetime.utcnow()  # core insert bypasses the model's default_factory
+        if k:
+            top = np.argpartition(-blended, k - 1, axis=1)[:, :k]
+            for b, p in enumerate(pitches):
+                cols = top[b][np.lexsort((np.nan_to_num(dist[b, top[b]], nan=9e9), -blended[b, top[b]]))]
+                for c in cols:
+                    score = int(blended[b, c])
+                    if score <= 0:
+                        continue
+                    d = dist[b, c]
+                    rows.append({
+                        "pitch_id": p.id,
+                        "investor_name": universe[int(c)],
+                        "score_pct": score,
+                        "distance": None if np.isnan(d) else float(d),
+                        "created_at": now,
+                    })
+
+        # ---- replace this batch's matches in one transaction
+        db.execute(delete(Match).where(Match.pitch_id.in_([p.id for p in pitches])))
+        if rows:
+            db.execute(insert(Match), rows)  # executemany
+        db.commit()
+
+        written += len(rows)
+        done += B
+        if progress:
+            progress(done, total)
+
+    return {"pitches": total, "matches": written, "investors": n_all}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    ids = [int(a) for a in argv] or None
+    t0 = time.perf_counter()
+
+    def report(done: int, total: int) -> None:
+        rate = done / max(1e-9, time.perf_counter() - t0)
+        print(f"  {done}/{total} pitches ({rate:.1f}/s)")
+
+    with Session(engine) as s:
+        res = rematch_pitches(s, ids, progress=report)
+    print(f"Rematch: pitches={res['pitches']}, matches={res['matches']}, "
+          f"investors={res['investors']} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# scripts/bench_embeddings.py
+"""
+Parity + throughput check for the embedding backends.
+
+    python -m scripts.bench_embeddings                       # torch-int8 and onnx vs fp32
+    python -m scripts.bench_embeddings --backends onnx --texts data/investors.json
+
+Parity: every text's vector from the candidate backend must have cosine >= --min-cos
+(default 0.99) with the fp32 sentence-transformers vector. Exits 1 if any backend fails.
+Throughput: texts/sec at --batch-size, best of --repeats runs (after one warm-up run).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from app.ml.embeddings import EMBEDDING_MODEL_NAME, make_backend
+
+SAMPLE_TEXTS = [
+    "Seed-stage fintech investor focused on B2B payments infrastructure in North America.",
+    "We back AI and robotics founders building developer tools with strong network effects.",
+    "Series A climate fund; no crypto, no heavy hardware; checks between 1M and 5M USD.",
+    "Our startup automates accounts payable for mid-market companies using LLM agents.",
+    "APAC equity ETF tracking large and mid-cap companies across developed Asia Pacific markets.",
+    "Healthcare SaaS for clinics: scheduling, billing and patient messaging in one platform.",
+    "Marketplace connecting freight carriers with shippers, growing 20% month over month.",
+    "Pre-seed; solo founder; prototype with 30 design partners and a waitlist of 2,000 users.",
+]
+
+
+def _load_texts(path: str | None, n: int) -> List[str]:
+    texts = list(SAMPLE_TEXTS)
+    if path:
+        raw = json.loads(Path(path).read_text())
+        for r in raw if isinstance(raw, list) else []:
+            if isinstance(r, dict):
+                texts.append(" | ".join(str(v) for v in r.values() if isinstance(v, str) and v))
+            elif isinstance(r, str):
+                texts.append(r)
+    while len(texts) < n:
+        texts.extend(texts[: n - len(texts)])
+    return texts[:n]
+
+
+def _throughput(backend, texts: List[str], batch_size: int, repeats: int) -> float:
+    backend.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+    best = float("inf")
+    for _ in range(max(1, repeats)):
+        t0 = time.perf_counter()
+        backend.encode(texts, batch_size=batch_size)
+        best = min(best, time.perf_counter() - t0)
+    return len(texts) / best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--backends", default="torch-int8,onnx")
+    ap.add_argument("--texts", default=None, help="optional JSON list (e.g. data/investors.json)")
+    ap.add_argument("--n", type=int, default=256)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--min-cos", type=float, default=0.99)
+    args = ap.parse_args()
+
+    texts = _load_texts(args.texts, args.n)
+    ref_backend = make_backend("sentence-transformers")
+    ref = ref_backend.encode(texts, batch_size=args.batch_size)
+    ref_tps = _throughput(ref_backend, texts, args.batch_size, args.repeats)
+
+    print(f"model={EMBEDDING_MODEL_NAME} texts={len(texts)} batch={args.batch_size}")
+    print(f"{'backend':<22}{'texts/s':>10}{'speedup':>9}{'min cos':>10}{'mean cos':>10}  parity")
+    print(f"{'sentence-transformers':<22}{ref_tps:>10.1f}{1.0:>9.2f}{1.0:>10.4f}{1.0:>10.4f}  ref")
+
+    failed = False
+    for name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        try:
+            backend = make_backend(name)
+        except Exception as e:
+            print(f"{name:<22}  unavailable: {e}")
+            failed = True
+            continue
+        vecs = backend.encode(texts, batch_size=args.batch_size)
+        cos = np.sum(ref * vecs, axis=1)  # both unit-length
+        tps = _throughput(backend, texts, args.batch_size, args.repeats)
+        ok = bool(cos.min() >= args.min_cos)
+        failed |= not ok
+        print(
+            f"{name:<22}{tps:>10.1f}{tps / ref_tps:>9.2f}"
+            f"{cos.min():>10.4f}{cos.mean():>10.4f}  {'ok' if ok else 'FAIL'}"
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
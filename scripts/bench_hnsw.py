@@ -0,0 +1,168 @@
+# scripts/bench_hnsw.py
+"""
+ANN quality / latency / memory for Weaviate HNSW settings on the investor vectors.
+
+    python -m scripts.bench_hnsw
+    python -m scripts.bench_hnsw --scale 100 --ef 16,32,64,128,-1
+    python -m scripts.bench_hnsw --settings "efc=128,m=32,q=none;efc=128,m=32,q=pq;efc=64,m=16,q=bq"
+
+For every index setting (efConstruction, maxConnections, quantizer) a
+throw-away collection InvestorBench_<i> is built with the same schema as
+Investor. Every query ef in --ef is then timed against it:
+
+  recall@k   overlap with an exact brute-force (numpy) top-k over the same vectors
+  p50 / p99  per-query near_vector latency (client side, ms)
+  memory     estimated resident bytes (vectors in their in-memory form + HNSW
+             graph links), at the benchmarked size and at --project × that size
+
+--scale N replicates the catalog N× with small Gaussian noise (same dimension),
+for sizing Weaviate ahead of catalog growth. PQ/SQ only compress once
+WEAVIATE_QUANTIZER_TRAINING_LIMIT objects exist; below that the measured
+recall/latency are those of the uncompressed index.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.adapters.vector.weaviate_client import (
+    create_investor_collection, get_client, hnsw_config, set_query_ef,
+)
+from app.adapters.vector.weaviate_investors import fetch_investor_vectors
+
+BENCH_PREFIX = "InvestorBench_"
+
+
+def _parse_settings(spec: str) -> List[Dict[str, object]]:
+    out = []
+    for part in [p for p in spec.split(";") if p.strip()]:
+        kv = dict(item.split("=", 1) for item in part.split(",") if "=" in item)
+        out.append({
+            "ef_construction": int(kv.get("efc", 128)),
+            "max_connections": int(kv.get("m", 32)),
+            "quantizer": kv.get("q", "none"),
+            "pq_segments": int(kv.get("seg", 0)),
+        })
+    return out
+
+
+def _catalog(scale: int, noise: float, seed: int = 5) -> Tuple[List[str], np.ndarray]:
+    recs = [r for r in fetch_investor_vectors() if r.get("vector")]
+    if not recs:
+        raise SystemExit("Investor collection has no vectors — ingest first.")
+    base = np.asarray([r["vector"] for r in recs], dtype=np.float32)
+    names = [str(r.get("name")) for r in recs]
+    rng = np.random.default_rng(seed)
+    mats, ids = [base], list(names)
+    for s in range(1, max(1, scale)):
+        mats.append(base + rng.normal(0, noise, base.shape).astype(np.float32))
+        ids.extend(f"{n}#{s}" for n in names)
+    mat = np.vstack(mats)
+    mat /= np.clip(np.linalg.norm(mat, axis=1, keepdims=True), 1e-12, None)
+    return ids, mat
+
+
+def _queries(mat: np.ndarray, n: int, noise: float, seed: int = 9) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    q = mat[rng.integers(0, len(mat), n)] + rng.normal(0, noise * 2, (n, mat.shape[1])).astype(np.float32)
+    return q / np.clip(np.linalg.norm(q, axis=1, keepdims=True), 1e-12, None)
+
+
+def _exact_topk(mat: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    sims = queries @ mat.T
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    return top
+
+
+def estimate_memory_bytes(n: int, dim: int, max_connections: int, quantizer: str, pq_segments: int) -> int:
+    """
+    Rough resident size: in-memory vectors + HNSW links (layer 0 keeps up to
+    2 × maxConnections 8-byte ids per node; upper layers add ~1/M of that).
+    Compressed indexes keep full vectors on disk only (used for rescoring).
+    """
+    q = (quantizer or "none").lower()
+    if q == "pq":
+        vec = n * (pq_segments or max(1, dim // 4))  # 1 byte per segment at 256 centroids
+    elif q == "bq":
+        vec = n * ((dim + 7) // 8)
+    elif q == "sq":
+        vec = n * dim
+    else:
+        vec = n * dim * 4
+    links = int(n * 2 * max_connections * 8 * (1 + 1 / max(2, max_connections)))
+    return vec + links
+
+
+def _build(client, name: str, setting: Dict[str, object], ids: List[str], mat: np.ndarray, batch_size: int):
+    if client.collections.exists(name):
+        client.collections.delete(name)
+    coll = create_investor_collection(client, name, vector_index_config=hnsw_config(**setting))
+    t0 = time.perf_counter()
+    with coll.batch.fixed_size(batch_size=batch_size) as batch:
+        for i, v in zip(ids, mat):
+            batch.add_object(properties={"name": i}, vector=v.tolist())
+    failed = len(coll.batch.failed_objects or [])
+    return coll, time.perf_counter() - t0, failed
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--settings", default="efc=128,m=32,q=none;efc=64,m=16,q=none;efc=128,m=32,q=pq;efc=128,m=32,q=bq")
+    ap.add_argument("--ef", default="16,32,64,128,-1", help="query-time ef values (-1 = dynamic)")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--scale", type=int, default=1, help="replicate the catalog N× (noisy copies)")
+    ap.add_argument("--noise", type=float, default=0.02)
+    ap.add_argument("--project", type=int, default=100, help="memory projection multiplier")
+    ap.add_argument("--batch-size", type=int, default=200)
+    ap.add_argument("--keep", action="store_true", help="keep the InvestorBench_* collections")
+    args = ap.parse_args()
+
+    client = get_client()
+    ids, mat = _catalog(args.scale, args.noise)
+    queries = _queries(mat, args.queries, args.noise)
+    k = min(args.k, len(ids))
+    truth = _exact_topk(mat, queries, k)
+    truth_sets = [{ids[j] for j in row} for row in truth]
+    efs = [int(e) for e in args.ef.split(",") if e.strip()]
+
+    n, dim = mat.shape
+    print(f"vectors={n} dim={dim} queries={len(queries)} k={k}")
+    print(f"{'setting':<28}{'ef':>5}{'recall':>8}{'p50 ms':>9}{'p99 ms':>9}{'mem MB':>9}{f'×{args.project} GB':>10}")
+
+    created = []
+    try:
+        for i, setting in enumerate(_parse_settings(args.settings)):
+            name = f"{BENCH_PREFIX}{i}"
+            coll, build_s, failed = _build(client, name, setting, ids, mat, args.batch_size)
+            created.append(name)
+            label = f"efc={setting['ef_construction']} m={setting['max_connections']} q={setting['quantizer']}"
+            mem = estimate_memory_bytes(n, dim, setting["max_connections"], setting["quantizer"], setting["pq_segments"])
+            mem_proj = estimate_memory_bytes(n * args.project, dim, setting["max_connections"],
+                                             setting["quantizer"], setting["pq_segments"])
+            print(f"  built {name} in {build_s:.1f}s ({failed} failed)")
+            for ef in efs:
+                set_query_ef(client, ef, name)
+                lat: List[float] = []
+                recall: List[float] = []
+                for q, want in zip(queries, truth_sets):
+                    t0 = time.perf_counter()
+                    res = coll.query.near_vector(q.tolist(), limit=k, return_properties=["name"])
+                    lat.append((time.perf_counter() - t0) * 1000)
+                    got = {(o.properties or {}).get("name") for o in res.objects or []}
+                    recall.append(len(got & want) / k)
+                print(f"{label:<28}{ef:>5}{np.mean(recall):>8.3f}{np.percentile(lat, 50):>9.2f}"
+                      f"{np.percentile(lat, 99):>9.2f}{mem / 1e6:>9.1f}{mem_proj / 1e9:>10.2f}")
+    finally:
+        if not args.keep:
+            for name in created:
+                client.collections.delete(name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
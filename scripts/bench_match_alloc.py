@@ -0,0 +1,160 @@
+# scripts/bench_match_alloc.py
+"""
+Per-request allocation + latency of the /match/pitch merge step.
+
+    python -m scripts.bench_match_alloc                    # 5k synthetic investors
+    python -m scripts.bench_match_alloc --investors 50000 --top-n 10
+
+"legacy": what recommend_pitch did before the snapshot — materialize every
+Investor model, build a card dict for each DB hit, copy every card, sort all.
+"snapshot": InvestorSnapshot.rank (snapshot built once, outside the
+measurement) → one sparse keyword product, score arrays, partial top-N
+selection, cards for the top-N only.
+"cutoff": InvestorSnapshot.rank_with_cutoff (MATCH_EARLY_CUTOFF=1) over a random
+local vector index → keyword scoring only for investors that can still reach
+the top-N. Checked against the same blend computed without pruning. Expect it
+to lose to "snapshot" on small catalogs (2–2.5x slower at 500–3000
+investors); it only pays off once full keyword scoring dominates.
+
+Allocation is tracemalloc's peak during one request (after a warm-up request);
+latency is the best of --repeats.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from app.db.models import Investor
+from app.ml.investor_index import InvestorVectorIndex
+from app.ml.investor_snapshot import CARD_FIELDS, InvestorRecord, InvestorSnapshot
+from app.ml.multivector import sims_to_pct
+from app.ml.scoring import blend_scores, norm_db_score, score_investor_db
+
+SECTORS = ["fintech", "ai", "climate", "health", "saas", "marketplace", "robotics", "crypto", "b2b", "consumer"]
+STAGES = ["pre-seed", "seed", "series a", "series b", "growth"]
+GEOS = ["us", "europe", "uk", "apac", "latam", "africa", "canada"]
+WORDS = ("payments infrastructure developer tools network effects hardware clinics billing "
+         "freight carriers revenue retention founders enterprise automation data platform").split()
+
+PITCH = ("Seed-stage AI fintech startup in the US automating B2B payments for enterprise "
+         "finance teams; strong retention, developer tools and data platform.")
+
+
+def _synthetic_rows(n: int, seed: int = 7) -> List[tuple]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        rows.append((
+            f"Investor {i}", f"Firm {i % 997}",
+            ", ".join(rng.sample(SECTORS, 3)), ", ".join(rng.sample(STAGES, 2)),
+            ", ".join(rng.sample(GEOS, 2)), float(rng.choice([1e5, 5e5, 1e6])),
+            float(rng.choice([2e6, 5e6, 1e7])), "USD",
+            " ".join(rng.sample(WORDS, 6)), " ".join(rng.sample(WORDS, 3)),
+        ))
+    return rows
+
+
+def _vector_hits(names: List[str], k: int, seed: int = 11) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed)
+    return {
+        n: {"vec_pct": rng.randint(40, 95), "distance": rng.random(), "raw": {"name": n}}
+        for n in rng.sample(names, min(k, len(names)))
+    }
+
+
+def legacy_request(rows: List[tuple], text: str, hits: Dict[str, Dict[str, Any]], top_n: int) -> list:
+    investors = [Investor(**dict(zip(CARD_FIELDS, r))) for r in rows]  # db.exec(select(Investor)).all()
+    merged: Dict[str, Dict[str, Any]] = {}
+    for inv in investors:
+        db_pct = norm_db_score(score_investor_db(text, inv))
+        if db_pct > 0:
+            card = {f: getattr(inv, f) for f in CARD_FIELDS}
+            card.update(score_pct=db_pct, distance=None)
+            merged[inv.name] = {"card": card, "db_pct": db_pct, "vec_pct": None, "distance": None}
+    for name, v in hits.items():
+        if name in merged:
+            merged[name].update(vec_pct=v["vec_pct"], distance=v["distance"])
+        else:
+            card = {f: v["raw"].get(f) for f in CARD_FIELDS}
+            merged[name] = {"card": card, "db_pct": None, "vec_pct": v["vec_pct"], "distance": v["distance"]}
+    cards = []
+    for m in merged.values():
+        card = dict(m["card"])
+        card["score_pct"] = blend_scores(m["db_pct"], m["vec_pct"])
+        card["distance"] = m["distance"]
+        cards.append(card)
+    cards.sort(key=lambda c: (-c["score_pct"], c["distance"] if c["distance"] is not None else 9e9))
+    return [c for c in cards[:top_n] if c["score_pct"] > 0]
+
+
+def _measure(fn: Callable[[], list], repeats: int) -> tuple:
+    fn()  # warm-up (imports, caches)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn()
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = float("inf")
+    for _ in range(max(1, repeats)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return peak, best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--investors", type=int, default=5000)
+    ap.add_argument("--vector-hits", type=int, default=40)
+    ap.add_argument("--top-n", type=int, default=10)
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--dim", type=int, default=384, help="vector size for the cutoff path")
+    args = ap.parse_args()
+
+    rows = _synthetic_rows(args.investors)
+    snap = InvestorSnapshot([InvestorRecord(*r) for r in rows])
+    hits = _vector_hits(snap.names, args.vector_hits)
+
+    rng = np.random.default_rng(3)
+    idx = InvestorVectorIndex.from_records(
+        [{"name": n, "vector": v} for n, v in zip(snap.names, rng.standard_normal((len(snap), args.dim)))]
+    )
+    q = rng.standard_normal(args.dim).astype(np.float32)
+    sims = idx.similarity(q / np.linalg.norm(q))[0]
+    all_hits = {
+        n: {"vec_pct": int(p), "distance": float(1.0 - s), "raw": {"name": n}}
+        for n, s, p in zip(idx.names, sims, sims_to_pct(sims))
+    }
+
+    def names(cards: list) -> list:
+        return [c["name"] for c in cards]
+
+    same = names(legacy_request(rows, PITCH, hits, args.top_n)) == names(snap.rank(PITCH, hits, args.top_n))
+    same_cutoff = (names(snap.rank_with_cutoff(PITCH, idx, sims, args.top_n))
+                   == names(snap.rank(PITCH, all_hits, args.top_n)))
+
+    print(f"investors={args.investors} vector_hits={len(hits)} top_n={args.top_n}")
+    print(f"{'path':<10}{'peak KiB':>12}{'ms':>10}")
+    results = {}
+    for name, fn in (
+        ("legacy", lambda: legacy_request(rows, PITCH, hits, args.top_n)),
+        ("snapshot", lambda: snap.rank(PITCH, hits, args.top_n)),
+        ("cutoff", lambda: snap.rank_with_cutoff(PITCH, idx, sims, args.top_n)),
+    ):
+        peak, best = _measure(fn, args.repeats)
+        results[name] = peak
+        print(f"{name:<10}{peak / 1024:>12.1f}{best * 1000:>10.2f}")
+    print(f"allocation reduction: {results['legacy'] / max(1, results['snapshot']):.1f}x  "
+          f"same top-{args.top_n}: {'yes' if same else 'NO'}  "
+          f"cutoff exact: {'yes' if same_cutoff else 'NO'}")
+    return 0 if same and same_cutoff else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
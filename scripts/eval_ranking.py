@@ -0,0 +1,245 @@
+# scripts/eval_ranking.py
+"""
+Offline ranking evaluation for /match/pitch scoring: quality (NDCG@k, recall@k)
+and per-query latency, plus a grid search over the blend config.
+
+    python -m scripts.eval_ranking --labels data/labels.jsonl
+    python -m scripts.eval_ranking --labels data/labels.jsonl --modes exact,ann,cutoff
+    python -m scripts.eval_ranking --labels data/labels.jsonl --grid --out scoring.json
+
+Labels: JSON list, JSONL or CSV rows of {pitch_id, investor_name, relevance}
+(graded, 0 = not a fit .. 3 = great fit). Without --labels, the stored Match
+rows are replayed as labels (relevance = 1): the metrics then measure agreement
+with what production returned, which is what you want when comparing faster
+retrieval modes against exact scoring.
+
+Pitches are replayed from Pitch.summary with their stored vectors (no PDF
+parsing); the investor side is the current snapshot + local vector index.
+
+Modes (vector side):
+  exact    every indexed investor scored with the local index
+  ann      Weaviate near_vector top --ann-limit (what the pooled route does)
+  cutoff   exact + MATCH_EARLY_CUTOFF pruning (same ranking as exact, timed separately)
+
+--out writes the best config in the SCORING_CONFIG_PATH format; the API loads
+it at startup.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.db.core import engine
+from app.db.models import Match, Pitch
+from app.ml.investor_index import load_investor_index
+from app.ml.investor_snapshot import InvestorSnapshot
+from app.ml.scoring import (
+    BlendConfig, blend_matrix, get_blend_config, norm_db_matrix, sim_to_pct, top_n_order,
+)
+from app.utils.rematch_pitches import pitch_vectors
+
+Labels = Dict[int, Dict[str, float]]  # pitch_id -> {investor_name: relevance}
+
+
+def load_labels(path: str) -> Labels:
+    p = Path(path)
+    if p.suffix == ".csv":
+        with open(p, newline="") as f:
+            rows = list(csv.DictReader(f))
+    elif p.suffix == ".jsonl":
+        rows = [json.loads(line) for line in p.read_text().splitlines() if line.strip()]
+    else:
+        rows = json.loads(p.read_text())
+    out: Labels = defaultdict(dict)
+    for r in rows:
+        out[int(r["pitch_id"])][str(r["investor_name"]).strip()] = float(r.get("relevance", 1))
+    return dict(out)
+
+
+def labels_from_matches(db: Session) -> Labels:
+    out: Labels = defaultdict(dict)
+    for pid, name in db.exec(select(Match.pitch_id, Match.investor_name)).all():
+        out[int(pid)][name] = 1.0
+    return dict(out)
+
+
+# ----------------------------
+# Metrics
+# ----------------------------
+
+def ndcg_at_k(ranked: List[str], rel: Dict[str, float], k: int) -> float:
+    dcg = sum((2 ** rel.get(n, 0.0) - 1) / math.log2(i + 2) for i, n in enumerate(ranked[:k]))
+    ideal = sorted(rel.values(), reverse=True)[:k]
+    idcg = sum((2 ** r - 1) / math.log2(i + 2) for i, r in enumerate(ideal))
+    return dcg / idcg if idcg > 0 else 0.0
+
+
+def recall_at_k(ranked: List[str], rel: Dict[str, float], k: int) -> float:
+    relevant = {n for n, r in rel.items() if r > 0}
+    return len(relevant & set(ranked[:k])) / len(relevant) if relevant else 0.0
+
+
+# ----------------------------
+# Replay
+# ----------------------------
+
+class Query:
+    """Config-independent score components of one pitch over the investor universe."""
+
+    def __init__(self, pitch_id: int, raw_db: np.ndarray, sims: np.ndarray, has_vec: np.ndarray,
+                 latency_ms: float):
+        self.pitch_id = pitch_id
+        self.raw_db = raw_db
+        self.sims = sims
+        self.has_vec = has_vec
+        self.latency_ms = latency_ms
+
+    def ranking(self, universe: List[str], cfg: BlendConfig, k: int) -> List[str]:
+        db_pct = norm_db_matrix(self.raw_db, cfg)
+        vec_pct = np.where(self.has_vec, sim_to_pct(self.sims, cfg), 0)
+        blended = blend_matrix(db_pct[None, :], vec_pct[None, :], self.has_vec[None, :], cfg)[0]
+        dist = np.where(self.has_vec, 1.0 - self.sims, np.nan)
+        order = top_n_order(blended, dist, k)
+        return [universe[int(c)] for c in order if blended[c] > 0]
+
+
+def _universe(snap: InvestorSnapshot, idx) -> Tuple[List[str], np.ndarray]:
+    universe = list(snap.names)
+    col_of = dict(snap.row_of)
+    for name in idx.names:
+        if name not in col_of:
+            col_of[name] = len(universe)
+            universe.append(name)
+    return universe, np.asarray([col_of[n] for n in idx.names], dtype=np.int64)
+
+
+def replay(
+    db: Session, snap: InvestorSnapshot, idx, labels: Labels, mode: str, k: int, ann_limit: int
+) -> Tuple[List[str], List[Query]]:
+    universe, idx_cols = _universe(snap, idx)
+    n, size = len(snap), len(universe)
+    pitches = db.exec(select(Pitch).where(Pitch.id.in_(list(labels))).order_by(Pitch.id)).all()
+    vecs = pitch_vectors(db, pitches) if len(idx) else np.zeros((len(pitches), 0), dtype=np.float32)
+
+    queries: List[Query] = []
+    for p, pv in zip(pitches, vecs):
+        text = p.summary or ""
+        raw_db = np.zeros(size, dtype=np.float32)
+        sims = np.zeros(size, dtype=np.float32)
+        has_vec = np.zeros(size, dtype=bool)
+        usable = pv.any() and len(idx) and pv.shape[0] == idx.matrix.shape[1]
+
+        t0 = time.perf_counter()
+        if mode == "cutoff" and usable:
+            snap.rank_with_cutoff(text, idx, idx.similarity(pv)[0], k)
+        elif mode == "ann" and usable:
+            from app.adapters.vector.weaviate_investors import search_similar_investors
+
+            hits = search_similar_investors(pv.tolist(), limit=ann_limit)
+        latency = time.perf_counter() - t0
+
+        # config-independent components (timed as part of exact / ann, which need them anyway)
+        t0 = time.perf_counter()
+        if n:
+            raw_db[:n] = snap.scorer.raw_scores([text])[0]
+        if usable and mode in ("exact", "cutoff"):
+            sims[idx_cols] = idx.similarity(pv)[0]
+            has_vec[idx_cols] = True
+        elif usable and mode == "ann":
+            col_of = {name: i for i, name in enumerate(universe)}
+            for h in hits:
+                c = col_of.get((h.get("name") or "").strip())
+                if c is not None and h.get("distance") is not None:
+                    sims[c] = 1.0 - float(h["distance"])
+                    has_vec[c] = True
+        if mode != "cutoff":
+            latency += time.perf_counter() - t0
+
+        queries.append(Query(p.id, raw_db, sims, has_vec, latency * 1000))
+    return universe, queries
+
+
+def evaluate(universe: List[str], queries: List[Query], labels: Labels, cfg: BlendConfig,
+             k: int) -> Dict[str, float]:
+    ndcg, recall = [], []
+    for q in queries:
+        ranked = q.ranking(universe, cfg, k)
+        ndcg.append(ndcg_at_k(ranked, labels[q.pitch_id], k))
+        recall.append(recall_at_k(ranked, labels[q.pitch_id], k))
+    lat = np.asarray([q.latency_ms for q in queries]) if queries else np.zeros(1)
+    return {
+        "ndcg": float(np.mean(ndcg)) if ndcg else 0.0,
+        "recall": float(np.mean(recall)) if recall else 0.0,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+    }
+
+
+def grid(universe: List[str], queries: List[Query], labels: Labels, k: int) -> List[Tuple[dict, BlendConfig]]:
+    results = []
+    for w, dmax, floor, ceil in itertools.product(
+        [round(x * 0.1, 1) for x in range(11)], [5.0, 7.0, 9.0], [-1.0, 0.0, 0.2, 0.4], [0.8, 1.0]
+    ):
+        if ceil <= floor:
+            continue
+        cfg = BlendConfig(db_weight=w, vec_weight=round(1.0 - w, 1), db_score_max=dmax,
+                          vec_sim_floor=floor, vec_sim_ceil=ceil)
+        results.append((evaluate(universe, queries, labels, cfg, k), cfg))
+    results.sort(key=lambda r: (-r[0]["ndcg"], -r[0]["recall"]))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--labels", default=None, help="JSON / JSONL / CSV of pitch_id, investor_name, relevance")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--modes", default="exact", help="comma-separated: exact, ann, cutoff")
+    ap.add_argument("--ann-limit", type=int, default=20)
+    ap.add_argument("--grid", action="store_true", help="grid-search the blend config (first mode)")
+    ap.add_argument("--out", default=None, help="write the best grid config here (SCORING_CONFIG_PATH)")
+    args = ap.parse_args(argv)
+
+    cfg = get_blend_config()
+    with Session(engine) as db:
+        labels = load_labels(args.labels) if args.labels else labels_from_matches(db)
+        if not labels:
+            print("No labels (and no stored matches) to evaluate.")
+            return 1
+        snap = InvestorSnapshot.load(db)
+        idx = load_investor_index()
+        print(f"pitches={len(labels)} investors={len(snap)} indexed={len(idx)} k={args.k}")
+        print(f"config: {dict(cfg)}")
+        print(f"{'mode':<8}{'ndcg@k':>9}{'recall@k':>10}{'p50 ms':>9}{'p95 ms':>9}")
+
+        replays = {}
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            universe, queries = replay(db, snap, idx, labels, mode, args.k, args.ann_limit)
+            replays[mode] = (universe, queries)
+            m = evaluate(universe, queries, labels, cfg, args.k)
+            print(f"{mode:<8}{m['ndcg']:>9.4f}{m['recall']:>10.4f}{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}")
+
+    if args.grid and replays:
+        mode, (universe, queries) = next(iter(replays.items()))
+        ranked = grid(universe, queries, labels, args.k)
+        print(f"\ngrid ({mode}), top 5 of {len(ranked)}:")
+        for m, c in ranked[:5]:
+            print(f"  ndcg={m['ndcg']:.4f} recall={m['recall']:.4f}  {dict(c)}")
+        if args.out and ranked:
+            Path(args.out).write_text(json.dumps(dict(ranked[0][1]), indent=2) + "\n")
+            print(f"best config written to {args.out} (set SCORING_CONFIG_PATH to load it)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# scripts/load_test.py
+"""
+Closed-loop HTTP load test for the hot read endpoints.
+
+    python -m scripts.load_test --base http://localhost:8000 --token $TOKEN
+    python -m scripts.load_test --concurrency 50,200,400 --duration 20
+    python -m scripts.load_test --paths /api/v1/products/,/api/v1/auth/me
+
+Each of --concurrency connections sends requests back-to-back for --duration
+seconds, cycling through --paths (an {investor} placeholder is filled from
+/investors/). Reported per level: requests/s, p50 / p95 / p99 latency and
+non-2xx / transport errors.
+
+The server must allow that many connections: run uvicorn with enough
+--limit-concurrency / backlog, and raise DB_ASYNC_POOL_SIZE (async routes)
+or the threadpool size (sync routes) when comparing the two paths.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+import numpy as np
+
+DEFAULT_PATHS = "/api/v1/investors/,/api/v1/investors/{investor},/api/v1/products/,/api/v1/auth/me"
+
+
+async def _first_investor(client: httpx.AsyncClient) -> Optional[str]:
+    try:
+        rows = (await client.get("/api/v1/investors/")).json()
+        return rows[0]["name"] if rows else None
+    except Exception:
+        return None
+
+
+async def run_level(
+    client: httpx.AsyncClient, paths: List[str], concurrency: int, duration: float
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int) -> None:
+        nonlocal errors
+        i = offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                r = await client.get(path)
+                ok = r.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if not ok:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    lat = np.asarray(latencies) if latencies else np.zeros(1)
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": float(np.percentile(lat, 50)),
+        "p95": float(np.percentile(lat, 95)),
+        "p99": float(np.percentile(lat, 99)),
+        "errors": errors,
+    }
+
+
+async def main_async(args) -> int:
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(
+        base_url=args.base, headers=headers, limits=limits, timeout=args.timeout
+    ) as client:
+        paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+        if any("{investor}" in p for p in paths):
+            name = await _first_investor(client)
+            if name is None:
+                print("no investors to fill {investor}; skipping those paths")
+                paths = [p for p in paths if "{investor}" not in p]
+            else:
+                paths = [p.replace("{investor}", quote(name)) for p in paths]
+        if not paths:
+            return 1
+
+        print(f"paths: {', '.join(paths)}")
+        print(f"{'conns':>6}{'requests':>10}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        for c in levels:
+            # short warm-up so connection setup isn't measured
+            await run_level(client, paths, c, min(2.0, args.duration))
+            m = await run_level(client, paths, c, args.duration)
+            print(f"{c:>6}{m['requests']:>10}{m['rps']:>10.1f}{m['p50']:>9.1f}"
+                  f"{m['p95']:>9.1f}{m['p99']:>9.1f}{m['errors']:>8}")
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--base", default="http://localhost:8000")
+    ap.add_argument("--token", default=None, help="bearer token (needed for /investors/{name}, /auth/me)")
+    ap.add_argument("--paths", default=DEFAULT_PATHS)
+    ap.add_argument("--concurrency", default="50,200,400")
+    ap.add_argument("--duration", type=float, default=15.0, help="seconds per concurrency level")
+    ap.add_argument("--timeout", type=float, default=30.0)
+    return asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())